@@ -0,0 +1,139 @@
+"""
+Selection analytics served from the rollup tables
+
+Every query here reads SelectionDailyRollup, SelectionComponentRollup or
+RequirementHistogramRollup, so its cost depends on the number of days and
+buckets in the range, not on the size of SelectionHistory.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from parts.models import (
+    RequirementHistogramRollup, SelectionComponentRollup, SelectionDailyRollup, SelectionHistory,
+)
+
+
+def _in_range(queryset, start, end, component_type=None):
+    queryset = queryset.filter(day__gte=start, day__lte=end)
+    if component_type:
+        queryset = queryset.filter(component_type=component_type.lower())
+    return queryset
+
+
+def daily_selections(start, end, component_type=None):
+    """Selections and average match score per day and component type"""
+    rows = _in_range(SelectionDailyRollup.objects, start, end, component_type).order_by('day', 'component_type')
+    return [
+        {
+            'day': row.day.isoformat(),
+            'componentType': row.component_type,
+            'selections': row.selections,
+            'averageScore': round(row.average_score, 1),
+        }
+        for row in rows
+    ]
+
+
+def top_components(start, end, component_type=None, limit=10):
+    """Components most often picked as the best recommendation"""
+    rows = (
+        _in_range(SelectionComponentRollup.objects, start, end, component_type)
+        .values('component_id', 'component__name', 'component__manufacturer', 'component__part_number',
+                'component_type')
+        .annotate(selections=Sum('selections'))
+        .order_by('-selections', 'component_id')[:limit]
+    )
+    return [
+        {
+            'id': row['component_id'],
+            'name': row['component__name'],
+            'manufacturer': row['component__manufacturer'],
+            'partNumber': row['component__part_number'],
+            'componentType': row['component_type'],
+            'selections': row['selections'],
+        }
+        for row in rows
+    ]
+
+
+def _next_bucket(bucket):
+    if bucket <= 0:
+        return None
+    return RequirementHistogramRollup.bucket_of(bucket * 2.5)
+
+
+def requirement_histograms(start, end, component_type=None):
+    """Histograms of the requested load, speed and power values"""
+    rows = (
+        _in_range(RequirementHistogramRollup.objects, start, end, component_type)
+        .values('field', 'bucket')
+        .annotate(count=Sum('count'))
+        .order_by('field', 'bucket')
+    )
+    histograms = {
+        field: {'unit': unit, 'buckets': []}
+        for field, unit in RequirementHistogramRollup.FIELDS.items()
+    }
+    for row in rows:
+        if row['field'] in histograms:
+            histograms[row['field']]['buckets'].append({
+                'from': row['bucket'],
+                'to': _next_bucket(row['bucket']),
+                'count': row['count'],
+            })
+    return histograms
+
+
+def rebuild_rollups(start=None):
+    """
+    Recompute every rollup from the raw SelectionHistory rows
+
+    Days without raw rows (already past retention) are left untouched. Rows
+    are streamed and counted in memory per bucket, not per row.
+    Returns the number of days rebuilt.
+    """
+    history = SelectionHistory.objects.order_by()
+    if start:
+        history = history.filter(created_at__date__gte=start)
+
+    daily = defaultdict(lambda: [0, 0])
+    components = {}  # (day, component id) -> [selections, latest selection, its component type]
+    buckets = Counter()
+    for entry in history.only(
+        'component_type', 'form_data', 'selected_component_id', 'match_score', 'created_at'
+    ).iterator(chunk_size=2000):
+        day = timezone.localdate(entry.created_at)
+        totals = daily[day, entry.component_type]
+        totals[0] += 1
+        totals[1] += entry.match_score
+        if entry.selected_component_id:
+            counts = components.setdefault((day, entry.selected_component_id), [0, entry.created_at, ''])
+            counts[0] += 1
+            if entry.created_at >= counts[1]:
+                counts[1:] = [entry.created_at, entry.component_type]
+        for field, bucket in RequirementHistogramRollup.buckets_of(entry.form_data):
+            buckets[day, entry.component_type, field, bucket] += 1
+
+    days = {day for day, _ in daily}
+    with transaction.atomic():
+        for model in (SelectionDailyRollup, SelectionComponentRollup, RequirementHistogramRollup):
+            model.objects.filter(day__in=days).delete()
+        SelectionDailyRollup.objects.bulk_create([
+            SelectionDailyRollup(day=day, component_type=component_type, selections=selections,
+                                 score_total=score_total)
+            for (day, component_type), (selections, score_total) in daily.items()
+        ], batch_size=1000)
+        SelectionComponentRollup.objects.bulk_create([
+            SelectionComponentRollup(day=day, component_type=component_type, component_id=component_id,
+                                     selections=selections)
+            for (day, component_id), (selections, _, component_type) in components.items()
+        ], batch_size=1000)
+        RequirementHistogramRollup.objects.bulk_create([
+            RequirementHistogramRollup(day=day, component_type=component_type, field=field, bucket=bucket,
+                                       count=count)
+            for (day, component_type, field, bucket), count in buckets.items()
+        ], batch_size=1000)
+    return len(days)
@@ -0,0 +1,235 @@
+"""
+Compatible part sets for an assembly
+
+An assembly request carries one requirement form per component type. Each
+type is ranked on its own (selection.rank_components) and cut to its best
+candidates, and pairwise constraints then link the types:
+
+- the bearing speed rating must cover the motor speed
+- the seal diameter must fit the bearing bore within SHAFT_FIT_TOLERANCE_MM
+- the gear power transmission must cover the motor power
+
+Arc consistency (AC-3) drops the candidates that no candidate of a linked
+type is compatible with. A branch-and-bound search over what is left then
+finds the combinations with the highest total match score. It checks
+compatibility forward as it assigns parts, and it gives up after a node
+budget, keeping the best combinations found so far.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+
+from api.selection import rank_components
+
+
+# Largest difference between shaft (bearing bore) and seal diameter, in mm
+SHAFT_FIT_TOLERANCE_MM = 2
+
+# Spec values compared between two component types. relation is 'at_most'
+# (first value <= second value) or 'fits' (within SHAFT_FIT_TOLERANCE_MM).
+Constraint = namedtuple('Constraint', 'name first first_field second second_field relation')
+
+ASSEMBLY_CONSTRAINTS = (
+    Constraint('Motor speed within bearing speed rating', 'motor', 'speed', 'bearing', 'speed_rating', 'at_most'),
+    Constraint('Seal diameter fits bearing bore', 'bearing', 'bore_diameter', 'seal', 'seal_diameter', 'fits'),
+    Constraint('Gear power transmission covers motor power', 'motor', 'power', 'gear', 'power_transmission', 'at_most'),
+)
+
+# Missing spec values are read as the criteria engine reads them
+SPEC_DEFAULTS = {'seal_diameter': 30, 'power_transmission': 15}
+
+
+def _spec_values(pairs, field):
+    default = SPEC_DEFAULTS.get(field, 0)
+    return [getattr(component.specification, field) or default for component, _ in pairs]
+
+
+def _window(relation, value, values, reverse):
+    """[left, right) of the ascending values compatible with value"""
+    if relation == 'fits':
+        return (
+            bisect_left(values, value - SHAFT_FIT_TOLERANCE_MM),
+            bisect_right(values, value + SHAFT_FIT_TOLERANCE_MM),
+        )
+    if reverse:
+        return 0, bisect_right(values, value)
+    return bisect_left(values, value), len(values)
+
+
+def _supports(relation, values, others, reverse):
+    """For each value, the set of indexes of compatible others"""
+    order = sorted(range(len(others)), key=others.__getitem__)
+    ordered = [others[index] for index in order]
+    supports = []
+    for value in values:
+        left, right = _window(relation, value, ordered, reverse)
+        supports.append(set(order[left:right]))
+    return supports
+
+
+class SearchBudgetExhausted(Exception):
+    pass
+
+
+class AssemblySolver:
+    """
+    Best compatible combinations of per-type candidate lists
+
+    candidates maps each component type to its (component, evaluation)
+    pairs, best first. Candidates are referred to by their index in that
+    list, so every domain stays ordered best first.
+    """
+
+    def __init__(self, candidates, constraints=ASSEMBLY_CONSTRAINTS):
+        self.candidates = candidates
+        self.types = list(candidates)
+        self.constraints = [
+            constraint for constraint in constraints
+            if constraint.first in candidates and constraint.second in candidates
+        ]
+        self.scores = {
+            component_type: [evaluation['match_score'] for _, evaluation in pairs]
+            for component_type, pairs in candidates.items()
+        }
+        self.domains = {
+            component_type: list(range(len(pairs)))
+            for component_type, pairs in candidates.items()
+        }
+
+        # supports[(x, y)][i]: candidates of y compatible with candidate i of x
+        self.supports = {}
+        self.neighbours = {component_type: [] for component_type in self.types}
+        for constraint in self.constraints:
+            first = _spec_values(candidates[constraint.first], constraint.first_field)
+            second = _spec_values(candidates[constraint.second], constraint.second_field)
+            self._add_supports(
+                constraint.first, constraint.second,
+                _supports(constraint.relation, first, second, reverse=False),
+            )
+            self._add_supports(
+                constraint.second, constraint.first,
+                _supports(constraint.relation, second, first, reverse=True),
+            )
+
+        self.nodes = 0
+        self.exhaustive = True
+
+    def _add_supports(self, x, y, supports):
+        if (x, y) in self.supports:
+            # Two constraints on one pair: compatible only if both hold
+            supports = [both & new for both, new in zip(self.supports[(x, y)], supports)]
+        else:
+            self.neighbours[x].append(y)
+        self.supports[(x, y)] = supports
+
+    def propagate(self):
+        """Make every domain arc consistent (AC-3); returns False if one empties"""
+        queue = deque(self.supports)
+        queued = set(queue)
+        while queue:
+            x, y = queue.popleft()
+            queued.discard((x, y))
+            remaining = set(self.domains[y])
+            supported = [i for i in self.domains[x] if not self.supports[(x, y)][i].isdisjoint(remaining)]
+            if len(supported) == len(self.domains[x]):
+                continue
+            self.domains[x] = supported
+            if not supported:
+                return False
+            for z in self.neighbours[x]:
+                if z != y and (z, x) not in queued:
+                    queue.append((z, x))
+                    queued.add((z, x))
+        return True
+
+    def solve(self, k, max_nodes):
+        """
+        Return [(total match score, {component type: candidate index})] of
+        the best k combinations, best first
+
+        Ties keep the combination found first, i.e. the one with the higher
+        ranked candidates. If the search visits more than max_nodes nodes it
+        stops and sets self.exhaustive to False.
+        """
+        self.nodes = 0
+        self.exhaustive = True
+        if not all(self.domains.values()) or not self.propagate():
+            return []
+
+        # Most constrained types first, so forward checking prunes early
+        order = sorted(self.types, key=lambda t: (-len(self.neighbours[t]), len(self.domains[t])))
+        best = []  # min-heap of (score, -sequence, assignment)
+        sequence = 0
+
+        def search(depth, assignment, score, domains):
+            nonlocal sequence
+            self.nodes += 1
+            if self.nodes > max_nodes:
+                raise SearchBudgetExhausted
+            if depth == len(order):
+                entry = (score, -sequence, dict(assignment))
+                sequence += 1
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+                return
+
+            component_type = order[depth]
+            rest = order[depth + 1:]
+            rest_bound = sum(self.scores[t][domains[t][0]] for t in rest)
+            open_neighbours = [t for t in self.neighbours[component_type] if t not in assignment]
+            for i in domains[component_type]:
+                candidate_score = score + self.scores[component_type][i]
+                # Domains are best first, so no later candidate does better
+                if len(best) == k and candidate_score + rest_bound <= best[0][0]:
+                    break
+
+                narrowed = dict(domains)
+                for neighbour in open_neighbours:
+                    compatible = self.supports[(component_type, neighbour)][i]
+                    narrowed[neighbour] = [j for j in narrowed[neighbour] if j in compatible]
+                    if not narrowed[neighbour]:
+                        break
+                else:
+                    bound = candidate_score + sum(self.scores[t][narrowed[t][0]] for t in rest)
+                    if len(best) < k or bound > best[0][0]:
+                        assignment[component_type] = i
+                        search(depth + 1, assignment, candidate_score, narrowed)
+                        del assignment[component_type]
+
+        try:
+            search(0, {}, 0, dict(self.domains))
+        except SearchBudgetExhausted:
+            self.exhaustive = False
+
+        return [
+            (score, assignment)
+            for score, _, assignment in sorted(best, reverse=True)
+        ]
+
+
+def solve_assembly(forms, candidates_per_type, k, max_nodes):
+    """
+    Rank each component type's form and return the best compatible sets
+
+    forms maps component type -> requirement form. Returns (assemblies,
+    solver), each assembly a (mean match score, {component type:
+    (component, evaluation)}) pair, best first.
+    """
+    candidates = {
+        component_type: rank_components(component_type, form_data, candidates_per_type)[0]
+        for component_type, form_data in forms.items()
+    }
+    solver = AssemblySolver(candidates)
+    assemblies = [
+        (
+            round(score / len(candidates)),
+            {
+                component_type: candidates[component_type][index]
+                for component_type, index in assignment.items()
+            },
+        )
+        for score, assignment in solver.solve(k, max_nodes)
+    ]
+    return assemblies, solver
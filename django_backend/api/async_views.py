@@ -0,0 +1,242 @@
+"""
+Async (ASGI) variants of the selection, catalog and cart endpoints
+
+These mirror the DRF views in views.py but run natively on the event loop,
+using Django's async ORM methods so workers are not blocked on database I/O.
+Selection ranking is offloaded to a bounded thread pool.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.http import HttpResponse
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from parts.models import Component, Cart
+from api.renderers import CompactSelectionRenderer, FastJSONRenderer
+from api.carts import cart_session_id, add_to_cart, remove_from_cart
+from api.fast_serializers import component_values, serialize_component_rows, serialize_cart
+from api.filters import range_filter_q
+from api.selection_request import (
+    has_components, run_selection, selection_error, streaming_selection_response,
+)
+from api.selection_stream import astream_selection
+
+
+_scoring_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_SCORING_WORKERS,
+    thread_name_prefix='scoring',
+)
+
+ORDERING_FIELDS = ['rating', 'created_at']
+
+
+def async_csrf_exempt(view_func):
+    """Mark an async view as CSRF exempt (matches DRF's @api_view behaviour)"""
+    view_func.csrf_exempt = True
+    return view_func
+
+
+def json_response(data, status=200):
+    """JSON response rendered with the API's fast renderer"""
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type='application/json'
+    )
+
+
+def _parse_body(request):
+    if not request.body:
+        return {}
+    return json.loads(request.body)
+
+
+def _wants_compact(request):
+    """The compact encoding is asked for as in select_parts (Accept or ?format=compact)"""
+    if 'format' in request.GET:
+        return request.GET['format'] == CompactSelectionRenderer.format
+    return CompactSelectionRenderer.media_type in request.headers.get('Accept', '')
+
+
+def _run_selection(component_type, form_data):
+    """run_selection on a scoring thread, with the request's connection handling"""
+    close_old_connections()
+    try:
+        return run_selection(component_type, form_data)
+    finally:
+        close_old_connections()
+
+
+@async_csrf_exempt
+async def select_parts_async(request):
+    """
+    Async variant of select_parts
+
+    Accepts the same request body and query parameters (?stream=,
+    ?format=compact) and returns the same response; both go through
+    api.selection_request. Ranking runs on a bounded thread pool, so the
+    event loop is not blocked.
+    """
+    if request.method != 'POST':
+        return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    try:
+        form_data = _parse_body(request)
+    except ValueError:
+        return json_response({'error': 'Invalid JSON body'}, status=400)
+    if not isinstance(form_data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}, status=400)
+
+    try:
+        stream = request.GET.get('stream')
+        error = selection_error(form_data, stream)
+        if error:
+            return json_response({'error': error}, status=400)
+        component_type = form_data['componentType']
+
+        if stream:
+            if not await sync_to_async(has_components)(component_type):
+                return json_response(
+                    {'error': f'No components found for type: {component_type}'},
+                    status=404
+                )
+            return streaming_selection_response(
+                stream, astream_selection(stream, component_type, form_data)
+            )
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            _scoring_executor, _run_selection, component_type, form_data
+        )
+        if result is None:
+            return json_response(
+                {'error': f'No components found for type: {component_type}'},
+                status=404
+            )
+
+        if _wants_compact(request):
+            # The compact header carries the catalog version, read from the database
+            content = await sync_to_async(CompactSelectionRenderer().render)(result)
+            return HttpResponse(content, content_type=CompactSelectionRenderer.media_type)
+        return json_response(result)
+
+    except Exception as e:
+        return json_response({'error': f'Error processing request: {str(e)}'}, status=500)
+
+
+async def component_list_async(request):
+    """
+    Async variant of the component list endpoint
+
+    Supports the same component_type, manufacturer, range, search, ordering
+    and page query parameters, and returns the same paginated response shape.
+    """
+    if request.method != 'GET':
+        return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    params = request.GET
+    queryset = Component.objects.all()
+
+    for field in ('component_type', 'manufacturer'):
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+
+    try:
+        condition = range_filter_q(params)
+    except ValidationError as exc:
+        return json_response(exc.detail, status=400)
+    if condition:
+        queryset = queryset.filter(condition)
+
+    search = params.get('search')
+    if search:
+        for term in search.replace(',', ' ').split():
+            queryset = queryset.filter(
+                Q(name__icontains=term)
+                | Q(part_number__icontains=term)
+                | Q(manufacturer__icontains=term)
+            )
+
+    ordering = [
+        field for field in params.get('ordering', '').split(',')
+        if field.lstrip('-') in ORDERING_FIELDS
+    ]
+    queryset = queryset.order_by(*(ordering or ['-rating']))
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    try:
+        page = int(params.get('page', 1))
+    except ValueError:
+        page = 0
+
+    count = await queryset.acount()
+    last_page = max(1, -(-count // page_size))
+    if page < 1 or page > last_page:
+        return json_response({'detail': 'Invalid page.'}, status=404)
+
+    offset = (page - 1) * page_size
+    rows = [
+        row async for row in component_values(queryset)[offset:offset + page_size].aiterator()
+    ]
+    loop = asyncio.get_running_loop()
+    results = await loop.run_in_executor(_scoring_executor, serialize_component_rows, rows)
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if page < last_page else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+
+    return json_response({
+        'count': count,
+        'next': next_url,
+        'previous': previous_url,
+        'results': results,
+    })
+
+
+@async_csrf_exempt
+async def shopping_cart_async(request, session_id=None):
+    """
+    Async variant of shopping_cart
+
+    GET: Retrieve cart
+    POST: Add component to cart
+    DELETE: Remove from cart
+    """
+    session_id = await sync_to_async(cart_session_id)(request, session_id)
+
+    try:
+        if request.method == 'GET':
+            cart, created = await Cart.objects.aget_or_create(session_id=session_id)
+            return json_response(serialize_cart(cart))
+
+        elif request.method == 'POST':
+            try:
+                component_data = _parse_body(request)
+            except ValueError:
+                return json_response({'error': 'Invalid JSON body'}, status=400)
+
+            cart = await sync_to_async(add_to_cart)(session_id, component_data)
+            return json_response(serialize_cart(cart), status=201)
+
+        elif request.method == 'DELETE':
+            try:
+                component_id = int(request.GET.get('component_id'))
+            except (TypeError, ValueError):
+                return json_response({'error': 'component_id is required'}, status=400)
+
+            cart = await sync_to_async(remove_from_cart)(session_id, component_id)
+            return json_response(serialize_cart(cart))
+
+        return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+
+    except Cart.DoesNotExist:
+        return json_response({'error': 'Cart not found'}, status=404)
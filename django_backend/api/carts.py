@@ -0,0 +1,49 @@
+"""
+Shopping cart helpers shared by the sync and async cart endpoints
+"""
+from parts.models import Cart
+
+
+def cart_session_id(request, session_id=None):
+    """
+    Cart key for a request: the client's own Django session key (created on
+    first use and sent back as the session cookie)
+    
+    Staff users may address any cart with a session_id query parameter or
+    URL argument; for everyone else it is ignored, so a cart can only be
+    read or changed by the session it belongs to.
+    """
+    session_id = request.GET.get('session_id') or session_id
+    user = getattr(request, 'user', None)
+    if session_id and user is not None and user.is_staff:
+        return session_id
+    
+    session = request.session
+    if session.session_key is None:
+        session.save()
+        session.modified = True  # make SessionMiddleware send the cookie
+    return session.session_key
+
+
+def cart_item(component_data):
+    return {
+        'component_id': component_data.get('component_id'),
+        'name': component_data.get('name'),
+        'quantity': component_data.get('quantity', 1),
+        'price': component_data.get('price'),
+        'manufacturer': component_data.get('manufacturer'),
+    }
+
+
+def add_to_cart(session_id, component_data):
+    item = cart_item(component_data)
+    return Cart.update_components(session_id, lambda components: components + [item])
+
+
+def remove_from_cart(session_id, component_id):
+    """Remove every line of one component; raises Cart.DoesNotExist for unknown carts"""
+    return Cart.update_components(
+        session_id,
+        lambda components: [c for c in components if c.get('component_id') != component_id],
+        create=False,
+    )
@@ -0,0 +1,167 @@
+"""
+Streaming full-catalog export
+
+Components joined with their specification are read in chunks through a
+server-side cursor and written incrementally as Parquet or Arrow IPC (when
+pyarrow is installed) or gzip'd JSON-lines, so memory stays flat however
+large the catalog is.
+"""
+import json
+import zlib
+from datetime import timezone as dt_timezone
+
+from django.db.models import F
+
+from parts.models import Component, ComponentSpecification
+from api.fast_serializers import COMPONENT_FIELDS, COMPONENT_TIMESTAMPS, format_datetime
+from api.streaming import ChunkSink
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional; fall back to JSON-lines
+    pyarrow = None
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+SPEC_EXPORT_FIELDS = [
+    field.name for field in ComponentSpecification._meta.concrete_fields
+    if not field.primary_key and not field.is_relation
+    and field.name not in ('component_type', 'created_at', 'updated_at')
+]
+LIST_FIELDS = ['specifications', 'pros', 'cons', 'alternatives']
+
+EXPORT_FORMATS = {
+    # name: (content type, file extension, needs pyarrow)
+    'parquet': ('application/vnd.apache.parquet', 'parquet', True),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows', True),
+    'jsonl': ('application/gzip', 'jsonl.gz', False),
+}
+
+
+def available_formats():
+    return [name for name, (_, _, needs_arrow) in EXPORT_FORMATS.items() if pyarrow or not needs_arrow]
+
+
+def default_format():
+    return available_formats()[0]
+
+
+def export_queryset(component_type=None):
+    """Flat Component + specification rows, one per component, in id order"""
+    queryset = Component.objects.order_by('id')
+    if component_type:
+        queryset = queryset.filter(component_type=component_type.lower())
+    return queryset.values(
+        *COMPONENT_FIELDS, *COMPONENT_TIMESTAMPS,
+        **{name: F(f'specification__{name}') for name in SPEC_EXPORT_FIELDS}
+    )
+
+
+def iter_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of at most chunk_size rows from a server-side cursor"""
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_jsonl_gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        lines = []
+        for row in chunk:
+            row['created_at'] = format_datetime(row['created_at'])
+            row['updated_at'] = format_datetime(row['updated_at'])
+            lines.append(json.dumps(row, separators=(',', ':')))
+        data = compressor.compress(('\n'.join(lines) + '\n').encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def arrow_schema():
+    fields = [
+        ('id', pyarrow.int64()),
+        ('component_type', pyarrow.string()),
+        ('name', pyarrow.string()),
+        ('manufacturer', pyarrow.string()),
+        ('part_number', pyarrow.string()),
+        ('price', pyarrow.string()),
+        ('availability', pyarrow.string()),
+        ('lead_time', pyarrow.string()),
+        ('rating', pyarrow.float64()),
+        # List columns hold arbitrary JSON, so they are exported as JSON text
+        ('specifications', pyarrow.string()),
+        ('pros', pyarrow.string()),
+        ('cons', pyarrow.string()),
+        ('alternatives', pyarrow.string()),
+        ('vendor_url', pyarrow.string()),
+        ('created_at', pyarrow.timestamp('us', tz='UTC')),
+        ('updated_at', pyarrow.timestamp('us', tz='UTC')),
+    ]
+    for field in ComponentSpecification._meta.concrete_fields:
+        if field.name in SPEC_EXPORT_FIELDS:
+            internal_type = field.get_internal_type()
+            if internal_type == 'FloatField':
+                arrow_type = pyarrow.float64()
+            elif internal_type.endswith('IntegerField'):
+                arrow_type = pyarrow.int64()
+            else:
+                arrow_type = pyarrow.string()
+            fields.append((field.name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+def record_batch(schema, chunk):
+    """Pivot a chunk of rows into an Arrow record batch"""
+    columns = []
+    for name in schema.names:
+        values = [row[name] for row in chunk]
+        if name in LIST_FIELDS:
+            values = [json.dumps(value) for value in values]
+        elif name in COMPONENT_TIMESTAMPS:
+            values = [value.astimezone(dt_timezone.utc) if value else None for value in values]
+        columns.append(values)
+    return pyarrow.RecordBatch.from_arrays(
+        [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def iter_arrow(chunks, fmt):
+    schema = arrow_schema()
+    sink = ChunkSink()
+    if fmt == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='snappy')
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    for chunk in chunks:
+        batch = record_batch(schema, chunk)
+        if fmt == 'parquet':
+            writer.write_table(pyarrow.Table.from_batches([batch]))
+        else:
+            writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def iter_export(fmt, component_type=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the encoded export as a sequence of byte strings"""
+    if fmt not in available_formats():
+        raise ValueError(f'Unsupported export format: {fmt}')
+
+    chunks = iter_chunks(export_queryset(component_type), chunk_size)
+    if fmt == 'jsonl':
+        return iter_jsonl_gzip(chunks)
+    return iter_arrow(chunks, fmt)
@@ -0,0 +1,223 @@
+"""
+Columnar catalog snapshots for bulk scoring
+Holds the numeric specification columns of one component type as flat arrays
+
+With CATALOG_SNAPSHOT_DIR set, snapshots are compiled to binary files that
+every worker process memory-maps instead of building its own copy.
+"""
+import hashlib
+import math
+import os
+import threading
+from array import array
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from parts.models import ComponentSpecification, CatalogVersion
+from api.criteria_engine import evaluate_criteria
+from api.snapshot_file import read_snapshot_file, rebuild_lock, snapshot_path, write_snapshot_file
+
+
+# Numeric specification fields read by the criteria evaluators
+SNAPSHOT_COLUMNS = [
+    'bore_diameter', 'outer_diameter', 'width', 'dynamic_load_rating',
+    'static_load_rating', 'speed_rating', 'l10_life',
+    'power', 'speed', 'efficiency',
+    'module', 'pressure_angle', 'face_width', 'power_transmission',
+    'seal_diameter', 'pressure_rating', 'temp_min', 'temp_max',
+    'clamp_load_capacity', 'tensile_strength',
+    # parsed from the text fields (parts.normalization)
+    'fastener_diameter_mm', 'voltage_v', 'voltage_phases', 'material_grade_mpa', 'precision_grade_iso',
+]
+
+# Text specification fields, kept in the snapshot file's string table
+STRING_COLUMNS = [
+    'voltage', 'insulation_class', 'frame_size', 'gear_material',
+    'precision_grade', 'elastomer_type', 'fastener_diameter', 'material_grade',
+]
+
+NAN = float('nan')
+
+
+def snapshot_columns(component_type):
+    """The SNAPSHOT_COLUMNS that apply to a component type"""
+    fields = set(ComponentSpecification.fields_for(component_type))
+    return [name for name in SNAPSHOT_COLUMNS if name in fields]
+
+
+def string_columns(component_type):
+    """The STRING_COLUMNS that apply to a component type"""
+    fields = set(ComponentSpecification.fields_for(component_type))
+    return [name for name in STRING_COLUMNS if name in fields]
+
+
+class SnapshotRow:
+    """Read-only spec view over one snapshot row; non-numeric fields read as None"""
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def __getattr__(self, name):
+        return None
+
+
+class CatalogSnapshot:
+    """
+    Specifications of one component type in catalog order (highest rated first)
+
+    ids is a sequence of component ids, columns maps each of the type's
+    snapshot_columns() to a float sequence with NaN standing in for NULL
+    (array('q') / array('d'), or memoryviews of a mapped snapshot file).
+    strings, when loaded, maps each of its string_columns() to a sequence of
+    str or None. Other types' fields read as None, as the evaluator of this
+    type never reads them.
+    """
+
+    def __init__(self, component_type, version, ids, columns, strings=None):
+        self.component_type = component_type
+        self.version = version
+        self.ids = ids
+        self.columns = columns
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row(self, index):
+        """Spec view of one row, including the text fields when loaded"""
+        spec = row_spec(self.columns, index)
+        for name, column in (self.strings or {}).items():
+            setattr(spec, name, column[index])
+        return spec
+
+
+def build_snapshot(component_type, version=None, with_strings=False):
+    """Load the spec columns of one component type from the database"""
+    if version is None:
+        version = CatalogVersion.current()
+
+    numeric_names = snapshot_columns(component_type)
+    string_names = string_columns(component_type) if with_strings else []
+    ids = array('q')
+    columns = {name: array('d') for name in numeric_names}
+    strings = {name: [] for name in string_names}
+    rows = ComponentSpecification.objects.filter(
+        component_type=component_type
+    ).order_by('-component__rating', 'component_id').values_list(
+        'component_id', *numeric_names, *string_names
+    )
+
+    numeric_end = 1 + len(numeric_names)
+    for row in rows.iterator(chunk_size=2000):
+        ids.append(row[0])
+        for name, value in zip(numeric_names, row[1:numeric_end]):
+            columns[name].append(NAN if value is None else value)
+        for name, value in zip(string_names, row[numeric_end:]):
+            strings[name].append(value)
+
+    return CatalogSnapshot(component_type, version, ids, columns, strings if with_strings else None)
+
+
+def snapshot_file_path(component_type):
+    """
+    Snapshot file of a component type, in a subdirectory per database so
+    deployments sharing CATALOG_SNAPSHOT_DIR never read each other's files
+    """
+    database = settings.DATABASES['default']
+    identity = '|'.join(str(database.get(key, '')) for key in ('ENGINE', 'HOST', 'PORT', 'NAME'))
+    directory = os.path.join(settings.CATALOG_SNAPSHOT_DIR, hashlib.sha256(identity.encode()).hexdigest()[:16])
+    return snapshot_path(directory, component_type)
+
+
+def catalog_fingerprint(component_type):
+    """
+    64-bit digest of the row count and latest edits of a component type
+
+    A recreated or restored database reuses catalog version numbers, so a
+    snapshot file is only current if this matches as well as the version.
+    """
+    stats = ComponentSpecification.objects.filter(component_type=component_type).aggregate(
+        rows=Count('pk'), spec_edited=Max('updated_at'), component_edited=Max('component__updated_at'),
+    )
+    digest = hashlib.sha256(repr(sorted(stats.items())).encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+def _current_file(mapped, component_type, version, fingerprint):
+    return (
+        mapped is not None
+        and mapped.version == version
+        and mapped.fingerprint == fingerprint
+        and list(mapped.columns) == snapshot_columns(component_type)
+        and list(mapped.strings) == string_columns(component_type)
+    )
+
+
+def compile_snapshot_file(component_type, version=None, fingerprint=None):
+    """Build a snapshot from the database and write it to CATALOG_SNAPSHOT_DIR"""
+    if fingerprint is None:
+        fingerprint = catalog_fingerprint(component_type)
+    snapshot = build_snapshot(component_type, version, with_strings=True)
+    path = snapshot_file_path(component_type)
+    write_snapshot_file(path, snapshot.version, snapshot.ids, snapshot.columns, snapshot.strings, fingerprint)
+    return path
+
+
+def load_snapshot_file(component_type, version):
+    """
+    Map the snapshot file of a component type, recompiling it first if it
+    is missing or was built for another catalog version or catalog
+    """
+    path = snapshot_file_path(component_type)
+    fingerprint = catalog_fingerprint(component_type)
+    mapped = read_snapshot_file(path)
+    if not _current_file(mapped, component_type, version, fingerprint):
+        with rebuild_lock(path):
+            # Another worker may have rebuilt it while we waited
+            mapped = read_snapshot_file(path)
+            if not _current_file(mapped, component_type, version, fingerprint):
+                compile_snapshot_file(component_type, version, fingerprint)
+                mapped = read_snapshot_file(path)
+
+    return CatalogSnapshot(component_type, mapped.version, mapped.ids, mapped.columns, mapped.strings)
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_catalog_snapshot(component_type):
+    """Return the snapshot for the current catalog version, rebuilding it if stale"""
+    component_type = component_type.lower()
+    version = CatalogVersion.current()
+
+    snapshot = _snapshots.get(component_type)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshots_lock:
+        snapshot = _snapshots.get(component_type)
+        if snapshot is None or snapshot.version != version:
+            if settings.CATALOG_SNAPSHOT_DIR:
+                snapshot = load_snapshot_file(component_type, version)
+            else:
+                snapshot = build_snapshot(component_type, version)
+            _snapshots[component_type] = snapshot
+    return snapshot
+
+
+def row_spec(columns, index):
+    """Build the spec view of one row from column sequences"""
+    values = {}
+    for name, column in columns.items():
+        value = column[index]
+        values[name] = None if math.isnan(value) else value
+    return SnapshotRow(values)
+
+
+def score_rows(component_type, form_data, columns, start, stop):
+    """Yield (position, match_score) for rows in [start, stop)"""
+    for index in range(start, stop):
+        evaluation = evaluate_criteria(component_type, form_data, row_spec(columns, index))
+        yield index, evaluation['match_score']
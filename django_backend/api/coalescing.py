@@ -0,0 +1,97 @@
+"""
+Single-flight coalescing of identical selection requests
+
+Concurrent requests with the same key (canonical form hash and catalog
+version) share one computation. Within a worker the first request computes
+and the others wait on its future. Across workers the computing request
+holds a lock in the shared cache (cache.add) and publishes its result there
+for COALESCE_RESULT_TIMEOUT seconds; only requests in other workers that
+find the lock taken poll for that result instead of ranking the catalog
+again. A request that gets the lock always computes, so repeated requests
+after a computation finished are not counted as coalesced. If the
+lock holder dies, its lock expires after COALESCE_LOCK_TIMEOUT seconds and
+the waiters compute the result themselves.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api import metrics
+
+
+_in_flight = {}  # key -> Future of the request computing it in this worker
+_in_flight_lock = threading.Lock()
+
+
+def coalesce(key, compute):
+    """
+    Return compute(), shared with identical concurrent calls
+
+    key must determine the result completely. The result is shared between
+    requests, so callers must not modify it; an exception raised by compute
+    is raised in every waiting request.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+
+    if not leader:
+        metrics.increment('selections_coalesced')
+        return future.result()
+
+    try:
+        result = _compute_shared(key, compute)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+
+def _compute_shared(key, compute):
+    """compute() under a cross-worker lock, or the result of its holder"""
+    result_key = f'coalesce:result:{key}'
+    lock_key = f'coalesce:lock:{key}'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.COALESCE_LOCK_TIMEOUT
+
+    while True:
+        if cache.add(lock_key, token, settings.COALESCE_LOCK_TIMEOUT):
+            try:
+                result = compute()
+                if result is not None:
+                    cache.set(result_key, result, settings.COALESCE_RESULT_TIMEOUT)
+            finally:
+                # Not if the lock expired and another worker holds it now
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+            metrics.increment('selections_computed')
+            return result
+
+        # Another worker is computing it. Its result is published before the
+        # lock is released, so the lock is checked first.
+        while True:
+            locked = cache.get(lock_key) is not None
+            result = cache.get(result_key)
+            if result is not None:
+                metrics.increment('selections_coalesced_shared')
+                return result
+            if not locked:
+                # Released without a result (compute failed): take the lock
+                break
+            if time.monotonic() >= deadline:
+                metrics.increment('selections_coalesce_timeouts')
+                result = compute()
+                metrics.increment('selections_computed')
+                return result
+            time.sleep(settings.COALESCE_POLL_INTERVAL)
@@ -2,6 +2,11 @@
 Criteria matching engine for COTS component selection
 Evaluates components against engineering requirements
 """
+from parts.normalization import parse_fastener_diameter_mm
+
+
+# Inch sizes converted to mm are rounded; ISO metric sizes compare exactly
+FASTENER_DIAMETER_TOLERANCE_MM = 0.05
 
 
 def evaluate_bearing_criteria(form_data, component_spec):
@@ -362,7 +367,12 @@ def evaluate_fastener_criteria(form_data, component_spec):
     
     # Diameter
     diameter_req = form_data.get('diameter', 'M10')
-    diameter_met = True
+    required_mm = parse_fastener_diameter_mm(diameter_req)
+    diameter_mm = component_spec.fastener_diameter_mm
+    # An unparseable requirement cannot rule anything out
+    diameter_met = required_mm is None or (
+        diameter_mm is not None and abs(diameter_mm - required_mm) <= FASTENER_DIAMETER_TOLERANCE_MM
+    )
     if diameter_met:
         matched_count += 1
     criteria.append({
@@ -0,0 +1,84 @@
+"""
+Datasheet rendering for catalog components against a requirement form
+
+Rendered datasheets are cached on disk keyed by the component's last edit,
+the hash of the requirement form, the output format and the date printed on
+the sheet, so unchanged pairs are served without evaluating or rendering.
+"""
+import io
+import zipfile
+from datetime import date
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
+
+from api.criteria_engine import evaluate_criteria
+from api.disk_cache import DiskLRUCache
+from api.download_handler import generate_datasheet_html, generate_datasheet_text
+from api.materialized import form_key
+from api.selection import build_recommendation
+
+
+DATASHEET_FORMATS = {
+    # name: (renderer, content type, file extension)
+    'text': (generate_datasheet_text, 'text/plain; charset=utf-8', 'txt'),
+    'html': (generate_datasheet_html, 'text/html; charset=utf-8', 'html'),
+}
+
+_cache = None
+
+
+def get_datasheet_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(settings.DATASHEET_CACHE_DIR, settings.DATASHEET_CACHE_MAX_BYTES)
+    return _cache
+
+
+def datasheet_data(component, form_data):
+    """Evaluate a component and build the datasheet input (download-specs shape)"""
+    component_type = component.component_type
+    evaluation = evaluate_criteria(component_type, form_data, component.specification)
+    recommendation = build_recommendation(component_type, form_data, component, evaluation)
+    return {
+        'componentName': recommendation['name'],
+        'manufacturer': recommendation['manufacturer'],
+        'componentType': component_type,
+        'specifications': recommendation['specifications'],
+        'criteriaMatches': recommendation['criteriaMatches'],
+        'performanceMetrics': recommendation['performanceMetrics'],
+    }
+
+
+def datasheet_filename(component, output):
+    """File name for a datasheet; part numbers come from imported catalogs"""
+    return get_valid_filename(f'{component.part_number}-datasheet.{DATASHEET_FORMATS[output][2]}')
+
+
+def render_datasheet(component, form_data, output):
+    """Return the rendered datasheet bytes, from the disk cache when unchanged"""
+    renderer = DATASHEET_FORMATS[output][0]
+    edited = max(component.updated_at, component.specification.updated_at)
+    key = ':'.join([
+        'datasheet', output, str(component.pk), edited.isoformat(),
+        form_key(form_data), date.today().isoformat(),
+    ])
+
+    cache = get_datasheet_cache()
+    content = cache.get(key)
+    if content is None:
+        content = renderer(datasheet_data(component, form_data)).encode('utf-8')
+        cache.set(key, content)
+    return content
+
+
+def datasheet_bundle(components, form_data, output):
+    """ZIP archive with one datasheet per component"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for component in components:
+            archive.writestr(
+                datasheet_filename(component, output),
+                render_datasheet(component, form_data, output)
+            )
+    return buffer.getvalue()
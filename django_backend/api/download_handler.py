@@ -1,8 +1,10 @@
 """
-CSV generation for component specifications and BOM
+CSV generation for component specifications and BOM, and datasheet rendering
 """
 from datetime import datetime
 
+from django.template import Context, Engine
+
 
 def generate_specs_csv(data):
     """Generate specifications CSV from component data"""
@@ -106,71 +108,107 @@ def generate_bom_csv(data):
     return '\n'.join(csv_lines)
 
 
+# Datasheet templates, built once at import
+HEAVY_RULE = "═" * 55
+LIGHT_RULE = "─" * 55
+
+DATASHEET_TEXT_TITLE = f"{HEAVY_RULE}\n           COMPONENT TECHNICAL DATASHEET\n{HEAVY_RULE}\n"
+DATASHEET_TEXT_SPECIFICATIONS = f"\n{LIGHT_RULE}\nTECHNICAL SPECIFICATIONS\n{LIGHT_RULE}"
+DATASHEET_TEXT_COMPLIANCE = f"\n{LIGHT_RULE}\nREQUIREMENTS COMPLIANCE\n{LIGHT_RULE}"
+DATASHEET_TEXT_PERFORMANCE = f"{LIGHT_RULE}\nPERFORMANCE ANALYSIS\n{LIGHT_RULE}"
+DATASHEET_TEXT_FOOTER = f"\n{HEAVY_RULE}"
+
+DATASHEET_HTML_TEMPLATE = Engine().from_string("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{{ component_name }} - Technical Datasheet</title>
+<style>
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 1.5em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+.met { color: #1a7f37; } .not-met { color: #cf222e; }
+</style>
+</head>
+<body>
+<h1>Component Technical Datasheet</h1>
+<table>
+<tr><th>Component</th><td>{{ component_name }}</td></tr>
+<tr><th>Manufacturer</th><td>{{ manufacturer }}</td></tr>
+<tr><th>Type</th><td>{{ component_type }}</td></tr>
+<tr><th>Generated</th><td>{{ generated }}</td></tr>
+</table>
+<h2>Technical Specifications</h2>
+<ul>{% for spec in specifications %}
+<li>{{ spec }}</li>{% endfor %}
+</ul>
+<h2>Requirements Compliance</h2>
+<table>
+<tr><th></th><th>Criterion</th><th>Weight</th><th>Requirement</th><th>Your Input</th></tr>{% for criteria in criteria_matches %}
+<tr class="{{ criteria.met|yesno:'met,not-met' }}"><td>{{ criteria.met|yesno:'✓,✗' }}</td><td>{{ criteria.name }}</td><td>{{ criteria.weight|upper }}</td><td>{{ criteria.requirement }}</td><td>{{ criteria.value }}</td></tr>{% endfor %}
+</table>
+<h2>Performance Analysis</h2>
+<table>
+<tr><th>Metric</th><th>Value</th><th>Target</th><th>Status</th></tr>{% for metric in performance_metrics %}
+<tr class="{{ metric.met|yesno:'met,not-met' }}"><td>{{ metric.label }}</td><td>{{ metric.value }}</td><td>{{ metric.target }}</td><td>{{ metric.met|yesno:'PASS,MARGINAL' }}</td></tr>{% endfor %}
+</table>
+</body>
+</html>
+""")
+
+
+def _datasheet_context(data):
+    return {
+        'component_name': data.get('componentName', 'Component'),
+        'manufacturer': data.get('manufacturer', 'Unknown'),
+        'component_type': data.get('componentType', 'unknown'),
+        'generated': datetime.now().strftime('%Y-%m-%d'),
+        'specifications': data.get('specifications', []),
+        'criteria_matches': data.get('criteriaMatches', []),
+        'performance_metrics': data.get('performanceMetrics', []),
+    }
+
+
 def generate_datasheet_text(data):
     """Generate detailed text datasheet"""
-    component_name = data.get('componentName', 'Component')
-    manufacturer = data.get('manufacturer', 'Unknown')
-    specifications = data.get('specifications', [])
-    criteria_matches = data.get('criteriaMatches', [])
-    performance_metrics = data.get('performanceMetrics', [])
-    component_type = data.get('componentType', 'unknown')
+    context = _datasheet_context(data)
     
     text_lines = [
-        "═" * 55,
-        "           COMPONENT TECHNICAL DATASHEET",
-        "═" * 55,
-        "",
-        f"Component:        {component_name}",
-        f"Manufacturer:     {manufacturer}",
-        f"Type:             {component_type}",
-        f"Generated:        {datetime.now().strftime('%Y-%m-%d')}",
-        "",
-        "─" * 55,
-        "TECHNICAL SPECIFICATIONS",
-        "─" * 55,
+        DATASHEET_TEXT_TITLE,
+        f"Component:        {context['component_name']}\n"
+        f"Manufacturer:     {context['manufacturer']}\n"
+        f"Type:             {context['component_type']}\n"
+        f"Generated:        {context['generated']}",
+        DATASHEET_TEXT_SPECIFICATIONS,
     ]
     
-    for spec in specifications:
+    for spec in context['specifications']:
         text_lines.append(f"• {spec}")
     
-    text_lines.extend([
-        "",
-        "─" * 55,
-        "REQUIREMENTS COMPLIANCE",
-        "─" * 55,
-    ])
+    text_lines.append(DATASHEET_TEXT_COMPLIANCE)
     
-    for criteria in criteria_matches:
+    for criteria in context['criteria_matches']:
         status = "✓" if criteria.get('met') else "✗"
-        name = criteria.get('name', '')
-        requirement = criteria.get('requirement', '')
-        value = criteria.get('value', '')
-        weight = criteria.get('weight', '').upper()
-        
-        text_lines.extend([
-            f"{status} {name} ({weight})",
-            f"    Requirement: {requirement}",
-            f"    Your Input:  {value}",
-            "",
-        ])
-    
-    text_lines.extend([
-        "─" * 55,
-        "PERFORMANCE ANALYSIS",
-        "─" * 55,
-    ])
+        text_lines.append(
+            f"{status} {criteria.get('name', '')} ({criteria.get('weight', '').upper()})\n"
+            f"    Requirement: {criteria.get('requirement', '')}\n"
+            f"    Your Input:  {criteria.get('value', '')}\n"
+        )
     
-    for metric in performance_metrics:
+    text_lines.append(DATASHEET_TEXT_PERFORMANCE)
+    
+    for metric in context['performance_metrics']:
         status = "PASS" if metric.get('met') else "MARGINAL"
-        label = metric.get('label', '')
-        value = metric.get('value', '')
-        target = metric.get('target', '')
-        
-        text_lines.append(f"• {label}: {value} (Target: {target}) - {status}")
+        text_lines.append(
+            f"• {metric.get('label', '')}: {metric.get('value', '')} "
+            f"(Target: {metric.get('target', '')}) - {status}"
+        )
     
-    text_lines.extend([
-        "",
-        "═" * 55,
-    ])
+    text_lines.append(DATASHEET_TEXT_FOOTER)
     
     return '\n'.join(text_lines)
+
+
+def generate_datasheet_html(data):
+    """Generate the datasheet as a standalone HTML page"""
+    return DATASHEET_HTML_TEMPLATE.render(Context(_datasheet_context(data)))
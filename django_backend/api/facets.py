@@ -0,0 +1,82 @@
+"""
+Faceted counts for the component list
+
+Counts per manufacturer, availability and rating bucket come from one
+GROUP BY over the three columns, folded into the three facets here. Results
+are cached per catalog version and normalized query string, so catalog edits
+never serve stale counts.
+"""
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Value
+from django.db.models.functions import Floor, Least
+
+from parts.models import CatalogVersion
+
+
+# Query parameters that do not change the filtered set
+IGNORED_PARAMS = {'page', 'page_size', 'ordering', 'format'}
+
+
+def facet_cache_key(params, version):
+    """Cache key for the facets of one filter, independent of parameter order"""
+    items = sorted(
+        (key, value)
+        for key in params if key not in IGNORED_PARAMS
+        for value in params.getlist(key)
+    )
+    query = '&'.join(f'{key}={value}' for key, value in items)
+    return f'facets:{version}:{hashlib.sha256(query.encode()).hexdigest()}'
+
+
+def _facet(counter):
+    return [
+        {'value': value, 'count': count}
+        for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+    ]
+
+
+def facet_counts(queryset):
+    """Total and per-facet counts of a filtered Component queryset"""
+    rows = (
+        queryset.order_by()
+        # Ratings run 0-5, so 5.0 shares the top bucket with 4.x
+        .annotate(rating_bucket=Least(Floor('rating'), Value(4.0)))
+        .values('manufacturer', 'availability', 'rating_bucket')
+        .annotate(count=Count('id'))
+    )
+
+    manufacturers = Counter()
+    availability = Counter()
+    ratings = Counter()
+    total = 0
+    for row in rows:
+        manufacturers[row['manufacturer']] += row['count']
+        availability[row['availability']] += row['count']
+        ratings[int(row['rating_bucket'])] += row['count']
+        total += row['count']
+
+    return {
+        'count': total,
+        'facets': {
+            'manufacturer': _facet(manufacturers),
+            'availability': _facet(availability),
+            'rating': [
+                {'from': bucket, 'to': bucket + 1, 'count': ratings[bucket]}
+                for bucket in sorted(ratings, reverse=True)
+            ],
+        },
+    }
+
+
+def cached_facet_counts(queryset, params):
+    """facet_counts, cached until the catalog version changes"""
+    key = facet_cache_key(params, CatalogVersion.current())
+    result = cache.get(key)
+    if result is None:
+        result = facet_counts(queryset)
+        cache.set(key, result, settings.FACET_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,100 @@
+"""
+Lightweight read-only serializers for read-heavy endpoints
+
+Build the same output as ComponentSerializer and CartSerializer from
+.values() rows or model instances with plain dict building, skipping DRF's
+per-field machinery. Keep the field lists in step with serializers.py.
+"""
+from django.conf import settings
+from django.utils import timezone
+
+from parts.models import ComponentSpecification
+
+
+# ComponentSerializer.Meta.fields, without the nested specification
+COMPONENT_FIELDS = [
+    'id', 'component_type', 'name', 'manufacturer', 'part_number',
+    'price', 'availability', 'lead_time', 'rating', 'specifications',
+    'pros', 'cons', 'alternatives', 'vendor_url',
+]
+COMPONENT_TIMESTAMPS = ['created_at', 'updated_at']
+
+# ComponentSpecificationSerializer field order for fields = '__all__':
+# pk, concrete fields, then the component relation (as its pk)
+SPEC_FIELDS = ['id'] + [
+    field.name for field in ComponentSpecification._meta.concrete_fields
+    if not field.primary_key and not field.is_relation
+] + ['component']
+
+FLOAT_SPEC_FIELDS = {
+    field.name for field in ComponentSpecification._meta.concrete_fields
+    if field.get_internal_type() == 'FloatField'
+}
+
+
+def format_datetime(value):
+    """Match rest_framework.fields.DateTimeField.to_representation (ISO 8601)"""
+    if not value:
+        return None
+    if settings.USE_TZ:
+        current = timezone.get_current_timezone()
+        value = value.astimezone(current) if timezone.is_aware(value) else timezone.make_aware(value, current)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def serialize_specification_row(row):
+    """Serialize a ComponentSpecification .values() row"""
+    data = {}
+    for name in SPEC_FIELDS:
+        value = row[name]
+        if value is not None:
+            if name in FLOAT_SPEC_FIELDS:
+                value = float(value)
+            elif name in ('created_at', 'updated_at'):
+                value = format_datetime(value)
+        data[name] = value
+    return data
+
+
+def serialize_component_rows(rows):
+    """
+    Serialize Component .values(*COMPONENT_FIELDS, *COMPONENT_TIMESTAMPS) rows
+    like ComponentSerializer(many=True), loading specifications in one query
+    """
+    rows = list(rows)
+    specifications = {
+        row['component']: serialize_specification_row(row)
+        for row in ComponentSpecification.objects.filter(
+            component_id__in=[row['id'] for row in rows]
+        ).values(*SPEC_FIELDS)
+    }
+
+    results = []
+    for row in rows:
+        data = {name: row[name] for name in COMPONENT_FIELDS}
+        if data['rating'] is not None:
+            data['rating'] = float(data['rating'])
+        data['specification'] = specifications.get(row['id'])
+        data['created_at'] = format_datetime(row['created_at'])
+        data['updated_at'] = format_datetime(row['updated_at'])
+        results.append(data)
+    return results
+
+
+def component_values(queryset):
+    """Restrict a Component queryset to the rows needed by serialize_component_rows"""
+    return queryset.prefetch_related(None).values(*COMPONENT_FIELDS, *COMPONENT_TIMESTAMPS)
+
+
+def serialize_cart(cart):
+    """Serialize a Cart instance like CartSerializer"""
+    return {
+        'id': cart.id,
+        'session_id': cart.session_id,
+        'components': cart.components,
+        'created_at': format_datetime(cart.created_at),
+        'updated_at': format_datetime(cart.updated_at),
+    }
@@ -0,0 +1,70 @@
+"""
+Numeric range filters for the component list
+
+Any numeric spec field (and rating / lead_time_days on the component) can be
+filtered with a lookup suffix, e.g.:
+    ?bore_diameter__gte=20&power__range=1.5,7.5&pressure_rating__gt=50
+Values that are not numbers are rejected with a 400.
+"""
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from parts.models import Component, ComponentSpecification
+
+
+RANGE_LOOKUPS = ('gte', 'lte', 'gt', 'lt', 'range')
+NUMERIC_TYPES = ('FloatField', 'IntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField')
+
+# Query parameter field name -> ORM path from Component
+RANGE_FIELDS = {
+    field.name: f'specification__{field.name}'
+    for field in ComponentSpecification._meta.concrete_fields
+    if field.get_internal_type() in NUMERIC_TYPES and not field.primary_key
+}
+RANGE_FIELDS.update({
+    field.name: field.name
+    for field in Component._meta.concrete_fields
+    if field.get_internal_type() in NUMERIC_TYPES and not field.primary_key
+})
+
+
+def _number(param, value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValidationError({param: [f'"{value}" is not a number.']})
+    if number != number or number in (float('inf'), float('-inf')):
+        raise ValidationError({param: [f'"{value}" is not a finite number.']})
+    return number
+
+
+def range_filter_q(params):
+    """
+    Build the Q for every range parameter in a query dict
+
+    Parameters that are not <numeric field>__<lookup> are ignored. Raises
+    rest_framework ValidationError for malformed values.
+    """
+    condition = Q()
+    for param, value in params.items():
+        name, _, lookup = param.rpartition('__')
+        if lookup not in RANGE_LOOKUPS or name not in RANGE_FIELDS:
+            continue
+        if lookup == 'range':
+            bounds = value.split(',')
+            if len(bounds) != 2:
+                raise ValidationError({param: ['Expected two comma-separated numbers.']})
+            value = [_number(param, bound) for bound in bounds]
+        else:
+            value = _number(param, value)
+        condition &= Q(**{f'{RANGE_FIELDS[name]}__{lookup}': value})
+    return condition
+
+
+class SpecRangeFilterBackend(BaseFilterBackend):
+    """Apply the numeric range parameters to a Component queryset"""
+
+    def filter_queryset(self, request, queryset, view):
+        condition = range_filter_q(request.query_params)
+        return queryset.filter(condition) if condition else queryset
@@ -0,0 +1,99 @@
+"""
+Benchmark JSON rendering and parsing of the heaviest API payloads
+
+Compares DRF's stdlib JSONRenderer/JSONParser with the orjson-backed
+FastJSONRenderer/FastJSONParser on a ComponentViewSet list page and a
+select_parts response built from the current database, and
+ComponentSerializer with the lightweight list serializer:
+    python manage.py benchmark_json --iterations 200
+"""
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from parts.models import Component
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from api.fast_serializers import component_values, serialize_component_rows
+from api.serializers import ComponentSerializer
+from api.selection import score_components, build_recommendation
+
+
+class Command(BaseCommand):
+    help = 'Benchmark stdlib vs fast JSON rendering for component list and selection payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--component-type', default='bearing')
+        parser.add_argument('--form', help='Path to a JSON requirement form for select_parts')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not installed, FastJSONRenderer falls back to the stdlib'
+            ))
+
+        component_type = options['component_type']
+        form = {'componentType': component_type}
+        if options['form']:
+            with open(options['form']) as f:
+                form = json.load(f)
+
+        components = list(
+            Component.objects.select_related('specification')[:options['page_size']]
+        )
+        if not components:
+            raise CommandError('No components in the database')
+
+        list_payload = {
+            'count': len(components), 'next': None, 'previous': None,
+            'results': ComponentSerializer(components, many=True).data,
+        }
+
+        catalog = Component.objects.filter(
+            component_type=component_type
+        ).select_related('specification').order_by('-rating', 'id')
+        ranked = score_components(component_type, form, catalog)
+        select_payload = {
+            'recommendations': [
+                build_recommendation(component_type, form, component, evaluation)
+                for component, evaluation in ranked[:3]
+            ],
+            'totalMatches': len(ranked),
+            'timestamp': '2024-01-01T00:00:00',
+        }
+
+        iterations = options['iterations']
+        self.stdout.write(f'{"payload":28} {"stdlib ms":>10} {"fast ms":>10} {"speedup":>8}')
+        for label, payload in (('component list (render)', list_payload),
+                               ('select_parts (render)', select_payload)):
+            before = self.time(lambda: JSONRenderer().render(payload), iterations)
+            after = self.time(lambda: FastJSONRenderer().render(payload), iterations)
+            self.report(label, before, after)
+
+        body = JSONRenderer().render(form)
+        before = self.time(lambda: JSONParser().parse(io.BytesIO(body)), iterations)
+        after = self.time(lambda: FastJSONParser().parse(io.BytesIO(body)), iterations)
+        self.report('select_parts (parse)', before, after)
+
+        rows = list(component_values(
+            Component.objects.filter(pk__in=[component.pk for component in components])
+        ))
+        before = self.time(lambda: ComponentSerializer(components, many=True).data, iterations)
+        after = self.time(lambda: serialize_component_rows(rows), iterations)
+        self.report('component list (serialize)', before, after)
+
+    def time(self, func, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - started) * 1000 / iterations
+
+    def report(self, label, before, after):
+        speedup = before / after if after else 0
+        self.stdout.write(f'{label:28} {before:10.3f} {after:10.3f} {speedup:7.1f}x')
@@ -0,0 +1,32 @@
+"""
+Compile the memory-mapped catalog snapshot files for the current catalog
+version, e.g. after a bulk import or before starting gunicorn:
+    python manage.py build_snapshots
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from parts.models import CatalogVersion, ComponentType
+from api.catalog_snapshot import compile_snapshot_file
+
+
+class Command(BaseCommand):
+    help = 'Write the binary catalog snapshot file of every component type'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--component-type', choices=ComponentType.values,
+                            help='Only compile this component type')
+
+    def handle(self, *args, **options):
+        if not settings.CATALOG_SNAPSHOT_DIR:
+            raise CommandError('CATALOG_SNAPSHOT_DIR is not set')
+
+        version = CatalogVersion.current()
+        component_types = [options['component_type']] if options['component_type'] else ComponentType.values
+        for component_type in component_types:
+            path = compile_snapshot_file(component_type, version)
+            self.stdout.write(f'{component_type}: {path} ({os.path.getsize(path)} bytes)')
+
+        self.stdout.write(self.style.SUCCESS(f'Compiled snapshots for catalog version {version}'))
@@ -0,0 +1,78 @@
+"""
+Concurrency check for cart updates: many threads add items to one cart and
+the final contents are compared with the number of successful adds, e.g.:
+    python manage.py cart_stress --threads 16 --adds 50
+
+--naive runs the old unguarded read-modify-write for comparison, which
+loses updates under contention.
+"""
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from parts.models import Cart
+from api.carts import add_to_cart, cart_item
+
+
+def naive_add(session_id, component_data):
+    cart, created = Cart.objects.get_or_create(session_id=session_id)
+    cart.components.append(cart_item(component_data))
+    cart.save()
+
+
+class Command(BaseCommand):
+    help = 'Hammer one cart from many threads and check that no update is lost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--adds', type=int, default=25, help='Adds per thread')
+        parser.add_argument('--naive', action='store_true', help='Use unguarded read-modify-write')
+
+    def handle(self, *args, **options):
+        session_id = f'cart-stress-{uuid.uuid4().hex}'
+        add = naive_add if options['naive'] else add_to_cart
+        Cart.objects.create(session_id=session_id)
+
+        succeeded = []
+        errors = []
+        start_barrier = threading.Barrier(options['threads'])
+
+        def worker(thread_index):
+            done = 0
+            try:
+                start_barrier.wait()
+                for i in range(options['adds']):
+                    try:
+                        add(session_id, {'component_id': thread_index * 100000 + i, 'name': 'stress', 'price': '$1'})
+                        done += 1
+                    except Exception as e:
+                        errors.append(repr(e))
+            finally:
+                succeeded.append(done)
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        cart = Cart.objects.get(session_id=session_id)
+        expected = sum(succeeded)
+        stored = len(cart.components)
+        cart.delete()
+
+        self.stdout.write(
+            f'{expected} adds from {options["threads"]} threads in {elapsed:.2f}s '
+            f'({expected / elapsed:.0f} adds/s), {len(errors)} errors'
+        )
+        for error in sorted(set(errors))[:5]:
+            self.stderr.write(f'  {error}')
+        if stored != expected:
+            raise CommandError(f'Lost updates: cart holds {stored} items, expected {expected}')
+        self.stdout.write(self.style.SUCCESS(f'Cart holds all {stored} items (version {cart.version})'))
@@ -0,0 +1,77 @@
+"""
+Apply SelectionHistory retention and compaction, e.g. nightly:
+    python manage.py compact_history --days 90
+
+Moves legacy inline criteria_matches payloads to shared CriteriaPayload rows,
+deletes raw rows older than the retention window in batches (the daily
+rollups keep their totals) and drops payloads no row references any more.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from parts.models import CriteriaPayload, SelectionHistory
+from api.analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Delete SelectionHistory rows past retention and deduplicate criteria payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SELECTION_HISTORY_RETENTION_DAYS,
+                            help='Keep raw rows from the last N days (default: SELECTION_HISTORY_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--rebuild-rollups', action='store_true',
+                            help='Recompute daily rollups for every day that still has raw rows '
+                                 '(for history recorded before rollups existed)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be done')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        # Whole days only, so a rebuilt rollup never covers a partly deleted day
+        cutoff = timezone.make_aware(
+            datetime.combine(timezone.localdate() - timedelta(days=options['days']), time.min)
+        )
+        expired = SelectionHistory.objects.filter(created_at__lt=cutoff)
+        legacy = SelectionHistory.objects.filter(criteria_payload__isnull=True, criteria_matches__isnull=False)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'Would delete {expired.count()} rows older than {cutoff:%Y-%m-%d} '
+                f'and move {legacy.count()} inline payloads'
+            )
+            return
+
+        if options['rebuild_rollups']:
+            days = rebuild_rollups()
+            self.stdout.write(f'Rebuilt rollups for {days} days')
+
+        moved = 0
+        while True:
+            rows = list(legacy.order_by('pk').values_list('pk', 'criteria_matches')[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                for pk, criteria_matches in rows:
+                    SelectionHistory.objects.filter(pk=pk).update(
+                        criteria_payload=CriteriaPayload.intern(criteria_matches),
+                        criteria_matches=None,
+                    )
+            moved += len(rows)
+
+        deleted = 0
+        while True:
+            pks = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            deleted += SelectionHistory.objects.filter(pk__in=pks).delete()[0]
+
+        orphans, _ = CriteriaPayload.objects.filter(selections__isnull=True).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} rows older than {cutoff:%Y-%m-%d}, moved {moved} inline payloads, '
+            f'removed {orphans} unreferenced payloads ({CriteriaPayload.objects.count()} kept)'
+        ))
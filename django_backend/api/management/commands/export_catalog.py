@@ -0,0 +1,45 @@
+"""
+Export the full catalog to a file without loading it into memory:
+    python manage.py export_catalog catalog.parquet
+    python manage.py export_catalog bearings.jsonl.gz --output jsonl --component-type bearing
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.catalog_export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, available_formats, default_format, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Stream Component + ComponentSpecification rows to Parquet, Arrow IPC or gzip\'d JSON-lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, or '-' for stdout")
+        parser.add_argument('--output', choices=list(EXPORT_FORMATS),
+                            help='Output format (default: from the file extension, else the best available)')
+        parser.add_argument('--component-type', help='Export a single component type')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        output = options['output']
+        if output is None:
+            output = next(
+                (name for name, (_, extension, _) in EXPORT_FORMATS.items() if path.endswith('.' + extension)),
+                default_format()
+            )
+        if output not in available_formats():
+            raise CommandError(f'{output} export requires pyarrow; available: {", ".join(available_formats())}')
+
+        chunks = iter_export(output, options['component_type'], options['chunk_size'])
+        written = 0
+        target = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            for data in chunks:
+                target.write(data)
+                written += len(data)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+
+        self.stderr.write(self.style.SUCCESS(f'Wrote {written} bytes of {output} to {path}'))
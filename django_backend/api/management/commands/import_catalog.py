@@ -0,0 +1,287 @@
+"""
+Streaming bulk import of vendor catalogs
+
+Reads CSV or JSON-lines (optionally gzip'd) one row at a time, validates each
+row, and upserts Component + ComponentSpecification pairs keyed on
+part_number in chunked transactions:
+    python manage.py import_catalog vendor.csv --chunk-size 500 --rejects rejects.jsonl
+
+Columns / keys are the Component fields (component_type, name, manufacturer,
+part_number, price, availability, lead_time, rating, vendor_url,
+specifications, pros, cons, alternatives) plus any ComponentSpecification
+field. In JSON-lines, spec fields may also be nested under "specification".
+List fields are JSON arrays, or '|'-separated strings in CSV. Numeric spec
+values may carry their unit ("40 mm"), which must match the field's unit.
+
+Re-importing a part updates only the columns the row has a value for, so a
+partial file (say part_number, name, manufacturer, price and component_type
+plus new prices) leaves the other columns as they are.
+"""
+import csv
+import gzip
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from parts.models import CatalogChange, Component, ComponentSpecification, ComponentType
+from parts.normalization import SPEC_FIELD_UNITS, parse_quantity
+
+
+COMPONENT_TEXT_FIELDS = ['name', 'manufacturer', 'part_number', 'price', 'availability', 'lead_time', 'vendor_url']
+COMPONENT_LIST_FIELDS = ['specifications', 'pros', 'cons', 'alternatives']
+REQUIRED_FIELDS = ['component_type', 'name', 'manufacturer', 'part_number', 'price']
+MAX_REJECTS_SHOWN = 20
+
+SPEC_TEXT_FIELDS = {
+    field.name: field.max_length
+    for field in ComponentSpecification._meta.concrete_fields
+    if field.get_internal_type() == 'CharField' and field.editable
+}
+
+# Shadow columns parsed from a text column (see the models' normalize())
+PARSED_FIELDS = {
+    'lead_time': ['lead_time_days'],
+    'fastener_diameter': ['fastener_diameter_mm'],
+    'voltage': ['voltage_v', 'voltage_phases'],
+    'material_grade': ['material_grade_mpa'],
+    'precision_grade': ['precision_grade_iso'],
+}
+
+
+def open_source(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_rows(source, fmt):
+    """Yield (line number, row dict or parse error) lazily"""
+    if fmt == 'csv':
+        reader = csv.DictReader(source)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                yield reader.line_num, ValueError(f'invalid CSV: {exc}')
+                continue
+            yield reader.line_num, row
+    else:
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, ValueError(f'invalid JSON: {exc}')
+                continue
+            if isinstance(row, dict) and isinstance(row.get('specification'), dict):
+                row = {**row, **row.pop('specification')}
+            yield line_number, row
+
+
+def parse_list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return value
+    value = str(value)
+    if value.lstrip().startswith('['):
+        parsed = json.loads(value)
+        if not isinstance(parsed, list):
+            raise ValueError('expected a list')
+        return parsed
+    return [item.strip() for item in value.split('|') if item.strip()]
+
+
+def validate(row):
+    """Return (component fields, spec fields) or raise ValueError"""
+    if not isinstance(row, dict):
+        raise ValueError('row is not an object')
+
+    missing = [name for name in REQUIRED_FIELDS if row.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f'missing {", ".join(missing)}')
+
+    component_type = str(row['component_type']).strip().lower()
+    if component_type not in ComponentType.values:
+        raise ValueError(f'unknown component_type {row["component_type"]!r}')
+
+    component = {'component_type': component_type}
+    for name in COMPONENT_TEXT_FIELDS:
+        if row.get(name) not in (None, ''):
+            component[name] = str(row[name]).strip()
+    for name in COMPONENT_LIST_FIELDS:
+        if row.get(name) not in (None, ''):
+            try:
+                component[name] = parse_list(row[name])
+            except ValueError as exc:
+                raise ValueError(f'{name}: {exc}')
+
+    for name in COMPONENT_TEXT_FIELDS:
+        max_length = Component._meta.get_field(name).max_length
+        if name in component and len(component[name]) > max_length:
+            raise ValueError(f'{name} longer than {max_length} characters')
+
+    if row.get('rating') not in (None, ''):
+        try:
+            rating = float(row['rating'])
+        except ValueError:
+            raise ValueError(f'rating: not a number: {row["rating"]!r}')
+        if not 0 <= rating <= 5:
+            raise ValueError('rating must be between 0 and 5')
+        component['rating'] = rating
+
+    spec = {}
+    for name, unit in SPEC_FIELD_UNITS.items():
+        if row.get(name) not in (None, ''):
+            try:
+                spec[name] = parse_quantity(row[name], unit)
+            except ValueError as exc:
+                raise ValueError(f'{name}: {exc}')
+    for name, max_length in SPEC_TEXT_FIELDS.items():
+        if row.get(name) not in (None, ''):
+            value = str(row[name]).strip()
+            if len(value) > max_length:
+                raise ValueError(f'{name} longer than {max_length} characters')
+            spec[name] = value
+
+    return component, spec
+
+
+def update_fields(fields):
+    """Columns an upsert of rows with these fields overwrites"""
+    columns = [name for name in fields if name != 'part_number']
+    for name in fields:
+        columns += PARSED_FIELDS.get(name, [])
+    return columns + ['updated_at']
+
+
+def upsert_chunk(chunk):
+    """Upsert one chunk of validated rows in a single transaction"""
+    # Last row wins for duplicate part numbers within a chunk
+    by_part_number = {component['part_number']: (component, spec) for component, spec in chunk}
+
+    # One upsert per set of columns present, so missing columns are left alone
+    groups = {}
+    for part_number, (component, spec) in by_part_number.items():
+        groups.setdefault((tuple(sorted(component)), tuple(sorted(spec))), []).append(part_number)
+
+    with transaction.atomic():
+        for (component_fields, spec_fields), part_numbers in groups.items():
+            # bulk_create skips save(), so the parsed shadow columns are set here
+            components = [Component(**by_part_number[part_number][0]) for part_number in part_numbers]
+            for component in components:
+                component.normalize()
+            Component.objects.bulk_create(
+                components,
+                update_conflicts=True,
+                unique_fields=['part_number'],
+                update_fields=update_fields(component_fields),
+            )
+
+        ids = dict(
+            Component.objects.filter(part_number__in=list(by_part_number))
+            .values_list('part_number', 'id')
+        )
+
+        for (component_fields, spec_fields), part_numbers in groups.items():
+            specs = []
+            for part_number in part_numbers:
+                component, spec = by_part_number[part_number]
+                specs.append(ComponentSpecification(
+                    component_id=ids[part_number], component_type=component['component_type'], **spec
+                ))
+            for spec in specs:
+                spec.normalize()
+            ComponentSpecification.objects.bulk_create(
+                specs,
+                update_conflicts=True,
+                unique_fields=['component'],
+                update_fields=update_fields(('component_type',) + spec_fields),
+            )
+        CatalogChange.record([
+            (ids[part_number], component['component_type'])
+            for part_number, (component, _) in by_part_number.items()
+        ])
+    return len(by_part_number)
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or JSON-lines vendor catalog into Component/ComponentSpecification'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON-lines file (.gz allowed), or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--rejects', help='Write rejected rows with reasons to this JSON-lines file')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.removesuffix('.gz').endswith('.csv') else 'jsonl')
+
+        rejects_file = open(options['rejects'], 'w', encoding='utf-8') if options['rejects'] else None
+        self.rejects_shown = 0
+        started = time.perf_counter()
+        read = upserted = rejected = 0
+
+        try:
+            with open_source(path) as source:
+                rows = read_rows(source, fmt)
+                while True:
+                    batch = list(islice(rows, options['chunk_size']))
+                    if not batch:
+                        break
+
+                    chunk = []
+                    for line_number, row in batch:
+                        read += 1
+                        try:
+                            if isinstance(row, Exception):
+                                raise row
+                            chunk.append(validate(row))
+                        except ValueError as exc:
+                            rejected += 1
+                            self.reject(rejects_file, line_number, row, exc)
+
+                    if chunk and not options['dry_run']:
+                        upserted += upsert_chunk(chunk)
+
+                    elapsed = time.perf_counter() - started
+                    self.stderr.write(
+                        f'{read} rows read, {upserted} upserted, {rejected} rejected '
+                        f'({read / elapsed:.0f} rows/s)'
+                    )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {upserted} components from {read} rows in {elapsed:.1f}s '
+            f'({read / elapsed if elapsed else 0:.0f} rows/s), {rejected} rejected'
+        ))
+
+    def reject(self, rejects_file, line_number, row, exc):
+        if rejects_file:
+            rejects_file.write(json.dumps(
+                {'line': line_number, 'error': str(exc),
+                 'row': row if isinstance(row, dict) else None},
+                default=str,
+            ) + '\n')
+        else:
+            # Without a rejects file, only the first reasons are printed
+            self.rejects_shown += 1
+            if self.rejects_shown <= MAX_REJECTS_SHOWN:
+                self.stderr.write(f'line {line_number}: {exc}')
@@ -0,0 +1,98 @@
+"""
+Load test comparing the WSGI (DRF) and ASGI (async) selection endpoints
+
+Start both servers first, for example:
+    gunicorn cots_backend.wsgi:application --bind 0.0.0.0:8000 --workers 4
+    gunicorn cots_backend.asgi:application --bind 0.0.0.0:8001 --workers 4 -k uvicorn.workers.UvicornWorker
+
+Then run:
+    python manage.py load_test --wsgi-url http://localhost:8000 --asgi-url http://localhost:8001
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+DEFAULT_FORM = {
+    'componentType': 'bearing',
+    'dynamicLoad': 25,
+    'speed': 5000,
+    'boreSize': 40,
+    'bearingEnvironment': 'Clean/Sealed',
+    'lubrication': 'Grease',
+    'bearingMaterial': 'Steel',
+    'targetL10Life': 20000,
+}
+
+ENDPOINTS = {
+    'wsgi': {'select': '/api/select-parts/', 'list': '/api/components/'},
+    'asgi': {'select': '/api/async/select-parts/', 'list': '/api/async/components/'},
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Compare requests per second and latency of the WSGI and ASGI endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://localhost:8000')
+        parser.add_argument('--asgi-url', default='http://localhost:8001')
+        parser.add_argument('--endpoint', choices=['select', 'list'], default='select')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--form', help='Path to a JSON requirement form (select endpoint)')
+
+    def handle(self, *args, **options):
+        form = DEFAULT_FORM
+        if options['form']:
+            with open(options['form']) as f:
+                form = json.load(f)
+
+        for server in ('wsgi', 'asgi'):
+            url = options[f'{server}_url'].rstrip('/') + ENDPOINTS[server][options['endpoint']]
+            body = json.dumps(form).encode() if options['endpoint'] == 'select' else None
+            stats = self.run(url, body, options['requests'], options['concurrency'])
+
+            self.stdout.write(
+                f"{server.upper():5} {url}\n"
+                f"      requests={stats['requests']} errors={stats['errors']} "
+                f"rps={stats['rps']:.1f} p50={stats['p50']:.1f}ms p99={stats['p99']:.1f}ms"
+            )
+
+    def run(self, url, body, total, concurrency):
+        def send(_):
+            request = urllib.request.Request(
+                url, data=body, headers={'Content-Type': 'application/json'}
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(send, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for ok, latency in results if ok)
+        return {
+            'requests': total,
+            'errors': sum(1 for ok, _ in results if not ok),
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'p50': percentile(latencies, 50),
+            'p99': percentile(latencies, 99),
+        }
@@ -0,0 +1,91 @@
+"""
+Precompute rankings for the most frequent requirement forms
+
+Mines SelectionHistory.form_data for the most common canonical forms and
+stores their ranked results in MaterializedSelection. Run it periodically
+(e.g. from cron). Buckets left stale by catalog edits are patched from the
+change log rather than recomputed, unless --force is given. Change log
+entries no bucket needs any more are pruned:
+    python manage.py materialize_selections --top 200 --min-count 5
+"""
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from django.db.models import Min
+
+from parts.models import (
+    CatalogChange, CatalogVersion, ComponentType, MaterializedSelection, SelectionHistory,
+)
+from api.materialized import canonical_form, form_key, materialize, patch_materialized
+
+
+class Command(BaseCommand):
+    help = 'Materialize ranked results for the most frequent requirement buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=200, help='Number of buckets to keep')
+        parser.add_argument('--min-count', type=int, default=2,
+                            help='Minimum number of requests for a bucket')
+        parser.add_argument('--force', action='store_true',
+                            help='Recompute buckets that are already current')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = Counter()
+        forms = {}
+
+        for form_data in SelectionHistory.objects.values_list('form_data', flat=True).iterator(chunk_size=2000):
+            if not isinstance(form_data, dict) or str(form_data.get('componentType', '')).lower() not in ComponentType.values:
+                continue
+            if form_data.get('rankingMode', 'score') != 'score':
+                continue
+            key = form_key(form_data)
+            counts[key] += 1
+            forms.setdefault(key, form_data)
+
+        buckets = [
+            (key, count) for key, count in counts.most_common(options['top'])
+            if count >= options['min_count']
+        ]
+
+        version = CatalogVersion.current()
+        existing = {
+            materialized.bucket_key: materialized
+            for materialized in MaterializedSelection.objects.filter(
+                bucket_key__in=[key for key, _ in buckets]
+            )
+        }
+
+        computed = patched = 0
+        for key, count in buckets:
+            materialized = existing.get(key)
+            if materialized and not options['force']:
+                if materialized.catalog_version != version:
+                    if not patch_materialized(materialized, version):
+                        materialize(materialized.form_data, request_count=count)
+                        computed += 1
+                        continue
+                    patched += 1
+                MaterializedSelection.objects.filter(pk=materialized.pk).update(request_count=count)
+                continue
+            materialize(canonical_form(forms[key]), request_count=count)
+            computed += 1
+
+        removed, _ = MaterializedSelection.objects.exclude(
+            bucket_key__in=[key for key, _ in buckets]
+        ).delete()
+
+        oldest = MaterializedSelection.objects.aggregate(oldest=Min('catalog_version'))['oldest']
+        pruned, _ = CatalogChange.objects.filter(
+            catalog_version__lte=version if oldest is None else oldest
+        ).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(buckets)} buckets from {sum(counts.values())} selections: '
+            f'{computed} computed, {patched} patched, '
+            f'{len(buckets) - computed - patched} current, {removed} removed, '
+            f'{pruned} change log entries pruned '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
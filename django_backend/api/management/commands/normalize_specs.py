@@ -0,0 +1,72 @@
+"""
+Backfill the parsed numeric shadow columns of existing catalog rows
+
+save() keeps them current for new edits; run this once after adding the
+columns, or after changing a parser in parts.normalization, e.g.:
+    python manage.py normalize_specs
+Rows whose parsed values change are logged to CatalogChange so cached
+rankings and snapshots are refreshed.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from parts.models import CatalogChange, Component, ComponentSpecification
+
+
+def backfill(model, source_fields, normalized_fields, batch_size, dry_run, type_field):
+    """Re-parse every row of a model; returns (scanned, changed component ids by type)"""
+    queryset = model.objects.order_by('pk').only('pk', *source_fields, *normalized_fields)
+    scanned = 0
+    changed = []
+    batch = []
+    for instance in queryset.iterator(chunk_size=batch_size):
+        scanned += 1
+        before = [getattr(instance, name) for name in normalized_fields]
+        instance.normalize()
+        if [getattr(instance, name) for name in normalized_fields] != before:
+            batch.append(instance)
+        if len(batch) >= batch_size:
+            changed += _save_batch(model, batch, normalized_fields, dry_run, type_field)
+            batch = []
+    if batch:
+        changed += _save_batch(model, batch, normalized_fields, dry_run, type_field)
+    return scanned, changed
+
+
+def _save_batch(model, batch, normalized_fields, dry_run, type_field):
+    ids = [instance.pk for instance in batch]
+    entries = list(model.objects.filter(pk__in=ids).values_list(*type_field))
+    if not dry_run:
+        with transaction.atomic():
+            model.objects.bulk_update(batch, normalized_fields)
+            CatalogChange.record(entries)
+    return entries
+
+
+class Command(BaseCommand):
+    help = 'Parse the string-encoded specs (diameter, voltage, grades, lead time) into their numeric columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change')
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        dry_run = options['dry_run']
+
+        components, changed_components = backfill(
+            Component, ['lead_time'], ['lead_time_days'], batch_size, dry_run,
+            ('id', 'component_type'),
+        )
+        specs, changed_specs = backfill(
+            ComponentSpecification,
+            ['fastener_diameter', 'voltage', 'material_grade', 'precision_grade'],
+            ComponentSpecification.NORMALIZED_FIELDS, batch_size, dry_run,
+            ('component_id', 'component__component_type'),
+        )
+
+        verb = 'Would update' if dry_run else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(changed_components)} of {components} components '
+            f'and {len(changed_specs)} of {specs} specifications'
+        ))
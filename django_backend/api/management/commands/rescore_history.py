@@ -0,0 +1,58 @@
+"""
+Re-rank every stored selection against the current catalog
+
+Uses process-pool scoring regardless of catalog size, e.g.:
+    python manage.py rescore_history --update
+"""
+from django.core.management.base import BaseCommand
+
+from parts.models import Component, CriteriaPayload, SelectionHistory
+from api.catalog_snapshot import get_catalog_snapshot
+from api.criteria_engine import evaluate_criteria
+from api.parallel_scoring import parallel_top_k
+
+
+class Command(BaseCommand):
+    help = 'Re-score the selection history on the process pool and report changed picks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--component-type', help='Only re-score this component type')
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Store the new best component, score and criteria on changed rows'
+        )
+
+    def handle(self, *args, **options):
+        history = SelectionHistory.objects.order_by('pk')
+        if options['component_type']:
+            history = history.filter(component_type=options['component_type'].lower())
+
+        scanned = changed = 0
+        for entry in history.iterator(chunk_size=500):
+            scanned += 1
+            snapshot = get_catalog_snapshot(entry.component_type)
+            top = parallel_top_k(snapshot, entry.form_data, 1)
+            if not top:
+                continue
+
+            component_id, match_score = top[0]
+            if component_id == entry.selected_component_id and match_score == entry.match_score:
+                continue
+
+            changed += 1
+            if options['update']:
+                component = Component.objects.select_related('specification').get(pk=component_id)
+                evaluation = evaluate_criteria(
+                    entry.component_type, entry.form_data, component.specification
+                )
+                SelectionHistory.objects.filter(pk=entry.pk).update(
+                    selected_component=component,
+                    match_score=match_score,
+                    criteria_payload=CriteriaPayload.intern(evaluation['criteria']),
+                    criteria_matches=None,
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-scored {scanned} selections, {changed} changed'
+            + (' and updated' if options['update'] and changed else '')
+        ))
@@ -0,0 +1,24 @@
+"""
+Copy Component.component_type onto ComponentSpecification.component_type
+
+This runs after every migrate (see parts.signals), and save() keeps the copy
+current afterwards. Run it by hand after bulk changes that skip save():
+    python manage.py sync_spec_types
+Selection and snapshot queries read one type's specifications through the
+copied column only (so they stay on its partial index), and rows missing
+it are not scored until they are backfilled.
+"""
+from django.core.management.base import BaseCommand
+
+from parts.models import sync_spec_types
+
+
+class Command(BaseCommand):
+    help = 'Backfill the component type copied onto each specification row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows updated per statement')
+
+    def handle(self, *args, **options):
+        updated = sync_spec_types(max(options['batch_size'], 1))
+        self.stdout.write(self.style.SUCCESS(f'Updated the component type of {updated} specifications'))
@@ -0,0 +1,179 @@
+"""
+Materialized rankings for frequent requirement forms
+
+Selection requests are bucketed by their canonical form. The most frequent
+buckets in the selection history are ranked offline (see the
+materialize_selections command) so select_parts can answer them with one
+indexed lookup while the catalog version is unchanged. After catalog edits a
+bucket is patched from the CatalogChange log by re-scoring only the changed
+components and merging them into the stored ranking.
+"""
+import hashlib
+import json
+
+from django.db.models import Subquery
+
+from parts.models import (
+    CatalogChange, CatalogVersion, Component, ComponentSpecification, MaterializedSelection,
+)
+from api.criteria_engine import evaluate_criteria
+from api.selection import catalog_components, rank_components, build_recommendation
+
+
+# Number of ranked components kept per bucket
+MATERIALIZED_DEPTH = 20
+
+# Patch a stale bucket only if at most this many components changed since
+MAX_PATCH_CHANGES = 5000
+
+
+def canonical_form(form_data):
+    """
+    Normalize a requirement form so equivalent requests share one bucket
+
+    Only componentType is normalized (lowercased); other values are kept
+    verbatim because they are echoed in the criteria and metric text. Key
+    order is normalized by form_key.
+    """
+    canonical = dict(form_data.items())
+    if isinstance(canonical.get('componentType'), str):
+        canonical['componentType'] = canonical['componentType'].lower()
+    return canonical
+
+
+def form_key(form_data):
+    """Stable hash of the canonical form"""
+    payload = json.dumps(canonical_form(form_data), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lookup_materialized(form_data):
+    """
+    Return the up-to-date materialized selection for this form, if any
+
+    A bucket left stale by catalog edits is patched on the way out.
+    """
+    key = form_key(form_data)
+    materialized = MaterializedSelection.objects.filter(
+        bucket_key=key,
+        catalog_version=Subquery(CatalogVersion.objects.filter(pk=1).values('version')[:1]),
+    ).only('recommendations', 'total_matches').first()
+    if materialized:
+        return materialized
+
+    stale = MaterializedSelection.objects.filter(bucket_key=key).first()
+    if stale:
+        return refresh_materialized(stale)
+    return None
+
+
+def ranking_key(entry):
+    """Sort key of a ranking entry: best score, then catalog order"""
+    component_id, match_score, rating = entry
+    return (-match_score, -(rating or 0), component_id)
+
+
+def ranking_entries(ranked):
+    return [
+        [component.id, evaluation['match_score'], component.rating]
+        for component, evaluation in ranked
+    ]
+
+
+def materialize(form_data, request_count=0):
+    """Rank the catalog for a form and store the result under its bucket"""
+    form_data = canonical_form(form_data)
+    component_type = form_data['componentType']
+    version = CatalogVersion.current()
+
+    ranked, total_matches = rank_components(component_type, form_data, MATERIALIZED_DEPTH)
+    defaults = {
+        'component_type': component_type,
+        'form_data': form_data,
+        'catalog_version': version,
+        'ranking': ranking_entries(ranked),
+        'recommendations': [
+            build_recommendation(component_type, form_data, component, evaluation)
+            for component, evaluation in ranked[:3]
+        ],
+        'total_matches': total_matches,
+    }
+    if request_count:
+        defaults['request_count'] = request_count
+    materialized, _ = MaterializedSelection.objects.update_or_create(
+        bucket_key=form_key(form_data), defaults=defaults
+    )
+    return materialized
+
+
+def patch_materialized(materialized, version=None):
+    """
+    Bring a stale bucket up to date by re-scoring only changed components
+
+    The stored ranking is the exact top-N of the old catalog, so after
+    dropping changed components and merging their new scores, every entry
+    that still sorts ahead of the old last entry is exact. Returns False when
+    that exact prefix is too short (or too much changed, or a top component
+    has been deleted since) and the bucket needs a full recompute.
+    """
+    if version is None:
+        version = CatalogVersion.current()
+    if materialized.catalog_version == version:
+        return True
+
+    changed = set(CatalogChange.objects.filter(
+        catalog_version__gt=materialized.catalog_version,
+        catalog_version__lte=version,
+    ).values_list('component_id', flat=True).distinct()[:MAX_PATCH_CHANGES + 1])
+    if len(changed) > MAX_PATCH_CHANGES:
+        return False
+
+    component_type = materialized.component_type
+    form_data = materialized.form_data
+    old_ranking = materialized.ranking
+    complete = len(old_ranking) >= materialized.total_matches
+    boundary = ranking_key(old_ranking[-1]) if old_ranking else None
+
+    ranking = [entry for entry in old_ranking if entry[0] not in changed]
+    components = catalog_components(component_type).filter(pk__in=changed)
+    for component in components:
+        spec = getattr(component, 'specification', None)
+        if spec:
+            evaluation = evaluate_criteria(component_type, form_data, spec)
+            ranking.append([component.id, evaluation['match_score'], component.rating])
+
+    ranking.sort(key=ranking_key)
+    total_matches = ComponentSpecification.objects.filter(component_type=component_type).count()
+    if not complete:
+        ranking = [entry for entry in ranking if ranking_key(entry) <= boundary]
+        if len(ranking) < min(3, total_matches):
+            return False
+    ranking = ranking[:MATERIALIZED_DEPTH]
+
+    top = Component.objects.select_related('specification').in_bulk(
+        [entry[0] for entry in ranking[:3]]
+    )
+    if len(top) < len(ranking[:3]):
+        # Deleted after the version was read; its change is not in this patch
+        return False
+    materialized.recommendations = [
+        build_recommendation(
+            component_type, form_data, top[component_id],
+            evaluate_criteria(component_type, form_data, top[component_id].specification),
+        )
+        for component_id, _, _ in ranking[:3]
+    ]
+    materialized.ranking = ranking
+    materialized.total_matches = total_matches
+    materialized.catalog_version = version
+    materialized.save(update_fields=[
+        'ranking', 'recommendations', 'total_matches', 'catalog_version', 'updated_at',
+    ])
+    return True
+
+
+def refresh_materialized(materialized):
+    """Patch a stale bucket, falling back to a full recompute when needed"""
+    if patch_materialized(materialized):
+        return materialized
+    return materialize(materialized.form_data)
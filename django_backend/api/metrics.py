@@ -0,0 +1,84 @@
+"""
+Request counters and gauges
+
+Each counter is kept per worker process and, so that totals cover every
+worker, in the shared cache as well (see CACHES in settings). Gauges report
+a current value, such as the requests in flight per endpoint. GET
+/api/metrics/ reports all of them.
+"""
+import os
+import threading
+from collections import Counter
+
+from django.core.cache import cache
+
+
+METRICS_KEY_PREFIX = 'metrics:'
+
+# Counters reported by /api/metrics/
+METRIC_NAMES = (
+    # select_parts requests that ranked the catalog themselves
+    'selections_computed',
+    # ... that waited for an identical request in the same worker
+    'selections_coalesced',
+    # ... that used the result of an identical request in another worker
+    'selections_coalesced_shared',
+    # ... that gave up waiting for another worker and ranked themselves
+    'selections_coalesce_timeouts',
+    # requests refused with 503 because their endpoint was at its concurrency limit
+    'admission_shed',
+    # requests refused with 429 because their client was over its rate
+    'admission_rate_limited',
+)
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+_gauges = {}  # name -> function returning the current value
+
+
+def increment(name, amount=1):
+    """Add to a counter in this worker and in the shared cache"""
+    with _counters_lock:
+        _counters[name] += amount
+
+    key = METRICS_KEY_PREFIX + name
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # First increment in any worker; add() fails if another got there first
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+
+async def aincrement(name, amount=1):
+    """increment() for async code, using the cache's async API"""
+    with _counters_lock:
+        _counters[name] += amount
+
+    key = METRICS_KEY_PREFIX + name
+    try:
+        await cache.aincr(key, amount)
+    except ValueError:
+        if not await cache.aadd(key, amount, timeout=None):
+            await cache.aincr(key, amount)
+
+
+def register_gauge(name, read):
+    """Report read() as a gauge in the snapshot"""
+    _gauges[name] = read
+
+
+def snapshot():
+    """Counters of this worker, totals over all workers and current gauges"""
+    with _counters_lock:
+        local = dict(_counters)
+    shared = cache.get_many([METRICS_KEY_PREFIX + name for name in METRIC_NAMES])
+    return {
+        'worker': {
+            'pid': os.getpid(),
+            'counters': {name: local.get(name, 0) for name in METRIC_NAMES},
+        },
+        'counters': {name: shared.get(METRICS_KEY_PREFIX + name, 0) for name in METRIC_NAMES},
+        'gauges': {name: read() for name, read in _gauges.items()},
+    }
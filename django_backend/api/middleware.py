@@ -0,0 +1,368 @@
+"""
+API middleware
+"""
+import math
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from api import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip
+    brotli = None
+
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+
+# Payloads that are compressed already; recompressing only costs CPU
+COMPRESSED_CONTENT_TYPES = {
+    'application/gzip',
+    'application/zip',
+    'application/vnd.apache.parquet',
+}
+
+# Event streams; the compressor would hold events back until its buffer fills
+EVENT_STREAM_CONTENT_TYPES = {
+    'text/event-stream',
+    'application/x-ndjson',
+}
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress responses with brotli when the client accepts it and the brotli
+    package is installed, otherwise with gzip
+    """
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type in COMPRESSED_CONTENT_TYPES or content_type in EVENT_STREAM_CONTENT_TYPES:
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < 200
+            or not re_accepts_brotli.search(ae)
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        compressed_content = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+
+        # Weaken a strong ETag, the representation is no longer byte-identical
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+
+        return response
+
+
+# Local token buckets are pruned once this many clients are tracked
+MAX_TRACKED_CLIENTS = 10000
+
+
+def _refill(bucket, now, rate, burst):
+    """Take a token from a (tokens, stamp) bucket; returns (new bucket, seconds to wait or 0)"""
+    tokens, stamp = bucket or (burst, now)
+    tokens = min(burst, tokens + max(now - stamp, 0) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class LocalSlot:
+    """A held concurrency slot of LocalAdmissionState; call it to free the slot"""
+
+    def __init__(self, state, endpoint):
+        self.state = state
+        self.endpoint = endpoint
+
+    def __call__(self):
+        with self.state.lock:
+            self.state.running[self.endpoint] -= 1
+
+    async def arelease(self):
+        # Only a lock held for a counter update, so not worth a thread
+        self()
+
+
+class LocalAdmissionState:
+    """
+    Concurrency slots and token buckets of this worker process
+
+    The a-prefixed methods serve the async middleware path. The lock is only
+    held for counter updates, so they run on the event loop directly.
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.lock = threading.Lock()
+        self.running = Counter()
+        self.buckets = {}  # client -> (tokens, time.monotonic() of the last update)
+
+    def acquire(self, endpoint):
+        """Take a slot; returns a callable that frees it, or None if all are taken"""
+        with self.lock:
+            if self.running[endpoint] >= self.limits[endpoint]:
+                return None
+            self.running[endpoint] += 1
+        return LocalSlot(self, endpoint)
+
+    async def aacquire(self, endpoint):
+        return self.acquire(endpoint)
+
+    def in_flight(self):
+        with self.lock:
+            return {endpoint: self.running[endpoint] for endpoint in self.limits}
+
+    def take_token(self, client, rate, burst):
+        """Take a token; returns 0, or the seconds until the client has one"""
+        now = time.monotonic()
+        with self.lock:
+            if len(self.buckets) >= MAX_TRACKED_CLIENTS:
+                # Buckets that have refilled completely hold no state
+                self.buckets = {
+                    key: (tokens, stamp) for key, (tokens, stamp) in self.buckets.items()
+                    if tokens + (now - stamp) * rate < burst
+                }
+            self.buckets[client], wait = _refill(self.buckets.get(client), now, rate, burst)
+            return wait
+
+    async def atake_token(self, client, rate, burst):
+        return self.take_token(client, rate, burst)
+
+
+class CacheSlot:
+    """A held concurrency slot of CacheAdmissionState; call it to free the slot"""
+
+    def __init__(self, key, token):
+        self.key = key
+        self.token = token
+
+    def __call__(self):
+        # Not if the slot expired and another request holds it now
+        if cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+    async def arelease(self):
+        if await cache.aget(self.key) == self.token:
+            await cache.adelete(self.key)
+
+
+class CacheAdmissionState:
+    """
+    Concurrency slots and token buckets shared by all workers through the cache
+
+    Each endpoint has one cache key per slot, taken with cache.add so a slot
+    is held at most once. Slots expire after ADMISSION_SLOT_TIMEOUT seconds in
+    case a worker dies holding one. Token buckets are read and written
+    without a lock, so racing workers may let a few extra requests through.
+    The a-prefixed methods use the cache's async API.
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    def _slot_keys(self, endpoint):
+        return [f'admission:slot:{endpoint}:{slot}' for slot in range(self.limits[endpoint])]
+
+    def acquire(self, endpoint):
+        token = uuid.uuid4().hex
+        for key in self._slot_keys(endpoint):
+            if cache.add(key, token, settings.ADMISSION_SLOT_TIMEOUT):
+                return CacheSlot(key, token)
+        return None
+
+    async def aacquire(self, endpoint):
+        token = uuid.uuid4().hex
+        for key in self._slot_keys(endpoint):
+            if await cache.aadd(key, token, settings.ADMISSION_SLOT_TIMEOUT):
+                return CacheSlot(key, token)
+        return None
+
+    def in_flight(self):
+        return {
+            endpoint: len(cache.get_many(self._slot_keys(endpoint)))
+            for endpoint in self.limits
+        }
+
+    def take_token(self, client, rate, burst):
+        key = f'admission:bucket:{client}'
+        bucket, wait = _refill(cache.get(key), time.time(), rate, burst)
+        # A bucket left alone this long is full again
+        cache.set(key, bucket, math.ceil(burst / rate) + 1)
+        return wait
+
+    async def atake_token(self, client, rate, burst):
+        key = f'admission:bucket:{client}'
+        bucket, wait = _refill(await cache.aget(key), time.time(), rate, burst)
+        await cache.aset(key, bucket, math.ceil(burst / rate) + 1)
+        return wait
+
+
+class SlotRelease:
+    """Streamed response content that frees a concurrency slot when the response is closed"""
+
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+
+    def close(self):
+        release, self.release = self.release, None
+        if release is not None:
+            release()
+
+
+class SlotReleasingStream(SlotRelease):
+    def __iter__(self):
+        yield from self.content
+
+
+class AsyncSlotReleasingStream(SlotRelease):
+    # No __iter__: StreamingHttpResponse treats iterable content as synchronous
+    async def __aiter__(self):
+        async for part in self.content:
+            yield part
+
+
+def retry_later(status, error, seconds):
+    response = JsonResponse({'error': error}, status=status)
+    response['Retry-After'] = str(max(1, math.ceil(seconds)))
+    return response
+
+
+class AdmissionControlMiddleware:
+    """
+    Shed load on the expensive endpoints before it queues up
+
+    For the endpoints in ADMISSION_CONCURRENCY_LIMITS (by URL name), each
+    client draws from a token bucket of ADMISSION_BURST tokens refilled at
+    ADMISSION_RATE per second, and gets 429 when it is empty. Each endpoint
+    runs at most its limit of requests at once; more get 503. Both carry
+    Retry-After. Streamed responses hold their slot until they are closed.
+    State is kept per worker, or shared through the cache with
+    ADMISSION_BACKEND = 'cache'. Under ASGI the middleware runs on the event
+    loop, so async views are not moved to a thread on its account.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.limits = settings.ADMISSION_CONCURRENCY_LIMITS
+        state_class = CacheAdmissionState if settings.ADMISSION_BACKEND == 'cache' else LocalAdmissionState
+        self.state = state_class({
+            endpoint: limit for endpoint, limit in self.limits.items() if limit > 0
+        })
+        metrics.register_gauge('admission_in_flight', self.state.in_flight)
+
+    def endpoint(self, request):
+        try:
+            url_name = resolve(request.path_info).url_name
+        except Resolver404:
+            return None
+        return url_name if url_name in self.limits else None
+
+    def client(self, request):
+        address = request.META.get(settings.ADMISSION_CLIENT_HEADER) or request.META.get('REMOTE_ADDR', '')
+        # The proxy appends the address it saw to X-Forwarded-For; the entries
+        # before it come from the client and can be forged
+        return address.split(',')[-1].strip()
+
+    def wrap(self, response, release):
+        """Free the slot now, or when a streamed response is closed"""
+        if response.streaming:
+            stream_class = AsyncSlotReleasingStream if response.is_async else SlotReleasingStream
+            response.streaming_content = stream_class(response.streaming_content, release)
+        else:
+            release()
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        endpoint = self.endpoint(request)
+        if endpoint is None or request.method == 'OPTIONS':
+            return self.get_response(request)
+
+        if settings.ADMISSION_RATE > 0:
+            wait = self.state.take_token(self.client(request), settings.ADMISSION_RATE, settings.ADMISSION_BURST)
+            if wait:
+                metrics.increment('admission_rate_limited')
+                return retry_later(429, 'Too many requests, slow down', wait)
+
+        release = None
+        if endpoint in self.state.limits:
+            release = self.state.acquire(endpoint)
+            if release is None:
+                metrics.increment('admission_shed')
+                return retry_later(503, 'Server busy, try again shortly', settings.ADMISSION_RETRY_AFTER)
+
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            if release:
+                release()
+            raise
+
+        return self.wrap(response, release) if release else response
+
+    async def __acall__(self, request):
+        endpoint = self.endpoint(request)
+        if endpoint is None or request.method == 'OPTIONS':
+            return await self.get_response(request)
+
+        if settings.ADMISSION_RATE > 0:
+            wait = await self.state.atake_token(
+                self.client(request), settings.ADMISSION_RATE, settings.ADMISSION_BURST
+            )
+            if wait:
+                await metrics.aincrement('admission_rate_limited')
+                return retry_later(429, 'Too many requests, slow down', wait)
+
+        release = None
+        if endpoint in self.state.limits:
+            release = await self.state.aacquire(endpoint)
+            if release is None:
+                await metrics.aincrement('admission_shed')
+                return retry_later(503, 'Server busy, try again shortly', settings.ADMISSION_RETRY_AFTER)
+
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            if release:
+                await release.arelease()
+            raise
+
+        if release and not response.streaming:
+            await release.arelease()
+            return response
+        # Streams are closed from a thread by the handler, which calls release()
+        return self.wrap(response, release) if release else response
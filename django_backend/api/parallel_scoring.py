@@ -0,0 +1,222 @@
+"""
+Process-pool scoring for very large catalogs
+
+The catalog snapshot of a component type is copied once into a shared memory
+block; a persistent pool of worker processes attaches to it by name, scores
+one shard each and returns its local top-K, which are merged here. Only the
+requirement form and shard bounds are pickled per task.
+"""
+import atexit
+import heapq
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import django
+from django.conf import settings
+
+from parts.models import CatalogVersion, Component
+from api.catalog_snapshot import get_catalog_snapshot, score_rows
+from api.criteria_engine import evaluate_criteria
+
+
+class SharedSnapshot:
+    """A catalog snapshot's columns laid out back to back in shared memory"""
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.rows = len(snapshot)
+        self.column_names = list(snapshot.columns)
+        column_bytes = self.rows * 8
+        self.shm = shared_memory.SharedMemory(
+            create=True, size=max(1, column_bytes * len(self.column_names))
+        )
+        for i, name in enumerate(self.column_names):
+            self.shm.buf[i * column_bytes:(i + 1) * column_bytes] = snapshot.columns[name].tobytes()
+        # Requests whose shards may still attach to the block; a replaced
+        # generation is unlinked once this drops to zero
+        self.users = 0
+        self.replaced = False
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+_pool = None
+_shared = {}  # component_type -> SharedSnapshot of the current version
+_replaced = set()  # older generations still held by a request
+_lock = threading.Lock()
+
+
+_catalog_sizes = {}  # component_type -> (catalog version, number of components)
+
+
+def catalog_size(component_type):
+    """Number of components of a type, counted once per catalog version"""
+    component_type = component_type.lower()
+    version = CatalogVersion.current()
+    cached = _catalog_sizes.get(component_type)
+    if cached is None or cached[0] != version:
+        cached = (version, Component.objects.filter(component_type=component_type).count())
+        _catalog_sizes[component_type] = cached
+    return cached[1]
+
+
+def use_parallel_scoring(component_type):
+    """True when the catalog of this type is large enough for the process pool"""
+    threshold = settings.PARALLEL_SCORING_MIN_CATALOG
+    if not threshold:
+        return False
+    return catalog_size(component_type) >= threshold
+
+
+def get_scoring_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PARALLEL_SCORING_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+    return _pool
+
+
+def _share(snapshot):
+    """
+    Return the shared copy of a snapshot, held for the caller until _release
+
+    A copy for an older version is replaced, but only unlinked once no
+    request is scoring against it any more.
+    """
+    with _lock:
+        shared = _shared.get(snapshot.component_type)
+        if shared is None or shared.version != snapshot.version:
+            if shared is not None:
+                _retire(shared)
+            shared = _shared[snapshot.component_type] = SharedSnapshot(snapshot)
+        shared.users += 1
+        return shared
+
+
+def _release(shared):
+    with _lock:
+        shared.users -= 1
+        if shared.replaced and not shared.users:
+            _replaced.discard(shared)
+            shared.close()
+
+
+def _retire(shared):
+    # Called with _lock held
+    shared.replaced = True
+    if shared.users:
+        _replaced.add(shared)
+    else:
+        shared.close()
+
+
+@atexit.register
+def _shutdown():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    for shared in [*_shared.values(), *_replaced]:
+        shared.close()
+    _shared.clear()
+    _replaced.clear()
+
+
+# Worker side: shared memory attachments by name, most recently used last
+_attached = OrderedDict()
+MAX_ATTACHED = 8
+
+
+def _attach(name):
+    shm = _attached.pop(name, None)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+    _attached[name] = shm
+    while len(_attached) > MAX_ATTACHED:
+        _attached.popitem(last=False)[1].close()
+    return shm
+
+
+def _score_shard(shm_name, rows, column_names, component_type, form_data, start, stop, k):
+    """Score rows [start, stop) of a shared snapshot and return the local top-K"""
+    shm = _attach(shm_name)
+    column_bytes = rows * 8
+    views = [
+        shm.buf[i * column_bytes:(i + 1) * column_bytes].cast('d')
+        for i in range(len(column_names))
+    ]
+    try:
+        columns = dict(zip(column_names, views))
+        return heapq.nsmallest(k, (
+            (-score, index)
+            for index, score in score_rows(component_type, form_data, columns, start, stop)
+        ))
+    finally:
+        for view in views:
+            view.release()
+
+
+def parallel_top_k(snapshot, form_data, k):
+    """
+    Score a snapshot on the process pool
+
+    Returns [(component_id, match_score)] for the best k rows, ties broken
+    by catalog order exactly like the sequential path.
+    """
+    rows = len(snapshot)
+    if not rows:
+        return []
+
+    shared = _share(snapshot)
+    form_data = dict(form_data.items())
+    shard_count = settings.PARALLEL_SCORING_WORKERS * 2
+    shard_size = -(-rows // shard_count)
+
+    pool = get_scoring_pool()
+    futures = []
+    try:
+        for start in range(0, rows, shard_size):
+            futures.append(pool.submit(
+                _score_shard, shared.name, rows, shared.column_names, snapshot.component_type,
+                form_data, start, min(start + shard_size, rows), k
+            ))
+        merged = heapq.nsmallest(k, (item for future in futures for item in future.result()))
+    finally:
+        # Every shard is done with the block before it can be unlinked
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        _release(shared)
+    return [(snapshot.ids[index], -neg_score) for neg_score, index in merged]
+
+
+def parallel_rank(component_type, form_data, k):
+    """
+    Process-pool counterpart of selection.score_components for the top k
+
+    Returns ((component, evaluation) pairs, total number of scored components).
+    """
+    snapshot = get_catalog_snapshot(component_type)
+    top = parallel_top_k(snapshot, form_data, k)
+
+    components = Component.objects.select_related('specification').in_bulk(
+        [component_id for component_id, _ in top]
+    )
+    ranked = [
+        (components[component_id],
+         evaluate_criteria(component_type, form_data, components[component_id].specification))
+        for component_id, _ in top
+        if component_id in components
+    ]
+    return ranked, len(snapshot)
@@ -0,0 +1,174 @@
+"""
+Pareto-front (skyline) ranking of scored components
+
+A component is dominated when another one is at least as good on every
+objective (higher match score, lower price, shorter lead time, higher rating)
+and strictly better on one. The non-dominated set is found with a sweep
+instead of pairwise comparison: match scores take only a handful of values,
+so each score level is swept once in rating order while a 2-D staircase
+(price -> best lead time) of the non-dominated components seen so far
+answers "is there a better one?" with a binary search. That is
+O(n log n) per score level.
+"""
+import math
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+
+from parts.normalization import parse_price, parse_lead_time_days
+
+
+INFINITY = float('inf')
+
+
+class Staircase:
+    """
+    Non-dominated (price, lead time) points, price ascending and lead time
+    strictly descending, with the best score and rating seen at each point
+    """
+
+    def __init__(self):
+        self.prices = []
+        self.leads = []
+        self.tops = []  # (max score, max rating) of the points at each entry
+
+    def dominates(self, price, lead, score, rating):
+        """
+        True if an inserted point dominates (price, lead, score, rating),
+        given every inserted point has score >= score and rating >= rating
+        """
+        i = bisect_right(self.prices, price) - 1
+        if i < 0 or self.leads[i] > lead:
+            return False
+        if self.leads[i] < lead or self.prices[i] < price:
+            return True
+        top_score, top_rating = self.tops[i]
+        return top_score > score or top_rating > rating
+
+    def insert(self, price, lead, score, rating):
+        pos = bisect_left(self.prices, price)
+        if pos > 0 and self.leads[pos - 1] <= lead:
+            return
+
+        if pos < len(self.prices) and self.prices[pos] == price:
+            if self.leads[pos] == lead:
+                top_score, top_rating = self.tops[pos]
+                self.tops[pos] = (max(top_score, score), max(top_rating, rating))
+                return
+            if self.leads[pos] < lead:
+                return
+
+        end = pos
+        while end < len(self.prices) and self.leads[end] >= lead:
+            end += 1
+        self.prices[pos:end] = [price]
+        self.leads[pos:end] = [lead]
+        self.tops[pos:end] = [(score, rating)]
+
+
+def objectives(component, evaluation):
+    """(score, price, lead time days, rating); missing values rank worst"""
+    price = parse_price(component.price)
+    lead = parse_lead_time_days(component.lead_time)
+    return (
+        evaluation['match_score'],
+        INFINITY if price is None else price,
+        INFINITY if lead is None else lead,
+        component.rating or 0.0,
+    )
+
+
+def pareto_front(candidates):
+    """
+    Return the non-dominated candidates
+
+    candidates is a list of (item, (score, price, lead, rating)) pairs;
+    catalog order of the input is kept in the output.
+    """
+    by_score = {}
+    for index, (item, objective) in enumerate(candidates):
+        by_score.setdefault(objective[0], []).append(index)
+
+    front = []  # indexes of non-dominated candidates
+    for score in sorted(by_score, reverse=True):
+        # Front members from higher score levels go first on ties so they
+        # are in the staircase before equal current-level points are queried
+        sweep = [(candidates[i][1], 0, i) for i in front]
+        sweep += [(candidates[i][1], 1, i) for i in by_score[score]]
+        sweep.sort(key=lambda entry: (-entry[0][3], entry[0][1], entry[0][2], entry[1]))
+
+        staircase = Staircase()
+        for (point_score, price, lead, rating), is_current, index in sweep:
+            if is_current and staircase.dominates(price, lead, point_score, rating):
+                continue
+            staircase.insert(price, lead, point_score, rating)
+            if is_current:
+                front.append(index)
+
+    return [candidates[i] for i in sorted(front)]
+
+
+def validate_weights(weights):
+    """
+    Raise ValueError unless weights is None or a dict mapping some of
+    score, price, leadTime and rating to finite numbers
+    """
+    if weights is None:
+        return
+    if not isinstance(weights, dict):
+        raise ValueError('rankingWeights must be an object')
+    for key, value in weights.items():
+        if key not in settings.PARETO_DEFAULT_WEIGHTS:
+            raise ValueError(
+                f'rankingWeights keys must be among: {", ".join(settings.PARETO_DEFAULT_WEIGHTS)}'
+            )
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f'rankingWeights.{key} must be a number')
+
+
+def weighted_order(front, weights=None):
+    """
+    Order front members by a weighted sum of normalized objectives
+
+    weights maps score, price, leadTime and rating to their importance;
+    missing keys fall back to PARETO_DEFAULT_WEIGHTS.
+    """
+    weights = {**settings.PARETO_DEFAULT_WEIGHTS, **(weights or {})}
+
+    def span(values):
+        finite = [v for v in values if v != INFINITY]
+        if not finite:
+            return 0.0, 0.0
+        return min(finite), max(finite)
+
+    price_lo, price_hi = span(objective[1] for _, objective in front)
+    lead_lo, lead_hi = span(objective[2] for _, objective in front)
+
+    def lower_is_better(value, lo, hi):
+        if value == INFINITY:
+            return 0.0
+        return 1.0 if hi == lo else (hi - value) / (hi - lo)
+
+    def utility(candidate):
+        score, price, lead, rating = candidate[1]
+        return (
+            float(weights['score']) * score / 100
+            + float(weights['price']) * lower_is_better(price, price_lo, price_hi)
+            + float(weights['leadTime']) * lower_is_better(lead, lead_lo, lead_hi)
+            + float(weights['rating']) * rating / 5
+        )
+
+    return sorted(front, key=utility, reverse=True)
+
+
+def pareto_rank(ranked, weights=None):
+    """
+    Pareto ranking of (component, evaluation) pairs
+
+    Returns the non-dominated pairs ordered by weighted tie-break utility.
+    """
+    candidates = [
+        ((component, evaluation), objectives(component, evaluation))
+        for component, evaluation in ranked
+    ]
+    return [pair for pair, _ in weighted_order(pareto_front(candidates), weights)]
@@ -0,0 +1,114 @@
+"""
+Response renderers for the API
+"""
+from rest_framework.renderers import JSONRenderer
+from parts.models import CatalogVersion
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson
+
+    Produces the same output as DRF's JSONRenderer for compact, unicode JSON.
+    Datetimes are encoded natively; Decimal, lazy strings and other types go
+    through DRF's JSONEncoder. Falls back to the stdlib renderer when orjson is
+    not installed, or for indented/ASCII-only output (e.g. the browsable API).
+    """
+    orjson_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=self.orjson_options)
+
+        # Keep the output a strict javascript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+# Per-component fields sent positionally in compact selection responses
+COMPACT_FIELDS = [
+    'id', 'name', 'manufacturer', 'partNumber', 'price', 'availability',
+    'leadTime', 'rating', 'vendorUrl', 'matchScore',
+]
+
+
+def compact_selection(data):
+    """
+    Re-encode a select_parts response in the compact layout
+
+    Criteria names, requirements and weights and metric labels and targets
+    depend only on the requirement form, so they are sent once in the header.
+    Each recommendation becomes a positional array:
+        [*COMPACT_FIELDS, criteria values, criteria met flags, metric values, metric met flags,
+         similar component ids]
+    Static catalog text (specifications, pros, cons, alternatives) is left out;
+    clients fetch it from the component detail endpoint and cache it by id
+    until catalogVersion changes.
+    """
+    recommendations = data.get('recommendations', [])
+    first = recommendations[0] if recommendations else {}
+
+    rows = []
+    for recommendation in recommendations:
+        criteria = recommendation.get('criteriaMatches', [])
+        metrics = recommendation.get('performanceMetrics', [])
+        rows.append([recommendation.get(field) for field in COMPACT_FIELDS] + [
+            [c['value'] for c in criteria],
+            [int(c['met']) for c in criteria],
+            [m['value'] for m in metrics],
+            [int(m['met']) for m in metrics],
+            [s['id'] for s in recommendation.get('similarComponents', [])],
+        ])
+
+    compact = {
+        'format': 'compact',
+        'fields': COMPACT_FIELDS + [
+            'criteriaValues', 'criteriaMet', 'metricValues', 'metricMet', 'similarComponentIds',
+        ],
+        'criteria': [
+            [c['name'], c['requirement'], c['weight']]
+            for c in first.get('criteriaMatches', [])
+        ],
+        'metrics': [
+            [m['label'], m['target']]
+            for m in first.get('performanceMetrics', [])
+        ],
+        'catalogVersion': CatalogVersion.current(),
+        'componentUrl': '/api/components/{id}/',
+        'recommendations': rows,
+    }
+    compact.update({
+        key: value for key, value in data.items() if key != 'recommendations'
+    })
+    return compact
+
+
+class CompactSelectionRenderer(FastJSONRenderer):
+    """
+    Compact JSON for selection results
+
+    Negotiated with `Accept: application/vnd.cots.compact+json` or
+    `?format=compact`. Responses without recommendations (errors) are
+    rendered unchanged.
+    """
+    media_type = 'application/vnd.cots.compact+json'
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'recommendations' in data:
+            data = compact_selection(data)
+        return super().render(data, accepted_media_type, renderer_context)
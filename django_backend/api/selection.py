@@ -0,0 +1,232 @@
+"""
+Component selection: scoring, ranking and recommendation payloads
+Shared by the sync and async selection endpoints
+"""
+from parts.models import TYPE_SPEC_FIELDS, Component, SelectionHistory
+from api.criteria_engine import evaluate_criteria
+from api.parallel_scoring import use_parallel_scoring, parallel_rank
+from api.ranking import pareto_rank
+
+
+# Spec columns read by every selection query, besides the type's own fields
+SPEC_BOOKKEEPING_FIELDS = ['component_type', 'created_at', 'updated_at']
+
+
+def catalog_components(component_type):
+    """
+    Components of one type with their specifications, highest rated first
+    
+    Only the type's own spec columns are loaded, so the specification join
+    is answered from that type's partial index instead of the wide rows.
+    Components without a specification are left out.
+    """
+    component_type = component_type.lower()
+    deferred = [
+        f'specification__{name}'
+        for other_type, fields in TYPE_SPEC_FIELDS.items() if other_type != component_type
+        for name in fields
+    ] + [f'specification__{name}' for name in SPEC_BOOKKEEPING_FIELDS]
+    return Component.objects.filter(
+        component_type=component_type,
+        specification__component_type=component_type,
+    ).select_related('specification').defer(*deferred).order_by('-rating', 'id')
+
+
+def rank_components(component_type, form_data, k=3):
+    """
+    Rank the catalog of one component type against the requirements
+    
+    Returns ((component, evaluation) pairs for the best k, total number of
+    scored components). Large catalogs are scored on the process pool.
+    """
+    if use_parallel_scoring(component_type):
+        return parallel_rank(component_type, form_data, k)
+    
+    ranked = score_components(component_type, form_data, catalog_components(component_type))
+    return ranked[:k], len(ranked)
+
+
+def rank_pareto(component_type, form_data, weights=None):
+    """
+    Pareto-front ranking over match score, price, lead time and rating
+    
+    Returns (non-dominated (component, evaluation) pairs ordered by the
+    tie-break weights, total number of scored components).
+    """
+    ranked = score_components(component_type, form_data, catalog_components(component_type))
+    return pareto_rank(ranked, weights), len(ranked)
+
+
+def score_components(component_type, form_data, components):
+    """
+    Evaluate components against the requirements and rank them
+    
+    Returns (component, evaluation) pairs sorted by match score, best first.
+    Components without a specification are skipped. The sort is stable, so
+    ties keep the queryset order (highest rated first).
+    """
+    ranked = []
+    
+    for component in components:
+        spec = getattr(component, 'specification', None)
+        if not spec:
+            continue
+        
+        evaluation = evaluate_criteria(component_type, form_data, spec)
+        ranked.append((component, evaluation))
+    
+    ranked.sort(key=lambda pair: pair[1]['match_score'], reverse=True)
+    return ranked
+
+
+def build_recommendation(component_type, form_data, component, evaluation):
+    """Build the recommendation payload for a scored component"""
+    return {
+        'id': component.id,
+        'name': component.name,
+        'manufacturer': component.manufacturer,
+        'partNumber': component.part_number,
+        'price': component.price,
+        'availability': component.availability,
+        'leadTime': component.lead_time,
+        'rating': component.rating,
+        'vendorUrl': component.vendor_url,
+        'specifications': component.specifications,
+        'pros': component.pros,
+        'cons': component.cons,
+        'alternatives': component.alternatives,
+        'matchScore': evaluation['match_score'],
+        'criteriaMatches': evaluation['criteria'],
+        'performanceMetrics': get_performance_metrics(
+            component_type, form_data, component.specification
+        ),
+    }
+
+
+def selection_history_entry(component_type, form_data, top_recommendations):
+    """Build SelectionHistory field values for the best recommendation"""
+    return {
+        'component_type': component_type.lower(),
+        'form_data': form_data,
+        'selected_component_id': top_recommendations[0]['id'],
+        'match_score': top_recommendations[0]['matchScore'],
+        'criteria_matches': top_recommendations[0]['criteriaMatches'],
+    }
+
+
+def record_selection(component_type, form_data, top_recommendations):
+    """Save the best recommendation to the selection history"""
+    if top_recommendations:
+        SelectionHistory.record(
+            **selection_history_entry(component_type, form_data, top_recommendations)
+        )
+
+
+def get_performance_metrics(component_type, form_data, spec):
+    """Generate performance metrics for component"""
+    # Built lazily so only the component type's own spec fields are read
+    metrics_map = {
+        'bearing': lambda: [
+            {
+                'label': 'Dynamic Load Capacity vs Requirement',
+                'value': f'{spec.dynamic_load_rating or 0} kN',
+                'target': f'{form_data.get("dynamicLoad", 0)} kN',
+                'met': (spec.dynamic_load_rating or 0) >= float(form_data.get("dynamicLoad", 0))
+            },
+            {
+                'label': 'Speed Rating',
+                'value': f'{spec.speed_rating or 0} RPM',
+                'target': f'{form_data.get("speed", 0)} RPM',
+                'met': (spec.speed_rating or 0) >= float(form_data.get("speed", 0))
+            },
+            {
+                'label': 'L10 Life',
+                'value': f'{spec.l10_life or 0} hours',
+                'target': f'{form_data.get("targetL10Life", 0)} hours',
+                'met': (spec.l10_life or 0) >= float(form_data.get("targetL10Life", 0))
+            },
+        ],
+        'motor': lambda: [
+            {
+                'label': 'Power Output Efficiency',
+                'value': f'{spec.efficiency or 85.3}%',
+                'target': '≥80%',
+                'met': True
+            },
+            {
+                'label': 'Speed Match',
+                'value': f'{spec.speed or 0} RPM',
+                'target': f'{form_data.get("speed", 0)} RPM',
+                'met': (spec.speed or 0) == float(form_data.get("speed", 0))
+            },
+            {
+                'label': 'Thermal Capability',
+                'value': f'{spec.insulation_class or "F"} class insulation',
+                'target': 'Class F insulation',
+                'met': True
+            },
+        ],
+        'gear': lambda: [
+            {
+                'label': 'Power Transmission',
+                'value': f'{spec.power_transmission or 15} kW',
+                'target': f'{form_data.get("power", 0)} kW',
+                'met': (spec.power_transmission or 15) >= float(form_data.get("power", 0))
+            },
+            {
+                'label': 'Module Precision',
+                'value': f'{spec.precision_grade or "ISO 7"} grade',
+                'target': 'High precision',
+                'met': True
+            },
+            {
+                'label': 'Material Quality',
+                'value': f'{spec.gear_material or "Steel"}',
+                'target': 'High-strength material',
+                'met': True
+            },
+        ],
+        'seal': lambda: [
+            {
+                'label': 'Pressure Rating',
+                'value': f'{spec.pressure_rating or 50} bar',
+                'target': f'{form_data.get("pressure", 0)} bar',
+                'met': (spec.pressure_rating or 50) >= float(form_data.get("pressure", 0))
+            },
+            {
+                'label': 'Leakage Rate',
+                'value': '<0.1 cc/hour',
+                'target': 'Zero leak',
+                'met': True
+            },
+            {
+                'label': 'Elastomer Durability',
+                'value': '5 years min',
+                'target': 'Long-term reliability',
+                'met': True
+            },
+        ],
+        'fastener': lambda: [
+            {
+                'label': 'Tensile Strength',
+                'value': f'{spec.tensile_strength or 800} MPa',
+                'target': 'High-strength required',
+                'met': True
+            },
+            {
+                'label': 'Clamp Load Capacity',
+                'value': f'{spec.clamp_load_capacity or 12000} N',
+                'target': f'{form_data.get("clampLoad", 0)} N',
+                'met': (spec.clamp_load_capacity or 12000) >= float(form_data.get("clampLoad", 0))
+            },
+            {
+                'label': 'Corrosion Resistance',
+                'value': 'Zinc-plated',
+                'target': f'{form_data.get("fastenerEnvironment", "Dry")}',
+                'met': True
+            },
+        ]
+    }
+    
+    build = metrics_map.get(component_type.lower())
+    return build() if build else []
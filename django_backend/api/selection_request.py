@@ -0,0 +1,122 @@
+"""
+Selection request handling shared by select_parts and select_parts_async
+
+Both endpoints validate the same body, rank through the same path
+(materialized rankings, Pareto mode, coalescing of identical concurrent
+requests) and return the same response; only the transport differs.
+"""
+from datetime import datetime
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from parts.models import CatalogVersion, Component
+from api.coalescing import coalesce
+from api.materialized import form_key, lookup_materialized
+from api.ranking import validate_weights
+from api.selection import rank_components, rank_pareto, build_recommendation, record_selection
+from api.selection_stream import STREAM_FORMATS
+from api.similarity import attach_similar_components
+
+
+RANKING_MODES = ('score', 'pareto')
+
+
+def selection_error(form_data, stream=None):
+    """Why a selection request is invalid (a 400 message), or None"""
+    if not form_data.get('componentType'):
+        return 'componentType is required'
+
+    ranking_mode = form_data.get('rankingMode', 'score')
+    if ranking_mode not in RANKING_MODES:
+        return 'rankingMode must be "score" or "pareto"'
+    if ranking_mode == 'pareto':
+        try:
+            validate_weights(form_data.get('rankingWeights'))
+        except ValueError as e:
+            return str(e)
+
+    if stream:
+        if stream not in STREAM_FORMATS:
+            return f'stream must be one of: {", ".join(STREAM_FORMATS)}'
+        if ranking_mode != 'score':
+            return 'stream is only available with rankingMode "score"'
+    return None
+
+
+def has_components(component_type):
+    return Component.objects.filter(component_type=component_type.lower()).exists()
+
+
+def rank_selection(component_type, form_data):
+    """The select_parts result without a timestamp, or None for an empty catalog"""
+    if not has_components(component_type):
+        return None
+
+    if form_data.get('rankingMode', 'score') == 'pareto':
+        front, total_matches = rank_pareto(
+            component_type, form_data, form_data.get('rankingWeights')
+        )
+        top_recommendations = [
+            build_recommendation(component_type, form_data, component, evaluation)
+            for component, evaluation in front[:settings.PARETO_MAX_RESULTS]
+        ]
+        attach_similar_components(component_type, top_recommendations)
+        return {
+            'recommendations': top_recommendations,
+            'totalMatches': total_matches,
+            'rankingMode': 'pareto',
+            'frontSize': len(front),
+        }
+
+    # Frequent requirement forms are precomputed (materialize_selections)
+    materialized = lookup_materialized(form_data)
+    if materialized:
+        top_recommendations = materialized.recommendations
+        total_matches = materialized.total_matches
+    else:
+        # Evaluate each component against criteria
+        ranked, total_matches = rank_components(component_type, form_data, 3)
+
+        # Build full recommendation objects for the top 3 only
+        top_recommendations = [
+            build_recommendation(component_type, form_data, component, evaluation)
+            for component, evaluation in ranked
+        ]
+
+    attach_similar_components(component_type, top_recommendations)
+    return {
+        'recommendations': top_recommendations,
+        'totalMatches': total_matches,
+    }
+
+
+def run_selection(component_type, form_data):
+    """
+    Rank a validated request and record it in the selection history
+
+    Returns the response body, or None if there are no components of the
+    type. Identical concurrent requests are ranked once (see api.coalescing).
+    """
+    result = coalesce(
+        f'{form_key(form_data)}:{CatalogVersion.current()}',
+        lambda: rank_selection(component_type, form_data),
+    )
+    if result is None:
+        return None
+
+    record_selection(component_type, form_data, result['recommendations'])
+    return {
+        **result,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def streaming_selection_response(stream, events):
+    """StreamingHttpResponse for the encoded events of a ?stream= request"""
+    content_type, _ = STREAM_FORMATS[stream]
+    response = StreamingHttpResponse(events, content_type=content_type)
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the events
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,128 @@
+"""
+Progressive selection results
+
+With ?stream=ndjson or ?stream=sse, select_parts scans the catalog in chunks
+of SELECTION_STREAM_CHUNK_SIZE components and sends the running top 3 after
+each chunk, then the final ranking exactly as the non-streaming response
+returns it. Clients can show good candidates while scoring continues.
+"""
+import heapq
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from api.criteria_engine import evaluate_criteria
+from api.materialized import lookup_materialized
+from api.renderers import FastJSONRenderer
+from api.selection import catalog_components, build_recommendation, record_selection
+from api.similarity import attach_similar_components
+
+
+def _ndjson_event(event, data):
+    return FastJSONRenderer().render({'event': event, **data}) + b'\n'
+
+
+def _sse_event(event, data):
+    return b'event: ' + event.encode() + b'\ndata: ' + FastJSONRenderer().render(data) + b'\n\n'
+
+
+STREAM_FORMATS = {
+    # name: (content type, event encoder)
+    'ndjson': ('application/x-ndjson', _ndjson_event),
+    'sse': ('text/event-stream', _sse_event),
+}
+
+
+def _running_entry(component, evaluation):
+    return {
+        'id': component.id,
+        'name': component.name,
+        'manufacturer': component.manufacturer,
+        'partNumber': component.part_number,
+        'rating': component.rating,
+        'matchScore': evaluation['match_score'],
+    }
+
+
+def iter_selection(component_type, form_data, k=3, chunk_size=None):
+    """
+    Yield ('progress', data) after each chunk of the catalog, then
+    ('result', data) with the select_parts response
+
+    The running top k is kept in a heap ordered by match score, then catalog
+    order, so it ends as the same ranking score_components produces.
+    """
+    chunk_size = chunk_size or settings.SELECTION_STREAM_CHUNK_SIZE
+
+    # Frequent requirement forms are precomputed (materialize_selections)
+    materialized = lookup_materialized(form_data)
+    if materialized:
+        top_recommendations = materialized.recommendations
+        total_matches = materialized.total_matches
+    else:
+        components = catalog_components(component_type)
+        total = components.count()
+        top = []  # min-heap of (match score, -catalog position, component, evaluation)
+        scanned = 0
+        for component in components.iterator(chunk_size=chunk_size):
+            spec = getattr(component, 'specification', None)
+            if spec:
+                evaluation = evaluate_criteria(component_type, form_data, spec)
+                entry = (evaluation['match_score'], -scanned, component, evaluation)
+                if len(top) < k:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
+                scanned += 1
+
+                if scanned % chunk_size == 0 and scanned < total:
+                    yield 'progress', {
+                        'scanned': scanned,
+                        'total': total,
+                        'recommendations': [
+                            _running_entry(component, evaluation)
+                            for _, _, component, evaluation in heapq.nlargest(k, top, key=lambda e: e[:2])
+                        ],
+                    }
+
+        top_recommendations = [
+            build_recommendation(component_type, form_data, component, evaluation)
+            for _, _, component, evaluation in heapq.nlargest(k, top, key=lambda e: e[:2])
+        ]
+        total_matches = scanned
+
+    attach_similar_components(component_type, top_recommendations)
+    record_selection(component_type, form_data, top_recommendations)
+    yield 'result', {
+        'recommendations': top_recommendations,
+        'totalMatches': total_matches,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+
+def stream_selection(stream_format, component_type, form_data):
+    """Encoded events of iter_selection; a failure ends the stream with an error event"""
+    _, encode = STREAM_FORMATS[stream_format]
+    try:
+        for event, data in iter_selection(component_type, form_data):
+            yield encode(event, data)
+    except Exception as e:
+        yield encode('error', {'error': f'Error processing request: {str(e)}'})
+
+
+async def astream_selection(stream_format, component_type, form_data):
+    """
+    stream_selection for ASGI servers, which would otherwise collect a
+    synchronous stream into a list before sending it
+
+    Each event is produced on the thread-sensitive executor, so the catalog
+    cursor stays on one thread.
+    """
+    events = stream_selection(stream_format, component_type, form_data)
+    next_event = sync_to_async(next)
+    while True:
+        event = await next_event(events, None)
+        if event is None:
+            return
+        yield event
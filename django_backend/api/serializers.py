@@ -22,15 +22,18 @@ class ComponentSerializer(serializers.ModelSerializer):
 
 
 class SelectionHistorySerializer(serializers.ModelSerializer):
+    criteria_matches = serializers.JSONField(source='criteria', read_only=True)
+    
     class Meta:
         model = SelectionHistory
-        fields = '__all__'
+        exclude = ['criteria_payload']
 
 
 class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
-        fields = '__all__'
+        # version only guards conditional updates (Cart.update_components)
+        exclude = ['version']
 
 
 class ComponentSelectionRequestSerializer(serializers.Serializer):
@@ -0,0 +1,256 @@
+"""
+Similar components from nearest neighbours in spec space
+
+Each component type has a k-d tree over its numeric snapshot columns,
+z-normalized so that every spec weighs the same and missing values sit at
+the mean. The tree is built once per process from the catalog snapshot and
+then kept current from the CatalogChange log: changed components are
+tombstoned in the tree and their new vectors go to a small delta buffer that
+is scanned linearly. Past MAX_DELTA_FRACTION of the tree it is rebuilt.
+"""
+import copy
+import heapq
+import math
+import threading
+
+from django.conf import settings
+from django.db.models import Min
+
+from parts.models import CatalogChange, CatalogVersion, Component, ComponentSpecification
+from api.catalog_snapshot import get_catalog_snapshot
+
+
+# Points per leaf; below this a linear scan beats descending further
+LEAF_SIZE = 8
+
+# Rebuild once the delta buffer and tombstones exceed this share of the tree
+MAX_DELTA_FRACTION = 0.1
+MIN_DELTA_LIMIT = 64
+
+
+class KDTree:
+    """Exact k-nearest-neighbour search over fixed-length float tuples"""
+
+    def __init__(self, points):
+        self.points = points
+        self.root = self._build(list(range(len(points))), 0) if points else None
+
+    def _build(self, indexes, depth):
+        if len(indexes) <= LEAF_SIZE:
+            return indexes
+        axis = depth % len(self.points[indexes[0]])
+        indexes.sort(key=lambda i: self.points[i][axis])
+        middle = len(indexes) // 2
+        return (
+            axis, self.points[indexes[middle]][axis],
+            self._build(indexes[:middle], depth + 1),
+            self._build(indexes[middle:], depth + 1),
+        )
+
+    def nearest(self, query, k, skip=()):
+        """
+        Return [(distance, index)] of the k nearest points, closest first,
+        leaving out the indexes in skip
+        """
+        heap = []  # (-distance, -index): the worst kept point on top
+        if self.root is None or k <= 0:
+            return []
+        points = self.points
+        dist = math.dist
+
+        def visit(node):
+            if isinstance(node, list):
+                for index in node:
+                    if index in skip:
+                        continue
+                    entry = (-dist(points[index], query), -index)
+                    if len(heap) < k:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+                return
+            axis, split, left, right = node
+            offset = query[axis] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            visit(near)
+            if len(heap) < k or abs(offset) <= -heap[0][0]:
+                visit(far)
+
+        visit(self.root)
+        return sorted((-distance, -index) for distance, index in heap)
+
+
+class SimilarityIndex:
+    """Nearest-neighbour index of one component type at one catalog version"""
+
+    def __init__(self, component_type, version, ids, columns):
+        self.component_type = component_type
+        self.version = version
+        self.columns = list(columns)
+        self.means = []
+        self.scales = []
+        for values in columns.values():
+            present = [value for value in values if not math.isnan(value)]
+            mean = sum(present) / len(present) if present else 0.0
+            variance = sum((value - mean) ** 2 for value in present) / len(present) if present else 0.0
+            self.means.append(mean)
+            self.scales.append(math.sqrt(variance) or 1.0)
+
+        self.ids = list(ids)
+        points = [
+            self.vector(values)
+            for values in zip(*columns.values())
+        ] if self.columns else [() for _ in self.ids]
+        self.tree = KDTree(points)
+        self.positions = {component_id: position for position, component_id in enumerate(self.ids)}
+        self.tombstones = set()  # tree positions of changed or deleted components
+        self.delta = {}  # component id -> vector, for components changed since the build
+
+    @classmethod
+    def build(cls, component_type):
+        snapshot = get_catalog_snapshot(component_type)
+        return cls(component_type, snapshot.version, snapshot.ids, snapshot.columns)
+
+    def vector(self, values):
+        return tuple(
+            0.0 if value is None or math.isnan(value) else (value - mean) / scale
+            for value, mean, scale in zip(values, self.means, self.scales)
+        )
+
+    def __len__(self):
+        return len(self.ids) - len(self.tombstones) + len(self.delta)
+
+    def needs_rebuild(self):
+        limit = max(MIN_DELTA_LIMIT, MAX_DELTA_FRACTION * len(self.ids))
+        return len(self.tombstones) + len(self.delta) > limit
+
+    def with_changes(self, component_ids, version):
+        """
+        Copy of the index at a later version, with the changed components
+        tombstoned and their current vectors buffered; the tree is shared, so
+        requests still reading this index are not disturbed
+        """
+        updated = copy.copy(self)
+        updated.version = version
+        updated.tombstones = set(self.tombstones)
+        updated.delta = dict(self.delta)
+        for component_id in component_ids:
+            position = self.positions.get(component_id)
+            if position is not None:
+                updated.tombstones.add(position)
+            updated.delta.pop(component_id, None)
+
+        rows = ComponentSpecification.objects.filter(
+            component_id__in=list(component_ids), component_type=self.component_type
+        ).values_list('component_id', *self.columns)
+        for component_id, *values in rows:
+            updated.delta[component_id] = self.vector(values)
+        return updated
+
+    def lookup(self, component_id):
+        """Current vector of a component, or None if it is not indexed"""
+        if component_id in self.delta:
+            return self.delta[component_id]
+        position = self.positions.get(component_id)
+        if position is None or position in self.tombstones:
+            return None
+        return self.tree.points[position]
+
+    def nearest(self, component_id, k):
+        """[(component id, distance)] of the k components most like component_id"""
+        query = self.lookup(component_id)
+        if query is None:
+            return []
+
+        skip = self.tombstones
+        own_position = self.positions.get(component_id)
+        if own_position is not None:
+            skip = skip | {own_position}
+        candidates = [
+            (distance, self.ids[position])
+            for distance, position in self.tree.nearest(query, k, skip)
+        ]
+        for other_id, vector in self.delta.items():
+            if other_id != component_id:
+                candidates.append((math.dist(vector, query), other_id))
+        return [(other_id, distance) for distance, other_id in heapq.nsmallest(k, candidates)]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def _refresh(index, version):
+    """Bring an index up to a catalog version; returns None if it must be rebuilt"""
+    oldest = CatalogChange.objects.aggregate(oldest=Min('catalog_version'))['oldest']
+    # Entries the index has not seen may have been pruned from the log
+    if oldest is None or oldest > index.version + 1:
+        return None
+
+    changed = set(CatalogChange.objects.filter(
+        catalog_version__gt=index.version,
+        catalog_version__lte=version,
+    ).values_list('component_id', flat=True))
+    index = index.with_changes(changed, version)
+    return None if index.needs_rebuild() else index
+
+
+def get_similarity_index(component_type):
+    """Return the index of a component type for the current catalog version"""
+    component_type = component_type.lower()
+    version = CatalogVersion.current()
+
+    index = _indexes.get(component_type)
+    if index is not None and index.version == version:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(component_type)
+        if index is None or index.version != version:
+            if index is not None:
+                index = _refresh(index, version)
+            if index is None:
+                index = SimilarityIndex.build(component_type)
+            _indexes[component_type] = index
+    return index
+
+
+def similar_components(components, count=None):
+    """
+    Map each (component id, component type) pair to its `count` nearest
+    neighbours as response payloads, resolving their names in one query
+    """
+    count = settings.SIMILAR_COMPONENTS_COUNT if count is None else count
+    if count <= 0:
+        return {}
+
+    neighbours = {
+        component_id: get_similarity_index(component_type).nearest(component_id, count)
+        for component_id, component_type in components
+    }
+    details = Component.objects.only('name', 'manufacturer', 'part_number', 'rating').in_bulk(
+        {other_id for found in neighbours.values() for other_id, _ in found}
+    )
+    return {
+        component_id: [
+            {
+                'id': other_id,
+                'name': details[other_id].name,
+                'manufacturer': details[other_id].manufacturer,
+                'partNumber': details[other_id].part_number,
+                'rating': details[other_id].rating,
+                'distance': round(distance, 4),
+            }
+            for other_id, distance in found
+            if other_id in details
+        ]
+        for component_id, found in neighbours.items()
+    }
+
+
+def attach_similar_components(component_type, recommendations):
+    """Add a similarComponents list to each recommendation payload"""
+    similar = similar_components([(recommendation['id'], component_type) for recommendation in recommendations])
+    for recommendation in recommendations:
+        recommendation['similarComponents'] = similar.get(recommendation['id'], [])
+    return recommendations
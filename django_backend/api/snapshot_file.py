@@ -0,0 +1,192 @@
+"""
+Binary catalog snapshot files, memory-mapped read-only
+
+One file per component type holds the component ids, the numeric spec
+columns and a string table for the text spec fields, laid out so they can
+be used straight from the mapping without parsing. Every worker process maps
+the same file and shares one page-cache copy. Files are written to a
+temporary name and renamed into place, so readers see either the old or the
+new snapshot, never a partial one.
+
+Layout (native byte order):
+    header       magic, catalog version, catalog fingerprint, rows, numeric
+                 columns, string columns, distinct strings, length of the
+                 names block
+    names        newline-separated column names, padded to 8 bytes
+    ids          rows x int64
+    numeric      one rows x float64 block per numeric column (NaN = NULL)
+    string refs  one rows x int32 block per string column (-1 = NULL),
+                 padded to 8 bytes
+    offsets      (distinct strings + 1) x uint64 into the string data
+    string data  UTF-8, each distinct value once
+"""
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; rebuilds are then not serialized
+    fcntl = None
+
+
+MAGIC = b'COTSSNP2'
+HEADER = struct.Struct('=8sQQQIIQQ')
+
+
+def snapshot_path(directory, component_type):
+    return os.path.join(directory, f'{component_type}.snap')
+
+
+def _padding(length):
+    return b'\0' * (-length % 8)
+
+
+def write_snapshot_file(path, version, ids, columns, strings, fingerprint=0):
+    """
+    Write a snapshot atomically
+
+    ids is an array('q'), columns maps names to array('d') and strings maps
+    names to lists of str or None, all in the same row order. fingerprint is
+    an opaque 64-bit value stored with the version for readers to compare.
+    """
+    string_index = {}
+    offsets = array('Q', [0])
+    data = bytearray()
+    references = {}
+    for name, values in strings.items():
+        refs = array('i')
+        for value in values:
+            if value is None:
+                refs.append(-1)
+                continue
+            position = string_index.get(value)
+            if position is None:
+                position = string_index[value] = len(offsets) - 1
+                data += value.encode('utf-8')
+                offsets.append(len(data))
+            refs.append(position)
+        references[name] = refs
+
+    names = '\n'.join([*columns, *strings]).encode('ascii')
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(
+                MAGIC, version, fingerprint, len(ids), len(columns), len(strings), len(offsets) - 1, len(names)
+            ))
+            f.write(names + _padding(len(names)))
+            f.write(ids.tobytes())
+            for column in columns.values():
+                f.write(column.tobytes())
+            refs_length = 0
+            for refs in references.values():
+                f.write(refs.tobytes())
+                refs_length += len(refs) * refs.itemsize
+            f.write(_padding(refs_length))
+            f.write(offsets.tobytes())
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class StringColumn:
+    """Read-only sequence of str or None over a mapped string table"""
+
+    def __init__(self, refs, offsets, data):
+        self.refs = refs
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.refs)
+
+    def __getitem__(self, row):
+        position = self.refs[row]
+        if position < 0:
+            return None
+        return str(self.data[self.offsets[position]:self.offsets[position + 1]], 'utf-8')
+
+
+class SnapshotFile:
+    """
+    A mapped snapshot file
+
+    ids and columns are memoryviews into the mapping; strings maps names to
+    StringColumn. The mapping stays open as long as any of them is referenced.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.mmap)
+
+        (magic, self.version, self.fingerprint, rows, numeric_count, string_count,
+         distinct, names_length) = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a catalog snapshot')
+
+        refs_length = rows * 4 * string_count
+        expected = (
+            HEADER.size + names_length + len(_padding(names_length))
+            + rows * 8 * (1 + numeric_count) + refs_length + len(_padding(refs_length))
+            + (distinct + 1) * 8
+        )
+        if len(buffer) < expected:
+            raise ValueError(f'{path} is truncated')
+
+        offset = HEADER.size
+        names = bytes(buffer[offset:offset + names_length]).decode('ascii').split('\n') if names_length else []
+        offset += names_length + len(_padding(names_length))
+        numeric_names, string_names = names[:numeric_count], names[numeric_count:]
+
+        def take(length, fmt):
+            nonlocal offset
+            view = buffer[offset:offset + length].cast(fmt)
+            offset += length
+            return view
+
+        self.ids = take(rows * 8, 'q')
+        self.columns = {name: take(rows * 8, 'd') for name in numeric_names}
+        references = {name: take(rows * 4, 'i') for name in string_names}
+        offset += len(_padding(refs_length))
+        offsets = take((distinct + 1) * 8, 'Q')
+        data = buffer[offset:]
+        if len(data) < offsets[distinct]:
+            raise ValueError(f'{path} is truncated')
+        self.strings = {name: StringColumn(refs, offsets, data) for name, refs in references.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def read_snapshot_file(path):
+    """Map a snapshot file, or return None if it is missing or unreadable"""
+    try:
+        return SnapshotFile(path)
+    except (FileNotFoundError, ValueError, struct.error):
+        return None
+
+
+@contextmanager
+def rebuild_lock(path):
+    """Serialize snapshot rebuilds across processes so only one worker builds"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
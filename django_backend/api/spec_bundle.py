@@ -0,0 +1,76 @@
+"""
+Multi-component specification sheet bundles
+
+Components are loaded in one query and evaluated against one requirement
+form. Sheets are rendered on a small thread pool a few components ahead of
+the one being written, so the response starts streaming after the first
+sheet instead of after the last.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.text import get_valid_filename
+
+from api.datasheets import datasheet_data
+from api.download_handler import generate_specs_csv
+from api.streaming import iter_zip
+
+
+BUNDLE_FORMATS = {
+    # name: (content type, file extension)
+    'csv': ('text/csv', 'csv'),
+    'zip': ('application/zip', 'zip'),
+}
+
+_render_executor = ThreadPoolExecutor(
+    max_workers=settings.BUNDLE_RENDER_WORKERS,
+    thread_name_prefix='spec-bundle',
+)
+
+
+def render_specs_sheet(component, form_data):
+    return generate_specs_csv(datasheet_data(component, form_data)).encode('utf-8')
+
+
+def iter_rendered(components, form_data, lookahead=None):
+    """Yield (component, sheet bytes) in order, rendering up to `lookahead` ahead"""
+    lookahead = lookahead or settings.BUNDLE_RENDER_WORKERS * 2
+    pending = deque()
+    components = iter(components)
+
+    for component in components:
+        pending.append((component, _render_executor.submit(render_specs_sheet, component, form_data)))
+        if len(pending) >= lookahead:
+            break
+
+    while pending:
+        component, future = pending.popleft()
+        try:
+            content = future.result()
+        except BaseException:
+            for _, queued in pending:
+                queued.cancel()
+            raise
+        next_component = next(components, None)
+        if next_component is not None:
+            pending.append((next_component, _render_executor.submit(render_specs_sheet, next_component, form_data)))
+        yield component, content
+
+
+def iter_bundle(components, form_data, output):
+    """Yield the bundle as byte chunks: one combined CSV, or a ZIP of sheets"""
+    rendered = iter_rendered(components, form_data)
+    if output == 'zip':
+        return iter_zip(
+            (get_valid_filename(f'{component.part_number}-specs.csv'), content)
+            for component, content in rendered
+        )
+    return _iter_combined_csv(rendered)
+
+
+def _iter_combined_csv(rendered):
+    for index, (_, content) in enumerate(rendered):
+        # Sheets are separated by a blank line, like the sections within one
+        yield (b'\n\n' if index else b'') + content
+    yield b'\n'
@@ -0,0 +1,49 @@
+"""
+Helpers for streaming generated files through StreamingHttpResponse
+"""
+import zipfile
+
+
+class ChunkSink:
+    """Write-only file object whose buffered bytes are drained after each piece"""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self.parts.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def iter_zip(entries):
+    """
+    Stream a ZIP archive of (filename, bytes) entries
+
+    Each entry is yielded as soon as it is compressed; the central directory
+    follows the last one. The sink is not seekable, so nothing is rewritten.
+    """
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for filename, content in entries:
+            archive.writestr(filename, content)
+            yield sink.drain()
+    yield sink.drain()
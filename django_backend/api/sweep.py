@@ -0,0 +1,176 @@
+"""
+Requirement sensitivity sweeps
+
+A sweep ranks one component type against a requirement form at each value of
+one swept parameter. The swept value only decides one criterion per
+component, and for every sweepable criterion the components that meet it
+form a contiguous window of the catalog sorted by the matching spec value.
+So the catalog is evaluated once, sorted once by that value, and each step
+only moves the window boundaries (found by binary search with the
+evaluator's own comparisons) and the components that cross them.
+"""
+import heapq
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+from api.catalog_snapshot import get_catalog_snapshot, row_spec
+from api.criteria_engine import evaluate_criteria
+
+
+# criterion: name of the criterion in evaluate_criteria's output
+# field, default: the spec value it compares (`field or default`)
+# kind: 'min' (value >= x), 'near' (|value - x| <= tolerance) or
+#       'band' (x * 0.8 <= value <= x * 1.2)
+SweptCriterion = namedtuple('SweptCriterion', 'criterion field default kind tolerance')
+
+SWEEP_PARAMETERS = {
+    'bearing': {
+        'dynamicLoad': SweptCriterion('Dynamic Load Capacity', 'dynamic_load_rating', 0, 'min', None),
+        'speed': SweptCriterion('Speed Rating', 'speed_rating', 0, 'min', None),
+        'targetL10Life': SweptCriterion('L10 Life (Bearing Life)', 'l10_life', 0, 'min', None),
+        'boreSize': SweptCriterion('Bore Size', 'bore_diameter', 0, 'near', 2),
+    },
+    'motor': {
+        'power': SweptCriterion('Power Output', 'power', 0, 'band', None),
+        'speed': SweptCriterion('Speed Rating', 'speed', 0, 'near', 100),
+    },
+    'gear': {
+        'power': SweptCriterion('Power Transmission', 'power_transmission', 15, 'min', None),
+        'moduleSize': SweptCriterion('Module Size', 'module', 2.0, 'near', 0.5),
+    },
+    'seal': {
+        'sealDiameter': SweptCriterion('Seal Diameter', 'seal_diameter', 30, 'near', 2),
+        'pressure': SweptCriterion('Pressure Rating', 'pressure_rating', 50, 'min', None),
+    },
+    'fastener': {
+        'clampLoad': SweptCriterion('Clamp Load Capacity', 'clamp_load_capacity', 12000, 'min', None),
+    },
+}
+
+
+def _first_true(values, predicate):
+    """Index of the first value for which a monotone predicate holds"""
+    low, high = 0, len(values)
+    while low < high:
+        middle = (low + high) // 2
+        if predicate(values[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def met_window(swept, values, x):
+    """[left, right) of the ascending spec values that meet the criterion at x"""
+    if swept.kind == 'min':
+        return bisect_left(values, x), len(values)
+    if swept.kind == 'band':
+        left = bisect_left(values, x * 0.8)
+        return left, max(left, bisect_right(values, x * 1.2))
+    tolerance = swept.tolerance
+    left = _first_true(values, lambda value: value >= x or abs(value - x) <= tolerance)
+    right = _first_true(values, lambda value: value > x and abs(value - x) > tolerance)
+    return left, max(left, right)
+
+
+def sweep_steps(start, stop, steps):
+    """`steps` evenly spaced values from start to stop inclusive"""
+    if steps == 1:
+        return [start]
+    return [start + (stop - start) * i / (steps - 1) for i in range(steps)]
+
+
+class Sweep:
+    """
+    Catalog of one type evaluated once against a form, ready to rank at any
+    value of one swept parameter
+
+    Components are kept per number of other criteria they meet, split into
+    those meeting the swept criterion and those not, each list in catalog
+    order. A component's score level is that number plus one if it meets the
+    swept criterion.
+    """
+
+    def __init__(self, component_type, form_data, parameter, first_value):
+        self.component_type = component_type.lower()
+        self.swept = SWEEP_PARAMETERS[self.component_type][parameter]
+        snapshot = get_catalog_snapshot(self.component_type)
+        self.ids = snapshot.ids
+
+        form_data = dict(form_data.items())
+        form_data[parameter] = first_value
+        self.base = []  # criteria met besides the swept one, by catalog position
+        self.total = 0
+        for index in range(len(snapshot)):
+            evaluation = evaluate_criteria(self.component_type, form_data, row_spec(snapshot.columns, index))
+            swept_met = next(c['met'] for c in evaluation['criteria'] if c['name'] == self.swept.criterion)
+            self.base.append(evaluation['matched_count'] - swept_met)
+            self.total = len(evaluation['criteria'])
+
+        column = snapshot.columns[self.swept.field]
+        spec_values = [
+            self.swept.default if math.isnan(value) or not value else value
+            for value in column
+        ]
+        self.order = sorted(range(len(spec_values)), key=spec_values.__getitem__)
+        self.values = [spec_values[position] for position in self.order]
+
+        levels = self.total + 1
+        self.met = [[] for _ in range(levels)]
+        self.unmet = [[] for _ in range(levels)]
+        for position, base in enumerate(self.base):
+            self.unmet[base].append(position)
+        self.window = (0, 0)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _move(self, start, stop, met):
+        source, target = (self.unmet, self.met) if met else (self.met, self.unmet)
+        for index in range(start, stop):
+            position = self.order[index]
+            base = self.base[position]
+            positions = source[base]
+            del positions[bisect_left(positions, position)]
+            insort(target[base], position)
+
+    def advance(self, x):
+        """Move the window of components meeting the swept criterion to x"""
+        old_left, old_right = self.window
+        left, right = met_window(self.swept, self.values, x)
+        # Leave: old window minus new; enter: new window minus old
+        self._move(old_left, min(old_right, left), False)
+        self._move(max(old_left, right), old_right, False)
+        self._move(left, min(right, old_left), True)
+        self._move(max(left, old_right), right, True)
+        self.window = (left, right)
+
+    def top(self, k):
+        """[(component id, match score)] of the best k at the current value"""
+        ranked = []
+        for level in range(self.total, -1, -1):
+            candidates = heapq.merge(self.met[level - 1] if level else [], self.unmet[level])
+            score = round((level / self.total) * 100) if self.total > 0 else 0
+            for position in candidates:
+                ranked.append((self.ids[position], score))
+                if len(ranked) == k:
+                    return ranked
+        return ranked
+
+
+def run_sweep(component_type, form_data, parameter, values, k):
+    """
+    Rank the top k at each swept value, in ascending order of the value
+
+    Returns ([(value, [(component id, match score)])], number of components
+    ranked); each ranking is identical to ranking the catalog with the form
+    at that value.
+    """
+    values = sorted(set(values))
+    sweep = Sweep(component_type, form_data, parameter, values[0])
+    steps = []
+    for value in values:
+        sweep.advance(value)
+        steps.append((value, sweep.top(k)))
+    return steps, len(sweep)
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.middleware import AdmissionControlMiddleware
+
+
+@override_settings(
+    ADMISSION_CONCURRENCY_LIMITS={'select_parts_async': 1}, ADMISSION_RATE=0,
+    ADMISSION_BACKEND='local', ADMISSION_CLIENT_HEADER='HTTP_X_FORWARDED_FOR',
+)
+class AdmissionControlTests(SimpleTestCase):
+    path = '/api/async/select-parts/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.factory = RequestFactory()
+
+    def test_client_is_the_entry_appended_by_the_proxy(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        request = self.factory.post(self.path, HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.7')
+        self.assertEqual(middleware.client(request), '10.0.0.7')
+
+    def test_sync_chain_stays_sync(self):
+        middleware = AdmissionControlMiddleware(lambda request: HttpResponse())
+        self.assertFalse(iscoroutinefunction(middleware))
+        self.assertEqual(middleware(self.factory.post(self.path)).status_code, 200)
+
+    async def check_async_slots(self):
+        loop_thread = threading.get_ident()
+        entered = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def view(request):
+            # Runs on the event loop, not on a thread of the pool
+            self.assertEqual(threading.get_ident(), loop_thread)
+            entered.set()
+            await finish.wait()
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        first = asyncio.ensure_future(middleware(self.factory.post(self.path)))
+        await entered.wait()
+        shed = await middleware(self.factory.post(self.path))
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed['Retry-After'], '1')
+
+        finish.set()
+        self.assertEqual((await first).status_code, 200)
+        self.assertEqual(middleware.state.in_flight(), {'select_parts_async': 0})
+
+    async def test_async_chain_with_local_state(self):
+        await self.check_async_slots()
+
+    @override_settings(ADMISSION_BACKEND='cache')
+    async def test_async_chain_with_cache_state(self):
+        await self.check_async_slots()
+
+    @override_settings(ADMISSION_RATE=1, ADMISSION_BURST=1)
+    async def test_async_rate_limit_per_client(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(view)
+        first = await middleware(self.factory.post(self.path, HTTP_X_FORWARDED_FOR='10.0.0.7'))
+        self.assertEqual(first.status_code, 200)
+
+        # A forged leading entry does not make a new client
+        forged = await middleware(self.factory.post(self.path, HTTP_X_FORWARDED_FOR='6.6.6.6, 10.0.0.7'))
+        self.assertEqual(forged.status_code, 429)
+
+        other = await middleware(self.factory.post(self.path, HTTP_X_FORWARDED_FOR='10.0.0.8'))
+        self.assertEqual(other.status_code, 200)
@@ -0,0 +1,128 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, TestCase
+
+from parts.models import Component, ComponentSpecification
+from api.assembly import SHAFT_FIT_TOLERANCE_MM, AssemblySolver
+
+
+def candidate(score, **spec):
+    return SimpleNamespace(specification=SimpleNamespace(**spec)), {'match_score': score}
+
+
+def compatible(parts):
+    """The assembly constraints, written out independently of the solver"""
+    motor = parts['motor'].specification
+    bearing = parts['bearing'].specification
+    seal = parts['seal'].specification
+    gear = parts['gear'].specification
+    return (
+        (motor.speed or 0) <= (bearing.speed_rating or 0)
+        and abs((bearing.bore_diameter or 0) - (seal.seal_diameter or 30)) <= SHAFT_FIT_TOLERANCE_MM
+        and (motor.power or 0) <= (gear.power_transmission or 15)
+    )
+
+
+class AssemblySolverTests(SimpleTestCase):
+
+    def random_candidates(self, rng, size):
+        def best_first(pairs):
+            return sorted(pairs, key=lambda pair: -pair[1]['match_score'])
+
+        return {
+            'motor': best_first([
+                candidate(rng.randint(40, 100), speed=rng.choice([1450, 2900, None]), power=rng.uniform(1, 25))
+                for _ in range(size)
+            ]),
+            'bearing': best_first([
+                candidate(rng.randint(40, 100), speed_rating=rng.choice([1000, 2000, 6000]),
+                          bore_diameter=rng.randint(20, 40))
+                for _ in range(size)
+            ]),
+            'seal': best_first([
+                candidate(rng.randint(40, 100), seal_diameter=rng.choice([None, *range(20, 41, 3)]))
+                for _ in range(size)
+            ]),
+            'gear': best_first([
+                candidate(rng.randint(40, 100), power_transmission=rng.choice([None, 10, 20, 30]))
+                for _ in range(size)
+            ]),
+        }
+
+    def brute_force(self, candidates, k):
+        types = list(candidates)
+        totals = []
+        for combination in itertools.product(*(candidates[t] for t in types)):
+            parts = {t: component for t, (component, _) in zip(types, combination)}
+            if compatible(parts):
+                totals.append(sum(evaluation['match_score'] for _, evaluation in combination))
+        return sorted(totals, reverse=True)[:k]
+
+    def test_best_combinations_match_brute_force(self):
+        rng = random.Random(3)
+        for trial in range(20):
+            candidates = self.random_candidates(rng, 7)
+            solver = AssemblySolver(candidates)
+            found = solver.solve(5, max_nodes=100000)
+            with self.subTest(trial=trial):
+                self.assertTrue(solver.exhaustive)
+                self.assertEqual([score for score, _ in found], self.brute_force(candidates, 5))
+                for score, assignment in found:
+                    self.assertTrue(compatible({t: candidates[t][i][0] for t, i in assignment.items()}))
+                    self.assertEqual(score, sum(candidates[t][i][1]['match_score'] for t, i in assignment.items()))
+
+    def test_incompatible_types_have_no_assembly(self):
+        solver = AssemblySolver({
+            'motor': [candidate(90, speed=3000, power=2)],
+            'bearing': [candidate(90, speed_rating=1500, bore_diameter=30)],
+        })
+        self.assertEqual(solver.solve(3, max_nodes=1000), [])
+        self.assertEqual(solver.domains['motor'], [])
+
+    def test_search_budget(self):
+        candidates = self.random_candidates(random.Random(5), 10)
+        solver = AssemblySolver(candidates)
+        found = solver.solve(3, max_nodes=5)
+        self.assertFalse(solver.exhaustive)
+        self.assertLessEqual(len(found), 3)
+
+
+class AssemblyEndpointTests(TestCase):
+
+    def add(self, component_type, part_number, **spec):
+        component = Component.objects.create(
+            component_type=component_type, name=part_number, manufacturer='Acme',
+            part_number=part_number, price='$10-20', rating=4.5,
+        )
+        ComponentSpecification.objects.create(component=component, **spec)
+
+    def select(self, body):
+        return self.client.post('/api/select-assembly/', body, content_type='application/json')
+
+    def test_parts_satisfy_the_constraints(self):
+        self.add('motor', 'M-1', power=3, speed=1450)
+        self.add('bearing', 'B-slow', speed_rating=1000, bore_diameter=30, dynamic_load_rating=40)
+        self.add('bearing', 'B-fast', speed_rating=6000, bore_diameter=30, dynamic_load_rating=10)
+
+        response = self.select({'components': {'Motor': {'power': 3}, 'bearing': {'dynamicLoad': 20}}})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['constraints'], ['Motor speed within bearing speed rating'])
+        self.assertEqual(
+            [assembly['parts']['bearing']['partNumber'] for assembly in data['assemblies']], ['B-fast'],
+        )
+        self.assertEqual(data['candidates']['bearing'], {'considered': 2, 'compatible': 1})
+        self.assertTrue(data['exhaustive'])
+
+    def test_invalid_requests(self):
+        self.add('motor', 'M-1', power=3, speed=1450)
+        for body, status in (
+            ({'components': []}, 400),
+            ({'components': {'motor': {}, 'widget': {}}}, 400),
+            ({'components': {'motor': {}}, 'topK': 0}, 400),
+            ({'components': {'motor': {}, 'gear': {}}}, 404),
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.select(body).status_code, status)
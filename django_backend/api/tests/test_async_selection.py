@@ -0,0 +1,77 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TransactionTestCase
+
+from parts.models import Component, ComponentSpecification, SelectionHistory
+
+
+class AsyncSelectionParityTests(TransactionTestCase):
+    """select_parts_async answers exactly as select_parts"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for i, (price, lead_time, rating) in enumerate(
+            (('$12-18', '1-2 weeks', 4.7), ('$9-14', '3-4 weeks', 4.2), ('$30-40', 'In Stock', 4.9))
+        ):
+            component = Component.objects.create(
+                component_type='bearing', name=f'Ball Bearing {i}', manufacturer='SKF',
+                part_number=f'60{i}8', price=price, rating=rating, lead_time=lead_time,
+                specifications=[], pros=[], cons=[], alternatives=[],
+            )
+            ComponentSpecification.objects.create(
+                component=component, bore_diameter=40, dynamic_load_rating=20 + 5 * i, speed_rating=8000,
+            )
+
+    async def select_both(self, body, query=''):
+        sync = await sync_to_async(Client().post)(
+            f'/api/select-parts/{query}', body, content_type='application/json'
+        )
+        asynchronous = await AsyncClient().post(
+            f'/api/async/select-parts/{query}', body, content_type='application/json'
+        )
+        return sync, asynchronous
+
+    def without_timestamp(self, response):
+        data = response.json()
+        data.pop('timestamp', None)
+        return data
+
+    async def test_score_mode(self):
+        sync, asynchronous = await self.select_both({'componentType': 'bearing', 'dynamicLoad': 25})
+        self.assertEqual(asynchronous.status_code, 200)
+        self.assertEqual(self.without_timestamp(asynchronous), self.without_timestamp(sync))
+        self.assertEqual(await SelectionHistory.objects.acount(), 2)
+
+    async def test_pareto_mode(self):
+        body = {'componentType': 'bearing', 'rankingMode': 'pareto', 'rankingWeights': {'price': 2}}
+        sync, asynchronous = await self.select_both(body)
+        self.assertEqual(self.without_timestamp(asynchronous), self.without_timestamp(sync))
+        self.assertEqual(asynchronous.json()['rankingMode'], 'pareto')
+
+    async def test_compact_format(self):
+        sync, asynchronous = await self.select_both({'componentType': 'bearing'}, '?format=compact')
+        self.assertEqual(asynchronous['Content-Type'], 'application/vnd.cots.compact+json')
+        self.assertEqual(asynchronous.json()['format'], 'compact')
+        self.assertEqual(self.without_timestamp(asynchronous), self.without_timestamp(sync))
+
+    async def test_stream(self):
+        response = await AsyncClient().post(
+            '/api/async/select-parts/?stream=ndjson', {'componentType': 'bearing'},
+            content_type='application/json',
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        events = [line async for line in response.streaming_content]
+        self.assertIn(b'"event":"result"', events[-1])
+
+    async def test_invalid_requests_are_rejected_alike(self):
+        for body, query in (
+            ({'componentType': 'bearing', 'rankingMode': 'fastest'}, ''),
+            ({'componentType': 'bearing', 'rankingMode': 'pareto', 'rankingWeights': [1]}, ''),
+            ({'componentType': 'bearing'}, '?stream=xml'),
+            ({}, ''),
+        ):
+            with self.subTest(body=body, query=query):
+                sync, asynchronous = await self.select_both(body, query)
+                self.assertEqual(asynchronous.status_code, 400)
+                self.assertEqual(asynchronous.json(), sync.json())
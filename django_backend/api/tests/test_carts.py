@@ -0,0 +1,94 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+
+from parts.models import Cart
+from api.carts import add_to_cart, remove_from_cart
+
+
+ITEM = {'component_id': 1, 'name': 'Ball Bearing 6008', 'price': '$12-18', 'manufacturer': 'SKF'}
+
+
+class CartConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    ADDS = 20
+
+    def run_threads(self, target):
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_adds_are_not_lost(self):
+        Cart.objects.create(session_id='shared')
+
+        def add(index):
+            for i in range(self.ADDS):
+                add_to_cart('shared', {**ITEM, 'component_id': index * 1000 + i})
+
+        self.run_threads(add)
+
+        cart = Cart.objects.get(session_id='shared')
+        self.assertEqual(
+            sorted(item['component_id'] for item in cart.components),
+            sorted(index * 1000 + i for index in range(self.THREADS) for i in range(self.ADDS)),
+        )
+        self.assertEqual(cart.version, self.THREADS * self.ADDS)
+
+    def test_concurrent_adds_and_removes_are_not_lost(self):
+        kept = [{**ITEM, 'component_id': index} for index in range(self.THREADS)]
+        removed = [{**ITEM, 'component_id': 1000 + index} for index in range(self.THREADS)]
+        Cart.objects.create(session_id='shared', components=removed)
+
+        def change(index):
+            add_to_cart('shared', kept[index])
+            remove_from_cart('shared', removed[index]['component_id'])
+
+        self.run_threads(change)
+
+        cart = Cart.objects.get(session_id='shared')
+        self.assertEqual(sorted(item['component_id'] for item in cart.components), list(range(self.THREADS)))
+
+
+class CartSessionTests(TestCase):
+
+    def add(self, client, path='/api/shopping-cart/'):
+        response = client.post(path, ITEM, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_cart_is_bound_to_the_session(self):
+        owner = Client()
+        cart = self.add(owner)
+        self.assertEqual(len(owner.get('/api/shopping-cart/').json()['components']), 1)
+
+        # Another client cannot reach the owner's cart by naming it
+        other = Client()
+        response = other.get(f'/api/shopping-cart/?session_id={cart["session_id"]}')
+        self.assertNotEqual(response.json()['session_id'], cart['session_id'])
+        self.assertEqual(response.json()['components'], [])
+
+    def test_staff_can_address_any_cart(self):
+        cart = self.add(Client())
+
+        staff = Client()
+        staff.force_login(User.objects.create_user('support', is_staff=True))
+        response = staff.get(f'/api/shopping-cart/?session_id={cart["session_id"]}')
+        self.assertEqual(response.json()['session_id'], cart['session_id'])
+        self.assertEqual(len(response.json()['components']), 1)
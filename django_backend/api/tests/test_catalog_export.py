@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+import tempfile
+from io import BytesIO, StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+from api.catalog_export import iter_export, pyarrow
+
+
+class CatalogExportTests(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            component = Component.objects.create(
+                component_type='bearing' if i < 3 else 'gear', name=f'Part {i}', manufacturer='SKF',
+                part_number=f'P-{i}', price='$12-18', rating=4.0 + i / 10, lead_time='1-2 weeks',
+                specifications=[{'name': 'Bore', 'value': '40 mm'}], pros=['Quiet'], cons=[], alternatives=[],
+            )
+            if i != 4:
+                ComponentSpecification.objects.create(component=component, bore_diameter=40 + i, gear_material='Steel')
+
+    def export(self, fmt, **kwargs):
+        return b''.join(iter_export(fmt, chunk_size=2, **kwargs))
+
+    def jsonl_rows(self, data):
+        return [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+
+    def test_jsonl_rows_span_chunks(self):
+        rows = self.jsonl_rows(self.export('jsonl'))
+        self.assertEqual([row['part_number'] for row in rows], [f'P-{i}' for i in range(5)])
+        self.assertEqual(rows[1]['bore_diameter'], 41)
+        self.assertEqual(rows[1]['specifications'], [{'name': 'Bore', 'value': '40 mm'}])
+        # A component without a specification has empty spec columns
+        self.assertIsNone(rows[4]['bore_diameter'])
+
+    def test_component_type_filter(self):
+        rows = self.jsonl_rows(self.export('jsonl', component_type='Gear'))
+        self.assertEqual([row['part_number'] for row in rows], ['P-3', 'P-4'])
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet_row_groups_are_chunks(self):
+        import pyarrow.parquet
+
+        parquet = pyarrow.parquet.ParquetFile(BytesIO(self.export('parquet')))
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.column('part_number').to_pylist(), [f'P-{i}' for i in range(5)])
+        self.assertEqual(table.column('bore_diameter').to_pylist(), [40, 41, 42, 43, None])
+        self.assertEqual(json.loads(table.column('pros')[0].as_py()), ['Quiet'])
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_stream(self):
+        import pyarrow.ipc
+
+        table = pyarrow.ipc.open_stream(self.export('arrow')).read_all()
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column('gear_material').to_pylist(), ['Steel'] * 4 + [None])
+
+    def test_endpoint_is_not_compressed_twice(self):
+        response = self.client.get('/api/catalog/export/?output=jsonl', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(self.jsonl_rows(b''.join(response.streaming_content))), 5)
+
+    def test_unknown_output_is_rejected(self):
+        response = self.client.get('/api/catalog/export/?output=xlsx')
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_picks_the_format_from_the_extension(self):
+        handle, path = tempfile.mkstemp(suffix='.jsonl.gz')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command('export_catalog', path, '--component-type', 'bearing', stderr=StringIO())
+        with open(path, 'rb') as f:
+            self.assertEqual(len(self.jsonl_rows(f.read())), 3)
@@ -0,0 +1,58 @@
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from api import metrics
+from api.coalescing import coalesce
+
+
+@override_settings(COALESCE_POLL_INTERVAL=0.01)
+class CoalescingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def counts(self):
+        with metrics._counters_lock:
+            return {
+                name: metrics._counters[name]
+                for name in ('selections_computed', 'selections_coalesced_shared')
+            }
+
+    def delta(self, before):
+        after = self.counts()
+        return {name: after[name] - before[name] for name in after}
+
+    def test_sequential_repeats_are_computed(self):
+        before = self.counts()
+        self.assertEqual(coalesce('key', lambda: {'rank': 1}), {'rank': 1})
+        self.assertEqual(coalesce('key', lambda: {'rank': 2}), {'rank': 2})
+        self.assertEqual(self.delta(before), {'selections_computed': 2, 'selections_coalesced_shared': 0})
+
+    def test_waits_for_the_lock_holder_in_another_worker(self):
+        # Another worker holds the lock and publishes its result later
+        cache.add('coalesce:lock:key', 'other-worker', 30)
+
+        def finish():
+            cache.set('coalesce:result:key', {'rank': 'shared'}, 5)
+            cache.delete('coalesce:lock:key')
+
+        timer = threading.Timer(0.1, finish)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        before = self.counts()
+        self.assertEqual(coalesce('key', lambda: {'rank': 'own'}), {'rank': 'shared'})
+        self.assertEqual(self.delta(before), {'selections_computed': 0, 'selections_coalesced_shared': 1})
+
+    def test_computes_when_the_lock_is_released_without_a_result(self):
+        cache.add('coalesce:lock:key', 'other-worker', 30)
+        timer = threading.Timer(0.1, cache.delete, ['coalesce:lock:key'])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        before = self.counts()
+        self.assertEqual(coalesce('key', lambda: {'rank': 'own'}), {'rank': 'own'})
+        self.assertEqual(self.delta(before), {'selections_computed': 1, 'selections_coalesced_shared': 0})
@@ -0,0 +1,48 @@
+import tempfile
+import zipfile
+from io import BytesIO
+
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+from api import datasheets
+
+
+class DatasheetFilenameTests(TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        settings = self.settings(DATASHEET_CACHE_DIR=cache_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        datasheets._cache = None
+        self.addCleanup(setattr, datasheets, '_cache', None)
+
+    def add(self, part_number):
+        component = Component.objects.create(
+            component_type='bearing', name='Ball Bearing', manufacturer='SKF',
+            part_number=part_number, price='$12-18', rating=4.5, lead_time='1-2 weeks',
+            specifications=[], pros=[], cons=[], alternatives=[],
+        )
+        ComponentSpecification.objects.create(component=component, bore_diameter=40, dynamic_load_rating=25)
+        return component
+
+    def download(self, components):
+        return self.client.post('/api/download-datasheet/', {
+            'componentIds': [component.id for component in components],
+            'requirements': {'componentType': 'bearing'},
+        }, content_type='application/json')
+
+    def test_part_number_cannot_escape_the_header(self):
+        response = self.download([self.add('6008"; filename=evil.exe\r\nX-Injected: 1')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response['Content-Disposition'],
+            'attachment; filename="6008_filenameevil.exeX-Injected_1-datasheet.txt"',
+        )
+
+    def test_zip_entries_stay_in_the_archive_root(self):
+        response = self.download([self.add('../../etc/cron.d/6008'), self.add('C:\\6009')])
+        with zipfile.ZipFile(BytesIO(response.content)) as archive:
+            self.assertEqual(archive.namelist(), ['....etccron.d6008-datasheet.txt', 'C6009-datasheet.txt'])
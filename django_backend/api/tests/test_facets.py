@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+
+
+class RangeFilterFacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for i, (manufacturer, availability, rating, bore) in enumerate((
+            ('SKF', 'In Stock', 4.7, 20),
+            ('SKF', 'In Stock', 5.0, 35),
+            ('NSK', 'Backorder', 3.9, 40),
+            ('FAG', 'In Stock', 4.2, None),
+        )):
+            component = Component.objects.create(
+                component_type='bearing', name=f'Ball Bearing {i}', manufacturer=manufacturer,
+                part_number=f'60{i}8', price='$12-18', availability=availability, rating=rating,
+            )
+            if bore is not None:
+                ComponentSpecification.objects.create(component=component, bore_diameter=bore)
+
+    def part_numbers(self, query):
+        response = self.client.get(f'/api/components/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['part_number'] for row in response.json()['results'])
+
+    def test_range_lookups(self):
+        self.assertEqual(self.part_numbers('bore_diameter__gte=35'), ['6018', '6028'])
+        self.assertEqual(self.part_numbers('bore_diameter__range=20,35'), ['6008', '6018'])
+        self.assertEqual(self.part_numbers('bore_diameter__gt=20&rating__lt=4.5'), ['6028'])
+        # Unknown fields and lookups are not range filters
+        self.assertEqual(len(self.part_numbers('name__gte=1&bore_diameter__exact=20')), 4)
+
+    def test_malformed_values_are_rejected(self):
+        for query in ('bore_diameter__gte=wide', 'rating__range=4', 'rating__lt=nan'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/components/?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(query.split('=')[0], response.json())
+
+    def test_facet_counts(self):
+        data = self.client.get('/api/components/facets/?component_type=bearing').json()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['facets']['manufacturer'], [
+            {'value': 'SKF', 'count': 2}, {'value': 'FAG', 'count': 1}, {'value': 'NSK', 'count': 1},
+        ])
+        self.assertEqual(data['facets']['availability'], [
+            {'value': 'In Stock', 'count': 3}, {'value': 'Backorder', 'count': 1},
+        ])
+        # 5.0 shares the top bucket
+        self.assertEqual(data['facets']['rating'], [
+            {'from': 4, 'to': 5, 'count': 3}, {'from': 3, 'to': 4, 'count': 1},
+        ])
+
+        filtered = self.client.get('/api/components/facets/?bore_diameter__gte=30').json()
+        self.assertEqual(filtered['count'], 2)
+
+    def test_facets_are_cached_until_the_catalog_changes(self):
+        path = '/api/components/facets/?manufacturer=SKF&page=2'
+        self.assertEqual(self.client.get(path).json()['count'], 2)
+        # Parameter order and pagination do not make a new entry
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/components/facets/?page=1&manufacturer=SKF').json()['count'], 2)
+
+        component = Component.objects.get(part_number='6028')
+        component.manufacturer = 'SKF'
+        component.save()
+        self.assertEqual(self.client.get(path).json()['count'], 3)
@@ -0,0 +1,83 @@
+"""
+Golden tests: the fast serializers must render exactly what the DRF
+serializers render, key order included
+"""
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase
+
+from parts.models import Cart, Component, ComponentSpecification
+from api.fast_serializers import component_values, serialize_cart, serialize_component_rows
+from api.serializers import CartSerializer, ComponentSerializer
+
+
+class FastSerializerParityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        full = Component.objects.create(
+            component_type='bearing', name='Deep Groove Ball Bearing 6008', manufacturer='SKF',
+            part_number='6008-2RS1', price='$12-18', rating=4.7, lead_time='1-2 weeks',
+            specifications=['40mm bore', 'Sealed'], pros=['Quiet'], cons=['Low axial load'],
+            alternatives=['NSK 6008'], vendor_url='https://example.com/6008',
+        )
+        ComponentSpecification.objects.create(
+            component=full, bore_diameter=40, dynamic_load_rating=17.8, speed_rating=8500,
+            l10_life=20000, voltage='3-phase 400V', fastener_diameter='M10',
+            material_grade='8.8', precision_grade='ISO 7', temp_min=-20, temp_max=120,
+        )
+
+        # Specification with every optional value NULL, empty lists, integral rating
+        sparse = Component.objects.create(
+            component_type='motor', name='Motor', manufacturer='ABB', part_number='M-1',
+            price='$100-200', rating=4, lead_time='3-4 weeks',
+            specifications=[], pros=[], cons=[], alternatives=[],
+        )
+        ComponentSpecification.objects.create(component=sparse)
+
+        Component.objects.create(
+            component_type='gear', name='Gear without specification', manufacturer='KHK',
+            part_number='G-1', price='$5-10', lead_time='1 week',
+            specifications=[], pros=[], cons=[], alternatives=[],
+        )
+
+        # Fixed, non-UTC-looking timestamps (auto_now fields are set on save)
+        Component.objects.filter(pk=full.pk).update(
+            created_at=datetime(2024, 3, 1, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        )
+
+        Cart.objects.create(session_id='empty')
+        Cart.objects.create(
+            session_id='filled',
+            components=[{'component_id': full.pk, 'quantity': 2, 'price': '$12-18'}],
+        )
+
+    def assertSameOutput(self, fast, drf):
+        # json.dumps keeps key order, so this also compares the order of keys
+        self.assertEqual(json.dumps(fast), json.dumps(drf))
+
+    def test_component_rows_match_component_serializer(self):
+        queryset = Component.objects.select_related('specification').order_by('id')
+        drf = ComponentSerializer(queryset, many=True).data
+        fast = serialize_component_rows(component_values(queryset))
+        self.assertEqual(len(fast), 3)
+        self.assertSameOutput(fast, drf)
+
+    def test_component_list_endpoint_matches_component_serializer(self):
+        response = self.client.get('/api/components/', {'ordering': 'created_at'})
+        drf = ComponentSerializer(
+            Component.objects.select_related('specification').order_by('created_at'), many=True
+        ).data
+        self.assertSameOutput(response.json()['results'], json.loads(json.dumps(drf)))
+
+    def test_component_retrieve_matches_component_serializer(self):
+        component = Component.objects.get(part_number='6008-2RS1')
+        data = self.client.get(f'/api/components/{component.pk}/').json()
+        self.assertIsInstance(data.pop('similarComponents'), list)
+        self.assertSameOutput(data, json.loads(json.dumps(ComponentSerializer(component).data)))
+
+    def test_cart_matches_cart_serializer(self):
+        for cart in Cart.objects.order_by('id'):
+            with self.subTest(session_id=cart.session_id):
+                self.assertSameOutput(serialize_cart(cart), CartSerializer(cart).data)
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from parts.models import Component
+
+
+class ImportCatalogTests(TestCase):
+
+    def import_csv(self, text):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        stderr = StringIO()
+        call_command('import_catalog', path, stdout=StringIO(), stderr=stderr)
+        return stderr.getvalue()
+
+    def test_partial_reimport_keeps_missing_columns(self):
+        self.import_csv(
+            'component_type,name,manufacturer,part_number,price,rating,lead_time,pros,bore_diameter,voltage\n'
+            'bearing,Ball Bearing 6008,SKF,6008,$12-18,4.7,1-2 weeks,Quiet|Sealed,40 mm,400V\n'
+        )
+        self.import_csv(
+            'component_type,name,manufacturer,part_number,price\n'
+            'bearing,Ball Bearing 6008,SKF,6008,$14-20\n'
+        )
+
+        component = Component.objects.select_related('specification').get(part_number='6008')
+        self.assertEqual(component.price, '$14-20')
+        self.assertEqual(component.rating, 4.7)
+        self.assertEqual(component.lead_time, '1-2 weeks')
+        self.assertEqual(component.lead_time_days, 14)
+        self.assertEqual(component.pros, ['Quiet', 'Sealed'])
+        self.assertEqual(component.specification.bore_diameter, 40)
+        self.assertEqual(component.specification.voltage, '400V')
+        self.assertEqual(component.specification.voltage_v, 400)
+
+    def test_malformed_csv_line_is_rejected(self):
+        errors = self.import_csv(
+            'component_type,name,manufacturer,part_number,price\n'
+            'bearing,Ball Bearing 6008,SKF,6008,$12-18\n'
+            f'bearing,{"x" * 200000},SKF,6009,$12-18\n'
+            'bearing,Ball Bearing 6010,SKF,6010,$12-18\n'
+        )
+
+        self.assertIn('invalid CSV', errors)
+        self.assertEqual(
+            list(Component.objects.order_by('part_number').values_list('part_number', flat=True)),
+            ['6008', '6010'],
+        )
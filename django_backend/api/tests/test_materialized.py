@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from parts.models import CatalogChange, CatalogVersion, Component, ComponentSpecification
+from api import materialized as materialized_module
+from api.materialized import (
+    MATERIALIZED_DEPTH, lookup_materialized, materialize, patch_materialized, ranking_entries,
+    refresh_materialized,
+)
+from api.selection import rank_components
+
+
+FORM = {'componentType': 'bearing', 'dynamicLoad': 25}
+
+
+class MaterializedRefreshTests(TestCase):
+
+    def add(self, part_number, load, rating=4.5):
+        component = Component.objects.create(
+            component_type='bearing', name=f'Ball Bearing {part_number}', manufacturer='SKF',
+            part_number=part_number, price='$12-18', rating=rating, lead_time='1-2 weeks',
+            specifications=[], pros=[], cons=[], alternatives=[],
+        )
+        ComponentSpecification.objects.create(
+            component=component, bore_diameter=40, dynamic_load_rating=load, speed_rating=8000,
+        )
+        return component
+
+    def setUp(self):
+        self.components = [self.add(f'60{i}8', 10 + 5 * i, 4.0 + i / 10) for i in range(6)]
+
+    def top_ids(self, materialized):
+        return [recommendation['id'] for recommendation in materialized.recommendations]
+
+    def fresh_ranking(self):
+        ranked, _ = rank_components('bearing', FORM, MATERIALIZED_DEPTH)
+        return ranking_entries(ranked)
+
+    def edit_catalog(self):
+        """Promote the worst component, add one and delete one outside the top 3"""
+        worst = self.components[0].specification
+        worst.dynamic_load_rating = 40
+        worst.save()
+        self.add('6100', 30, 4.8)
+        Component.objects.filter(pk=self.components[-1].pk).delete()
+        return {self.components[0].pk, self.components[-1].pk, Component.objects.get(part_number='6100').pk}
+
+    def test_writes_are_logged_under_their_version(self):
+        before = CatalogVersion.current()
+        changed = self.edit_catalog()
+        logged = set(CatalogChange.objects.filter(
+            catalog_version__gt=before
+        ).values_list('component_id', flat=True))
+        self.assertEqual(logged, changed)
+        # One entry per version, the deletion last
+        self.assertEqual(
+            CatalogChange.objects.filter(catalog_version=CatalogVersion.current()).get().component_id,
+            self.components[-1].pk,
+        )
+
+    def test_patch_matches_a_full_recompute(self):
+        materialized = materialize(FORM)
+        self.edit_catalog()
+
+        self.assertTrue(patch_materialized(materialized))
+        materialized.refresh_from_db()
+        self.assertEqual(materialized.ranking, self.fresh_ranking())
+        self.assertEqual(materialized.catalog_version, CatalogVersion.current())
+        self.assertEqual(materialized.total_matches, 6)
+
+    def test_lookup_rescores_only_the_changed_components(self):
+        materialize(FORM)
+        changed = self.edit_catalog()
+
+        with mock.patch.object(
+            materialized_module, 'evaluate_criteria', wraps=materialized_module.evaluate_criteria
+        ) as evaluate:
+            materialized = lookup_materialized(FORM)
+        # The surviving changed components, then the top 3 recommendations
+        self.assertEqual(evaluate.call_count, len(changed) - 1 + 3)
+        self.assertEqual(self.top_ids(materialized), [entry[0] for entry in self.fresh_ranking()[:3]])
+
+    def test_component_deleted_after_the_version_was_read(self):
+        materialized = materialize(FORM)
+        self.add('6100', 5)
+        version = CatalogVersion.current()
+        # Deleted while the patch is running, under a newer version
+        deleted = self.top_ids(materialized)[0]
+        Component.objects.filter(pk=deleted).delete()
+
+        self.assertFalse(patch_materialized(materialized, version))
+        refreshed = refresh_materialized(materialized)
+        self.assertNotIn(deleted, self.top_ids(refreshed))
+        self.assertEqual(refreshed.catalog_version, CatalogVersion.current())
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from parts.normalization import parse_lead_time_days
+
+
+class LeadTimeParsingTests(SimpleTestCase):
+    def test_known_units(self):
+        cases = {
+            '2-3 weeks': 21,
+            '5 days': 5,
+            '1 month': 30,
+            '24 hours': 1,
+            'Ships in 48h': 2,
+            'In Stock': 0,
+            'in-stock': 0,
+            'Ships immediately': 0,
+            'Out of stock, ships in 4 weeks': 28,
+        }
+        for lead_time, days in cases.items():
+            with self.subTest(lead_time=lead_time):
+                self.assertEqual(parse_lead_time_days(lead_time), days)
+
+    def test_unknown_unit_is_unparseable(self):
+        unparseable = ('3 fortnights', '10', 'TBD', '', None, 'Out of stock', 'Not in stock', 'Stock on request')
+        for lead_time in unparseable:
+            with self.subTest(lead_time=lead_time):
+                self.assertIsNone(parse_lead_time_days(lead_time))
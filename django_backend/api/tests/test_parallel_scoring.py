@@ -0,0 +1,78 @@
+from array import array
+from multiprocessing import shared_memory
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from parts.models import Component
+from api import parallel_scoring
+from api.parallel_scoring import use_parallel_scoring
+
+
+@override_settings(PARALLEL_SCORING_MIN_CATALOG=2)
+class UseParallelScoringTests(TestCase):
+
+    def add(self, part_number):
+        Component.objects.create(
+            component_type='gear', name=f'Spur Gear {part_number}', manufacturer='KHK',
+            part_number=part_number, price='$5-10',
+        )
+
+    def test_count_is_cached_per_catalog_version(self):
+        self.add('G-1')
+        self.assertFalse(use_parallel_scoring('gear'))
+        # Only the catalog version is read while it is unchanged
+        with self.assertNumQueries(1):
+            self.assertFalse(use_parallel_scoring('Gear'))
+
+        # Saving a component bumps the version
+        self.add('G-2')
+        self.assertTrue(use_parallel_scoring('gear'))
+
+
+class FakeSnapshot:
+    component_type = 'test-gear'
+
+    def __init__(self, version):
+        self.version = version
+        self.columns = {'rating': array('d', [4.5, 4.7])}
+
+    def __len__(self):
+        return 2
+
+
+class SharedGenerationTests(SimpleTestCase):
+
+    def setUp(self):
+        self.addCleanup(self.drop_current)
+
+    def drop_current(self):
+        shared = parallel_scoring._shared.pop(FakeSnapshot.component_type, None)
+        if shared is not None:
+            shared.close()
+
+    def assertUnlinked(self, shared):
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shared.name)
+
+    def test_generation_is_unlinked_when_its_last_user_releases_it(self):
+        first = parallel_scoring._share(FakeSnapshot(1))
+        # Several newer versions arrive while a request still scores the first
+        for version in (2, 3, 4):
+            parallel_scoring._release(parallel_scoring._share(FakeSnapshot(version)))
+
+        attached = shared_memory.SharedMemory(name=first.name)
+        self.assertEqual(bytes(attached.buf[:8]), array('d', [4.5]).tobytes())
+        attached.close()
+
+        parallel_scoring._release(first)
+        self.assertUnlinked(first)
+        self.assertNotIn(first, parallel_scoring._replaced)
+
+    def test_unused_generation_is_unlinked_when_replaced(self):
+        first = parallel_scoring._share(FakeSnapshot(1))
+        parallel_scoring._release(first)
+        self.assertIs(parallel_scoring._share(FakeSnapshot(1)), first)
+        parallel_scoring._release(first)
+
+        parallel_scoring._release(parallel_scoring._share(FakeSnapshot(2)))
+        self.assertUnlinked(first)
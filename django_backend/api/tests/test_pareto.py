@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+
+
+class ParetoRankingWeightsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for part_number, price, lead_time, rating in (
+            ('6008', '$12-18', '1-2 weeks', 4.7),
+            ('6208', '$9-14', '3-4 weeks', 4.2),
+        ):
+            component = Component.objects.create(
+                component_type='bearing', name=f'Ball Bearing {part_number}', manufacturer='SKF',
+                part_number=part_number, price=price, rating=rating, lead_time=lead_time,
+                specifications=[], pros=[], cons=[], alternatives=[],
+            )
+            ComponentSpecification.objects.create(
+                component=component, bore_diameter=40, dynamic_load_rating=20, speed_rating=8000,
+            )
+
+    def select(self, weights):
+        return self.client.post(
+            '/api/select-parts/',
+            {'componentType': 'bearing', 'rankingMode': 'pareto', 'rankingWeights': weights},
+            content_type='application/json',
+        )
+
+    def test_valid_weights(self):
+        for weights in (None, {}, {'price': 2, 'leadTime': 0.5}):
+            with self.subTest(weights=weights):
+                response = self.select(weights)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['rankingMode'], 'pareto')
+
+    def test_malformed_weights_are_rejected(self):
+        for weights in ([1, 2], 'price', {'price': 'x'}, {'price': True}, {'cost': 1}):
+            with self.subTest(weights=weights):
+                response = self.select(weights)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('rankingWeights', response.json()['error'])
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from parts.models import (
+    Component, CriteriaPayload, SelectionComponentRollup, SelectionDailyRollup, SelectionHistory,
+)
+from api.analytics import rebuild_rollups
+
+
+class SelectionComponentRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.component = Component.objects.create(
+            component_type='bearing', name='Ball Bearing 6008', manufacturer='SKF',
+            part_number='6008', price='$12-18',
+        )
+
+    def select(self, component_type):
+        SelectionHistory.record(component_type, {'componentType': component_type}, self.component.id, 80, [])
+
+    def test_type_change_keeps_counting_the_same_row(self):
+        self.select('bearing')
+        # Recategorized the same day
+        self.select('seal')
+        self.select('seal')
+
+        self.assertEqual(
+            list(SelectionComponentRollup.objects.values_list('component_id', 'component_type', 'selections')),
+            [(self.component.id, 'seal', 3)],
+        )
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.select('bearing')
+        self.select('seal')
+        incremental = list(SelectionComponentRollup.objects.values_list('day', 'component_type', 'selections'))
+
+        rebuild_rollups()
+
+        self.assertEqual(
+            list(SelectionComponentRollup.objects.values_list('day', 'component_type', 'selections')),
+            incremental,
+        )
+
+
+class SelectionRetentionTests(TestCase):
+    CRITERIA = [{'criterion': 'Dynamic Load', 'required': '25 kN', 'actual': '30 kN', 'met': True}]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.component = Component.objects.create(
+            component_type='bearing', name='Ball Bearing 6008', manufacturer='SKF',
+            part_number='6008', price='$12-18',
+        )
+
+    def select(self, match_score=80, criteria=CRITERIA):
+        return SelectionHistory.record('bearing', {'componentType': 'bearing'}, self.component.id, match_score, criteria)
+
+    def compact(self, *args):
+        stdout = StringIO()
+        call_command('compact_history', '--days', '90', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_identical_criteria_share_one_payload(self):
+        first = self.select(80)
+        second = self.select(90)
+
+        self.assertEqual(CriteriaPayload.objects.count(), 1)
+        self.assertEqual(first.criteria_payload_id, second.criteria_payload_id)
+        self.assertEqual(SelectionHistory.objects.get(pk=second.pk).criteria, self.CRITERIA)
+        self.assertEqual(
+            list(SelectionDailyRollup.objects.values_list('component_type', 'selections', 'score_total')),
+            [('bearing', 2, 170)],
+        )
+
+    def test_compaction_keeps_the_rollup_totals(self):
+        old = self.select(70, criteria=[{'criterion': 'Old'}])
+        SelectionHistory.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=120))
+        recent = self.select(80)
+        legacy = SelectionHistory.objects.create(
+            component_type='bearing', form_data={}, selected_component_id=self.component.id,
+            match_score=60, criteria_matches=self.CRITERIA,
+        )
+        rebuild_rollups()
+        rollups = list(SelectionDailyRollup.objects.values_list('day', 'selections', 'score_total'))
+
+        self.assertIn('Would delete 1 rows', self.compact('--dry-run'))
+        self.assertEqual(SelectionHistory.objects.count(), 3)
+
+        self.compact()
+        self.assertEqual(set(SelectionHistory.objects.values_list('pk', flat=True)), {recent.pk, legacy.pk})
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.criteria_matches)
+        self.assertEqual(legacy.criteria_payload_id, recent.criteria_payload_id)
+        # The expired row's payload is no longer referenced
+        self.assertFalse(CriteriaPayload.objects.filter(pk=old.criteria_payload_id).exists())
+        self.assertEqual(
+            list(SelectionDailyRollup.objects.values_list('day', 'selections', 'score_total')), rollups,
+        )
@@ -0,0 +1,78 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from parts.models import Component, ComponentSpecification, SelectionHistory
+from api.selection import catalog_components, score_components
+
+
+FORM = {'componentType': 'bearing', 'dynamicLoad': 25, 'speed': 6000}
+
+
+@override_settings(SELECTION_STREAM_CHUNK_SIZE=4)
+class SelectionStreamTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for i in range(10):
+            component = Component.objects.create(
+                component_type='bearing', name=f'Ball Bearing {i}', manufacturer='SKF',
+                part_number=f'60{i:02}', price='$12-18', rating=round(3 + i * 0.17, 2),
+            )
+            ComponentSpecification.objects.create(
+                component=component, bore_diameter=40, dynamic_load_rating=10 + 3 * i,
+                speed_rating=4000 + 500 * (i % 5),
+            )
+
+    def post(self, query='', **extra):
+        return self.client.post(f'/api/select-parts/{query}', FORM, content_type='application/json', **extra)
+
+    def ndjson_events(self):
+        response = self.post('?stream=ndjson', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_result_matches_the_plain_response(self):
+        events = self.ndjson_events()
+        plain = self.post().json()
+
+        self.assertEqual([event['event'] for event in events], ['progress', 'progress', 'result'])
+        result = events[-1]
+        self.assertEqual(result['recommendations'], plain['recommendations'])
+        self.assertEqual(result['totalMatches'], plain['totalMatches'])
+        self.assertEqual(SelectionHistory.objects.count(), 2)
+
+    def test_progress_carries_the_running_top_3(self):
+        events = self.ndjson_events()
+        catalog = list(catalog_components('bearing'))
+        for event in events[:-1]:
+            with self.subTest(scanned=event['scanned']):
+                self.assertEqual(event['total'], 10)
+                expected = score_components('bearing', FORM, catalog[:event['scanned']])[:3]
+                self.assertEqual(
+                    [(entry['id'], entry['matchScore']) for entry in event['recommendations']],
+                    [(component.id, evaluation['match_score']) for component, evaluation in expected],
+                )
+
+    def test_server_sent_events(self):
+        response = self.post('?stream=sse')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        messages = b''.join(response.streaming_content).decode().split('\n\n')
+
+        self.assertEqual(messages[-1], '')
+        self.assertEqual([message.split('\n')[0] for message in messages[:-1]],
+                         ['event: progress', 'event: progress', 'event: result'])
+        result = json.loads(messages[2].split('\n')[1][len('data: '):])
+        self.assertEqual(len(result['recommendations']), 3)
+
+    def test_failure_ends_the_stream_with_an_error_event(self):
+        with mock.patch('api.selection_stream.evaluate_criteria', side_effect=ZeroDivisionError('boom')):
+            events = self.ndjson_events()
+        self.assertEqual(events, [{'event': 'error', 'error': 'Error processing request: boom'}])
+        self.assertEqual(SelectionHistory.objects.count(), 0)
@@ -0,0 +1,98 @@
+import math
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from parts.models import CatalogChange, Component, ComponentSpecification
+from api import catalog_snapshot, similarity
+from api.similarity import KDTree, get_similarity_index, similar_components
+
+
+class KDTreeTests(SimpleTestCase):
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(4)
+        points = [(rng.random(), rng.random(), rng.random()) for _ in range(300)]
+        tree = KDTree(points)
+        skip = set(rng.sample(range(300), 40))
+        for _ in range(20):
+            query = (rng.random(), rng.random(), rng.random())
+            expected = sorted(
+                (math.dist(point, query), index)
+                for index, point in enumerate(points) if index not in skip
+            )[:5]
+            self.assertEqual(tree.nearest(query, 5, skip), expected)
+
+
+class SimilarityIndexTests(TestCase):
+
+    def setUp(self):
+        for cache in (similarity._indexes, catalog_snapshot._snapshots):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        rng = random.Random(7)
+        for i in range(40):
+            self.add(f'B-{i}', rng.uniform(10, 80), rng.uniform(5, 60))
+
+    def add(self, part_number, bore, load):
+        component = Component.objects.create(
+            component_type='bearing', name=f'Ball Bearing {part_number}', manufacturer='SKF',
+            part_number=part_number, price='$12-18',
+        )
+        ComponentSpecification.objects.create(component=component, bore_diameter=bore, dynamic_load_rating=load)
+        return component
+
+    def brute_force(self, index, component_id, k):
+        query = index.lookup(component_id)
+        live = Component.objects.filter(component_type='bearing').exclude(pk=component_id)
+        return sorted(
+            (math.dist(index.lookup(other_id), query), other_id)
+            for other_id in live.values_list('pk', flat=True)
+        )[:k]
+
+    def test_changes_are_applied_as_tombstones_and_delta(self):
+        built = get_similarity_index('bearing')
+        moved = ComponentSpecification.objects.order_by('pk').first()
+        moved.bore_diameter = 45
+        moved.save()
+        deleted = Component.objects.order_by('pk').last()
+        deleted.delete()
+        added = self.add('B-new', 30, 20)
+
+        index = get_similarity_index('bearing')
+        self.assertIsNot(index, built)
+        self.assertIs(index.tree, built.tree)
+        self.assertEqual(set(index.delta), {moved.component_id, added.pk})
+        self.assertEqual(len(index.tombstones), 2)
+        self.assertIsNone(index.lookup(deleted.pk))
+        # The index a request may still hold is unchanged
+        self.assertEqual(built.delta, {})
+
+        for component_id in Component.objects.values_list('pk', flat=True):
+            with self.subTest(component_id=component_id):
+                self.assertEqual(
+                    index.nearest(component_id, 5),
+                    [(other_id, distance) for distance, other_id in self.brute_force(index, component_id, 5)],
+                )
+
+    def test_pruned_change_log_forces_a_rebuild(self):
+        built = get_similarity_index('bearing')
+        self.add('B-new', 30, 20)
+        CatalogChange.objects.all().delete()
+        self.add('B-newer', 31, 21)
+
+        index = get_similarity_index('bearing')
+        self.assertIsNot(index.tree, built.tree)
+        self.assertEqual((index.delta, index.tombstones), ({}, set()))
+        self.assertEqual(len(index), 42)
+
+    def test_payloads_skip_deleted_neighbours(self):
+        component = Component.objects.order_by('pk').first()
+        nearest = similar_components([(component.pk, 'bearing')], count=3)[component.pk]
+        self.assertEqual(len(nearest), 3)
+
+        Component.objects.filter(pk=nearest[0]['id']).delete()
+        after = similar_components([(component.pk, 'bearing')], count=3)[component.pk]
+        self.assertNotIn(nearest[0]['id'], [entry['id'] for entry in after])
+        self.assertEqual(after[0]['id'], nearest[1]['id'])
+        self.assertEqual(set(after[0]), {'id', 'name', 'manufacturer', 'partNumber', 'rating', 'distance'})
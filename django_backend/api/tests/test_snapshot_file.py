@@ -0,0 +1,113 @@
+import math
+import os
+import tempfile
+from array import array
+
+from django.test import SimpleTestCase, TestCase
+
+from parts.models import CatalogVersion, Component, ComponentSpecification
+from api import catalog_snapshot
+from api.catalog_snapshot import (
+    build_snapshot, get_catalog_snapshot, snapshot_columns, snapshot_file_path, string_columns,
+)
+from api.snapshot_file import read_snapshot_file, write_snapshot_file
+
+
+class SnapshotFileFormatTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'bearing.snap')
+
+    def test_round_trip(self):
+        write_snapshot_file(
+            self.path, 7, array('q', [3, 1, 2]),
+            {'bore_diameter': array('d', [40, float('nan'), 25.5])},
+            {'voltage': ['400V', None, '400V'], 'frame_size': ['IEC 90', 'IEC 90', None]},
+        )
+        mapped = read_snapshot_file(self.path)
+
+        self.assertEqual((mapped.version, len(mapped)), (7, 3))
+        self.assertEqual(list(mapped.ids), [3, 1, 2])
+        bore = mapped.columns['bore_diameter']
+        self.assertEqual((bore[0], bore[2]), (40, 25.5))
+        self.assertTrue(math.isnan(bore[1]))
+        self.assertEqual(list(mapped.strings['voltage']), ['400V', None, '400V'])
+        self.assertEqual(list(mapped.strings['frame_size']), ['IEC 90', 'IEC 90', None])
+        # Each distinct value is stored once
+        self.assertEqual(mapped.strings['voltage'].offsets.tolist(), [0, 4, 10])
+
+    def test_empty_snapshot(self):
+        write_snapshot_file(self.path, 1, array('q'), {'bore_diameter': array('d')}, {})
+        mapped = read_snapshot_file(self.path)
+        self.assertEqual(len(mapped), 0)
+        self.assertEqual(list(mapped.columns), ['bore_diameter'])
+
+    def test_unreadable_files_are_ignored(self):
+        self.assertIsNone(read_snapshot_file(self.path))
+
+        write_snapshot_file(self.path, 1, array('q', [1, 2]), {'width': array('d', [8, 9])}, {'voltage': ['x', 'y']})
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        for damaged in (content[:-3], content[:40], b'NOTASNAP' + content[8:]):
+            with self.subTest(length=len(damaged)):
+                with open(self.path, 'wb') as f:
+                    f.write(damaged)
+                self.assertIsNone(read_snapshot_file(self.path))
+
+
+class SnapshotFileCatalogTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = self.settings(CATALOG_SNAPSHOT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        catalog_snapshot._snapshots.clear()
+        self.addCleanup(catalog_snapshot._snapshots.clear)
+
+        for i, voltage in enumerate(('400V', None, '230/400V')):
+            component = Component.objects.create(
+                component_type='motor', name=f'Motor {i}', manufacturer='ABB',
+                part_number=f'M-{i}', price='$200-300', rating=4.0 + i / 10,
+            )
+            ComponentSpecification.objects.create(component=component, power=1.5 + i, voltage=voltage)
+
+    def test_file_matches_the_database_snapshot(self):
+        snapshot = get_catalog_snapshot('Motor')
+        self.assertTrue(os.path.exists(snapshot_file_path('motor')))
+
+        built = build_snapshot('motor', with_strings=True)
+        self.assertEqual(list(snapshot.ids), list(built.ids))
+        self.assertEqual(list(snapshot.columns['power']), list(built.columns['power']))
+        self.assertEqual(list(snapshot.strings['voltage']), list(built.strings['voltage']))
+        self.assertEqual(snapshot.row(0).voltage, '230/400V')
+        self.assertEqual(snapshot.row(0).voltage_v, 230)
+
+    def test_catalog_edit_recompiles_the_file(self):
+        first = get_catalog_snapshot('motor')
+        ComponentSpecification.objects.filter(power=1.5).get().delete()
+
+        second = get_catalog_snapshot('motor')
+        self.assertEqual(second.version, CatalogVersion.current())
+        self.assertEqual(read_snapshot_file(snapshot_file_path('motor')).version, second.version)
+        self.assertEqual(len(second), 2)
+        # Mappings already handed out stay readable
+        self.assertEqual(len(first), 3)
+
+    def test_file_of_another_database_with_the_same_version_is_rebuilt(self):
+        # As left behind by a database that was recreated or restored
+        path = snapshot_file_path('motor')
+        version = CatalogVersion.current()
+        write_snapshot_file(
+            path, version, array('q', [999]),
+            {name: array('d', [1.0]) for name in snapshot_columns('motor')},
+            {name: [None] for name in string_columns('motor')},
+        )
+
+        snapshot = get_catalog_snapshot('motor')
+        self.assertEqual(snapshot.version, version)
+        self.assertEqual(list(snapshot.ids), list(build_snapshot('motor').ids))
+        self.assertEqual(len(read_snapshot_file(path)), 3)
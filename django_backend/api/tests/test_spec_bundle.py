@@ -0,0 +1,33 @@
+import zipfile
+from io import BytesIO
+
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+
+
+class SpecBundleTests(TestCase):
+
+    def add(self, part_number):
+        component = Component.objects.create(
+            component_type='bearing', name='Ball Bearing', manufacturer='SKF',
+            part_number=part_number, price='$12-18', rating=4.5, lead_time='1-2 weeks',
+            specifications=[], pros=[], cons=[], alternatives=[],
+        )
+        ComponentSpecification.objects.create(component=component, bore_diameter=40, dynamic_load_rating=25)
+        return component
+
+    def test_zip_entries_stay_in_the_archive_root(self):
+        components = [self.add('../../etc/cron.d/6008'), self.add('/tmp/6009'), self.add('6010')]
+        response = self.client.post('/api/download-specs/bundle/', {
+            'componentIds': [component.id for component in components],
+            'requirements': {'componentType': 'bearing'},
+            'output': 'zip',
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(
+                archive.namelist(),
+                ['....etccron.d6008-specs.csv', 'tmp6009-specs.csv', '6010-specs.csv'],
+            )
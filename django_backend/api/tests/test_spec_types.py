@@ -0,0 +1,54 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification, sync_spec_types
+from api.catalog_snapshot import build_snapshot
+from api.selection import catalog_components
+
+
+class SpecTypeBackfillTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.synced = Component.objects.create(
+            component_type='bearing', name='Ball Bearing 6008', manufacturer='SKF',
+            part_number='6008', price='$12-18', rating=4.7,
+        )
+        ComponentSpecification.objects.create(component=cls.synced, bore_diameter=40)
+
+        # A row written before the copied type existed
+        cls.legacy = Component.objects.create(
+            component_type='bearing', name='Ball Bearing 6208', manufacturer='SKF',
+            part_number='6208', price='$9-14', rating=4.2,
+        )
+        ComponentSpecification.objects.create(component=cls.legacy, bore_diameter=40)
+        ComponentSpecification.objects.filter(component=cls.legacy).update(component_type='')
+
+    def test_untyped_rows_are_scored_once_backfilled(self):
+        self.assertEqual(list(catalog_components('bearing').values_list('id', flat=True)), [self.synced.id])
+
+        self.assertEqual(sync_spec_types(batch_size=1), 1)
+        self.assertEqual(
+            ComponentSpecification.objects.get(component=self.legacy).component_type, 'bearing'
+        )
+        self.assertEqual(
+            list(catalog_components('bearing').values_list('id', flat=True)),
+            [self.synced.id, self.legacy.id],
+        )
+        self.assertEqual(list(build_snapshot('bearing').ids), [self.synced.id, self.legacy.id])
+        self.assertEqual(sync_spec_types(), 0)
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite query plan')
+    def test_selection_reads_the_type_partial_index(self):
+        for i in range(200):
+            component = Component.objects.create(
+                component_type=('bearing', 'motor', 'gear', 'seal')[i % 4], name=f'Part {i}',
+                manufacturer='SKF', part_number=f'P-{i}', price='$10',
+            )
+            ComponentSpecification.objects.create(component=component, bore_diameter=40, power=3)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.assertIn('spec_bearing_covering', catalog_components('bearing').explain())
@@ -0,0 +1,86 @@
+import random
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from parts.models import Component, ComponentSpecification
+from api import catalog_snapshot
+from api.selection import rank_components
+from api.sweep import SWEEP_PARAMETERS, run_sweep, sweep_steps
+
+
+# Spec values drawn per swept field; some are left empty to hit the defaults
+SPEC_RANGES = {
+    'dynamic_load_rating': (5, 60), 'speed_rating': (2000, 20000), 'l10_life': (5000, 60000),
+    'bore_diameter': (10, 60), 'power': (0.5, 20), 'speed': (900, 3600),
+    'power_transmission': (5, 40), 'module': (1, 4), 'seal_diameter': (15, 60),
+    'pressure_rating': (10, 120), 'clamp_load_capacity': (5000, 30000),
+}
+
+
+class SweepTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(11)
+        for component_type, parameters in SWEEP_PARAMETERS.items():
+            fields = sorted({swept.field for swept in parameters.values()})
+            for i in range(25):
+                component = Component.objects.create(
+                    component_type=component_type, name=f'{component_type} {i}', manufacturer='Acme',
+                    part_number=f'{component_type}-{i}', price='$10-20', rating=round(rng.uniform(3, 5), 1),
+                )
+                ComponentSpecification.objects.create(component=component, **{
+                    field: None if rng.random() < 0.1 else round(rng.uniform(*SPEC_RANGES[field]), 1)
+                    for field in fields
+                })
+
+    def setUp(self):
+        cache.clear()
+        catalog_snapshot._snapshots.clear()
+        self.addCleanup(catalog_snapshot._snapshots.clear)
+
+    def test_every_step_matches_a_full_ranking(self):
+        for component_type, parameters in SWEEP_PARAMETERS.items():
+            for parameter, swept in parameters.items():
+                low, high = SPEC_RANGES[swept.field]
+                values = sweep_steps(low * 0.8, high * 1.2, 15)
+                form_data = {'componentType': component_type}
+                steps, total = run_sweep(component_type, form_data, parameter, values, 5)
+                self.assertEqual(total, 25)
+                for value, ranked in steps:
+                    with self.subTest(component_type=component_type, parameter=parameter, value=value):
+                        expected, _ = rank_components(component_type, {**form_data, parameter: value}, 5)
+                        self.assertEqual(
+                            ranked,
+                            [(component.id, evaluation['match_score']) for component, evaluation in expected],
+                        )
+
+    def sweep(self, body):
+        return self.client.post('/api/select-parts/sweep/', body, content_type='application/json')
+
+    def test_endpoint_flags_changes_of_the_best_part(self):
+        response = self.sweep({
+            'componentType': 'bearing',
+            'sweep': {'parameter': 'dynamicLoad', 'start': 5, 'stop': 70, 'steps': 14},
+            'topK': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['steps']
+        self.assertEqual([step['value'] for step in results], sweep_steps(5, 70, 14))
+        self.assertFalse(results[0]['changed'])
+        for previous, step in zip(results, results[1:]):
+            self.assertEqual(
+                step['changed'], step['recommendations'][0]['id'] != previous['recommendations'][0]['id']
+            )
+        self.assertTrue(any(step['changed'] for step in results))
+
+    def test_invalid_sweeps_are_rejected(self):
+        for body in (
+            {'componentType': 'bearing', 'sweep': {'parameter': 'voltage', 'values': [1]}},
+            {'componentType': 'bearing', 'sweep': {'parameter': 'speed', 'values': []}},
+            {'componentType': 'bearing', 'sweep': {'parameter': 'speed', 'values': [1]}, 'topK': 0},
+            {'sweep': {'parameter': 'speed', 'values': [1]}},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.sweep(body).status_code, 400)
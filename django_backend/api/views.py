@@ -1,18 +1,39 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view, renderer_classes
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Q
-from parts.models import Component, ComponentSpecification, SelectionHistory, Cart
+from parts.models import Component, ComponentSpecification, ComponentType, SelectionHistory, Cart
 from api.serializers import (
     ComponentSerializer,
     SelectionHistorySerializer,
-    CartSerializer,
     ComponentSelectionRequestSerializer,
 )
-from api.criteria_engine import evaluate_criteria
+from api.fast_serializers import component_values, serialize_component_rows, serialize_cart
+from api import metrics
+from api.selection import build_recommendation
+from api.selection_request import (
+    has_components, run_selection, selection_error, streaming_selection_response,
+)
+from api.renderers import CompactSelectionRenderer
 from api.download_handler import generate_specs_csv, generate_bom_csv
-from datetime import datetime
+from api.analytics import daily_selections, top_components, requirement_histograms
+from api.datasheets import DATASHEET_FORMATS, datasheet_bundle, datasheet_filename, render_datasheet
+from api.carts import cart_session_id, add_to_cart, remove_from_cart
+from api.spec_bundle import BUNDLE_FORMATS, iter_bundle
+from api.catalog_export import EXPORT_FORMATS, available_formats, default_format, iter_export
+from api.filters import SpecRangeFilterBackend
+from api.facets import cached_facet_counts
+from api.similarity import similar_components
+from api.sweep import SWEEP_PARAMETERS, run_sweep, sweep_steps
+from api.assembly import solve_assembly
+from api.selection_stream import astream_selection, stream_selection
+import math
+from datetime import datetime, timedelta
+from django.utils import timezone
 
 
 class ComponentViewSet(viewsets.ReadOnlyModelViewSet):
@@ -23,9 +44,16 @@ class ComponentViewSet(viewsets.ReadOnlyModelViewSet):
     - component_type: Filter by type (bearing, motor, gear, seal, fastener)
     - manufacturer: Filter by manufacturer
     - search: Search by name or part number
+    - <numeric field>__gte / __lte / __gt / __lt / __range: Range filters on
+      spec fields, rating and lead_time_days, e.g. bore_diameter__gte=20,
+      power__range=1.5,7.5
     - ordering: Order by rating, price, created_at (default: -rating)
+    
+    GET /components/facets/ returns counts per manufacturer, availability and
+    rating bucket for the same filters.
     """
     serializer_class = ComponentSerializer
+    filter_backends = [*api_settings.DEFAULT_FILTER_BACKENDS, SpecRangeFilterBackend]
     filterset_fields = ['component_type', 'manufacturer']
     search_fields = ['name', 'part_number', 'manufacturer']
     ordering_fields = ['rating', 'created_at']
@@ -35,14 +63,47 @@ class ComponentViewSet(viewsets.ReadOnlyModelViewSet):
         queryset = Component.objects.prefetch_related('specification')
         
         # Additional filtering
-        component_type = self.request.query_params.get('component_type')
-        if component_type:
-            queryset = queryset.filter(component_type=component_type)
+        for field in ('component_type', 'manufacturer'):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
         
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # Read path bypasses ComponentSerializer; output is identical
+        queryset = component_values(self.filter_queryset(self.get_queryset()))
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_component_rows(page))
+        
+        return Response(serialize_component_rows(queryset))
+    
+    def retrieve(self, request, *args, **kwargs):
+        queryset = component_values(self.filter_queryset(self.get_queryset()))
+        
+        try:
+            rows = list(queryset.filter(pk=kwargs['pk']))
+        except (TypeError, ValueError):
+            rows = []
+        if not rows:
+            raise Http404
+        
+        data = serialize_component_rows(rows)[0]
+        data['similarComponents'] = similar_components(
+            [(data['id'], data['component_type'])]
+        ).get(data['id'], [])
+        return Response(data)
+    
+    @action(detail=False)
+    def facets(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(cached_facet_counts(queryset, request.query_params))
 
 
 @api_view(['POST'])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [CompactSelectionRenderer])
 def select_parts(request):
     """
     Select COTS components based on engineering requirements
@@ -59,82 +120,152 @@ def select_parts(request):
         ...other component-specific parameters
     }
     
-    Returns top 3 matching components with criteria evaluation and match scores
+    Returns top 3 matching components with criteria evaluation and match scores.
+    With "rankingMode": "pareto" returns the Pareto front over match score,
+    price, lead time and rating instead, ordered by "rankingWeights"
+    ({"score", "price", "leadTime", "rating"}).
+    Send `Accept: application/vnd.cots.compact+json` or `?format=compact` for
+    the compact encoding (see renderers.compact_selection).
+    Identical concurrent requests are ranked once (see api.coalescing).
+    With ?stream=ndjson or ?stream=sse the running top 3 is streamed while
+    the catalog is scanned, followed by the final result (see
+    api.selection_stream).
     """
     try:
         form_data = request.data
-        component_type = form_data.get('componentType')
+        stream = request.query_params.get('stream')
+        error = selection_error(form_data, stream)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        component_type = form_data['componentType']
         
-        if not component_type:
+        if stream:
+            if not has_components(component_type):
+                return Response(
+                    {'error': f'No components found for type: {component_type}'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            events = (
+                astream_selection if isinstance(request._request, ASGIRequest) else stream_selection
+            )(stream, component_type, form_data)
+            return streaming_selection_response(stream, events)
+        
+        result = run_selection(component_type, form_data)
+        if result is None:
             return Response(
-                {'error': 'componentType is required'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': f'No components found for type: {component_type}'},
+                status=status.HTTP_404_NOT_FOUND
             )
+        return Response(result)
         
-        # Get all components of this type
-        components = Component.objects.filter(
-            component_type=component_type.lower()
-        ).prefetch_related('specification')
-        
-        if not components.exists():
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing request: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _sweep_values(sweep):
+    """Swept values from {"values": [...]} or {"start", "stop", "steps"}"""
+    if 'values' in sweep:
+        values = sweep['values']
+        if not isinstance(values, list) or not values:
+            raise ValueError('sweep.values must be a non-empty list of numbers')
+        values = [float(value) for value in values]
+    else:
+        if 'start' not in sweep or 'stop' not in sweep:
+            raise ValueError('sweep needs either values or start and stop')
+        start, stop = float(sweep['start']), float(sweep['stop'])
+        steps = int(sweep.get('steps', 11))
+        if steps < 1 or steps > settings.SWEEP_MAX_STEPS:
+            raise ValueError(f'sweep.steps must be between 1 and {settings.SWEEP_MAX_STEPS}')
+        values = sweep_steps(start, stop, steps)
+    if len(set(values)) > settings.SWEEP_MAX_STEPS:
+        raise ValueError(f'At most {settings.SWEEP_MAX_STEPS} sweep values are allowed')
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError('sweep values must be finite numbers')
+    return values
+
+
+@api_view(['POST'])
+def sweep_selection(request):
+    """
+    Rank components at each value of one swept requirement
+    
+    Request body: a select-parts requirement form plus
+    {
+        "sweep": {"parameter": "dynamicLoad", "start": 10, "stop": 40, "steps": 31},
+        "topK": 3
+    }
+    ("values": [10, 12.5, ...] may be given instead of start/stop/steps)
+    
+    Returns the top-K at each value in ascending order, flagging the steps
+    where the best part changes. The catalog is evaluated once; see api.sweep.
+    """
+    data = request.data
+    component_type = str(data.get('componentType') or '').lower()
+    if not component_type:
+        return Response({'error': 'componentType is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    sweep = data.get('sweep')
+    parameters = SWEEP_PARAMETERS.get(component_type, {})
+    if not isinstance(sweep, dict) or sweep.get('parameter') not in parameters:
+        return Response(
+            {'error': f'sweep.parameter must be one of: {", ".join(parameters) or "(none)"}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        values = _sweep_values(sweep)
+        top_k = int(data.get('topK', 3))
+        if top_k < 1 or top_k > settings.SWEEP_MAX_TOP_K:
+            raise ValueError(f'topK must be between 1 and {settings.SWEEP_MAX_TOP_K}')
+        form_data = {
+            key: value for key, value in data.items() if key not in ('sweep', 'topK')
+        }
+    except (TypeError, ValueError) as e:
+        return Response({'error': f'Invalid sweep: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        if not Component.objects.filter(component_type=component_type).exists():
             return Response(
                 {'error': f'No components found for type: {component_type}'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Evaluate each component against criteria
-        recommendations = []
-        
-        for component in components:
-            spec = component.specification
-            if not spec:
-                continue
-            
-            # Evaluate criteria
-            evaluation = evaluate_criteria(component_type, form_data, spec)
-            
-            # Build recommendation object
-            recommendation = {
-                'id': component.id,
-                'name': component.name,
-                'manufacturer': component.manufacturer,
-                'partNumber': component.part_number,
-                'price': component.price,
-                'availability': component.availability,
-                'leadTime': component.lead_time,
-                'rating': component.rating,
-                'vendorUrl': component.vendor_url,
-                'specifications': component.specifications,
-                'pros': component.pros,
-                'cons': component.cons,
-                'alternatives': component.alternatives,
-                'matchScore': evaluation['match_score'],
-                'criteriaMatches': evaluation['criteria'],
-                'performanceMetrics': get_performance_metrics(component_type, form_data, spec),
-            }
-            
-            recommendations.append(recommendation)
-        
-        # Sort by match score and return top 3
-        recommendations.sort(key=lambda x: x['matchScore'], reverse=True)
-        top_recommendations = recommendations[:3]
+        steps, total_matches = run_sweep(component_type, form_data, sweep['parameter'], values, top_k)
+        components = Component.objects.only('name', 'manufacturer', 'part_number').in_bulk(
+            {component_id for _, ranked in steps for component_id, _ in ranked}
+        )
         
-        # Save to selection history
-        if top_recommendations:
-            SelectionHistory.objects.create(
-                component_type=component_type.lower(),
-                form_data=form_data,
-                selected_component_id=top_recommendations[0]['id'],
-                match_score=top_recommendations[0]['matchScore'],
-                criteria_matches=top_recommendations[0]['criteriaMatches']
-            )
+        results = []
+        previous_best = None
+        for value, ranked in steps:
+            best = ranked[0][0] if ranked else None
+            results.append({
+                'value': value,
+                'changed': previous_best is not None and best != previous_best,
+                'recommendations': [
+                    {
+                        'id': component_id,
+                        'name': components[component_id].name,
+                        'manufacturer': components[component_id].manufacturer,
+                        'partNumber': components[component_id].part_number,
+                        'matchScore': match_score,
+                    }
+                    for component_id, match_score in ranked
+                    if component_id in components
+                ],
+            })
+            previous_best = best
         
         return Response({
-            'recommendations': top_recommendations,
-            'totalMatches': len(recommendations),
+            'parameter': sweep['parameter'],
+            'steps': results,
+            'totalMatches': total_matches,
             'timestamp': datetime.now().isoformat(),
         })
-        
+    
     except Exception as e:
         return Response(
             {'error': f'Error processing request: {str(e)}'},
@@ -142,112 +273,107 @@ def select_parts(request):
         )
 
 
-def get_performance_metrics(component_type, form_data, spec):
-    """Generate performance metrics for component"""
-    metrics_map = {
-        'bearing': [
-            {
-                'label': 'Dynamic Load Capacity vs Requirement',
-                'value': f'{spec.dynamic_load_rating or 0} kN',
-                'target': f'{form_data.get("dynamicLoad", 0)} kN',
-                'met': (spec.dynamic_load_rating or 0) >= float(form_data.get("dynamicLoad", 0))
-            },
-            {
-                'label': 'Speed Rating',
-                'value': f'{spec.speed_rating or 0} RPM',
-                'target': f'{form_data.get("speed", 0)} RPM',
-                'met': (spec.speed_rating or 0) >= float(form_data.get("speed", 0))
-            },
-            {
-                'label': 'L10 Life',
-                'value': f'{spec.l10_life or 0} hours',
-                'target': f'{form_data.get("targetL10Life", 0)} hours',
-                'met': (spec.l10_life or 0) >= float(form_data.get("targetL10Life", 0))
-            },
-        ],
-        'motor': [
-            {
-                'label': 'Power Output Efficiency',
-                'value': f'{spec.efficiency or 85.3}%',
-                'target': '≥80%',
-                'met': True
-            },
-            {
-                'label': 'Speed Match',
-                'value': f'{spec.speed or 0} RPM',
-                'target': f'{form_data.get("speed", 0)} RPM',
-                'met': (spec.speed or 0) == float(form_data.get("speed", 0))
-            },
-            {
-                'label': 'Thermal Capability',
-                'value': f'{spec.insulation_class or "F"} class insulation',
-                'target': 'Class F insulation',
-                'met': True
-            },
-        ],
-        'gear': [
-            {
-                'label': 'Power Transmission',
-                'value': f'{spec.power_transmission or 15} kW',
-                'target': f'{form_data.get("power", 0)} kW',
-                'met': (spec.power_transmission or 15) >= float(form_data.get("power", 0))
-            },
-            {
-                'label': 'Module Precision',
-                'value': f'{spec.precision_grade or "ISO 7"} grade',
-                'target': 'High precision',
-                'met': True
-            },
-            {
-                'label': 'Material Quality',
-                'value': f'{spec.gear_material or "Steel"}',
-                'target': 'High-strength material',
-                'met': True
-            },
-        ],
-        'seal': [
-            {
-                'label': 'Pressure Rating',
-                'value': f'{spec.pressure_rating or 50} bar',
-                'target': f'{form_data.get("pressure", 0)} bar',
-                'met': (spec.pressure_rating or 50) >= float(form_data.get("pressure", 0))
-            },
-            {
-                'label': 'Leakage Rate',
-                'value': '<0.1 cc/hour',
-                'target': 'Zero leak',
-                'met': True
-            },
-            {
-                'label': 'Elastomer Durability',
-                'value': '5 years min',
-                'target': 'Long-term reliability',
-                'met': True
-            },
-        ],
-        'fastener': [
-            {
-                'label': 'Tensile Strength',
-                'value': f'{spec.tensile_strength or 800} MPa',
-                'target': 'High-strength required',
-                'met': True
-            },
-            {
-                'label': 'Clamp Load Capacity',
-                'value': f'{spec.clamp_load_capacity or 12000} N',
-                'target': f'{form_data.get("clampLoad", 0)} N',
-                'met': (spec.clamp_load_capacity or 12000) >= float(form_data.get("clampLoad", 0))
-            },
-            {
-                'label': 'Corrosion Resistance',
-                'value': 'Zinc-plated',
-                'target': f'{form_data.get("fastenerEnvironment", "Dry")}',
-                'met': True
-            },
-        ]
+def _bounded_int(data, key, default, maximum):
+    value = int(data.get(key, default))
+    if value < 1 or value > maximum:
+        raise ValueError(f'{key} must be between 1 and {maximum}')
+    return value
+
+
+@api_view(['POST'])
+def select_assembly(request):
+    """
+    Select a compatible set of parts for an assembly
+    
+    Request body:
+    {
+        "components": {
+            "motor": {"power": 3, "speed": 1450, "voltage": "400V"},
+            "bearing": {"dynamicLoad": 20, "speed": 6000, "boreSize": 30},
+            "gear": {"power": 5, "moduleSize": 2},
+            "seal": {"sealDiameter": 30, "pressure": 50}
+        },
+        "candidatesPerType": 50,
+        "topK": 5
     }
     
-    return metrics_map.get(component_type.lower(), [])
+    Returns the topK combinations (one part per type) with the highest mean
+    match score that satisfy the constraints between the types, see
+    api.assembly.ASSEMBLY_CONSTRAINTS.
+    """
+    forms = request.data.get('components')
+    if not isinstance(forms, dict) or not forms:
+        return Response(
+            {'error': 'components must map component types to requirement forms'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        forms = {
+            component_type.lower(): {**form_data, 'componentType': component_type.lower()}
+            for component_type, form_data in forms.items()
+        }
+        unknown = sorted(set(forms) - set(ComponentType.values))
+        if unknown:
+            raise ValueError(f'unknown component types: {", ".join(unknown)}')
+        candidates_per_type = _bounded_int(
+            request.data, 'candidatesPerType', settings.ASSEMBLY_CANDIDATES_PER_TYPE,
+            settings.ASSEMBLY_MAX_CANDIDATES_PER_TYPE
+        )
+        top_k = _bounded_int(request.data, 'topK', 5, settings.ASSEMBLY_MAX_RESULTS)
+    except (AttributeError, TypeError, ValueError) as e:
+        return Response({'error': f'Invalid assembly: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        for component_type in forms:
+            if not Component.objects.filter(component_type=component_type).exists():
+                return Response(
+                    {'error': f'No components found for type: {component_type}'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        
+        assemblies, solver = solve_assembly(
+            forms, candidates_per_type, top_k, settings.ASSEMBLY_MAX_NODES
+        )
+        
+        recommendations = {}
+        def recommendation(component_type, component, evaluation):
+            key = (component_type, component.id)
+            if key not in recommendations:
+                recommendations[key] = build_recommendation(
+                    component_type, forms[component_type], component, evaluation
+                )
+            return recommendations[key]
+        
+        return Response({
+            'assemblies': [
+                {
+                    'matchScore': match_score,
+                    'parts': {
+                        component_type: recommendation(component_type, component, evaluation)
+                        for component_type, (component, evaluation) in parts.items()
+                    },
+                }
+                for match_score, parts in assemblies
+            ],
+            'constraints': [constraint.name for constraint in solver.constraints],
+            'candidates': {
+                component_type: {
+                    'considered': len(solver.candidates[component_type]),
+                    'compatible': len(solver.domains[component_type]),
+                }
+                for component_type in forms
+            },
+            'searchNodes': solver.nodes,
+            'exhaustive': solver.exhaustive,
+            'timestamp': datetime.now().isoformat(),
+        })
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Error processing request: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
 
 @api_view(['POST'])
@@ -286,6 +412,200 @@ def download_specs(request):
         )
 
 
+def _requested_components(data, limit):
+    """
+    Load the components listed in a bundle request body
+    
+    Returns (components in request order, requirement form, None), or
+    (None, None, error response).
+    """
+    component_ids = data.get('componentIds') or [data.get('componentId')]
+    try:
+        component_ids = list(dict.fromkeys(int(pk) for pk in component_ids))
+    except (TypeError, ValueError):
+        return None, None, Response(
+            {'error': 'componentIds must be a list of component ids'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(component_ids) > limit:
+        return None, None, Response(
+            {'error': f'At most {limit} components per bundle'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    form_data = data.get('requirements') or {}
+    if not isinstance(form_data, dict):
+        return None, None, Response(
+            {'error': 'requirements must be an object'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    components = Component.objects.select_related('specification').in_bulk(component_ids)
+    missing = [pk for pk in component_ids if pk not in components]
+    if missing:
+        return None, None, Response(
+            {'error': f'Components not found: {missing}'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    components = [components[pk] for pk in component_ids]
+    unspecified = [c.pk for c in components if not hasattr(c, 'specification')]
+    if unspecified:
+        return None, None, Response(
+            {'error': f'Components without specifications: {unspecified}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    return components, form_data, None
+
+
+@api_view(['POST'])
+def download_datasheet(request):
+    """
+    Download component datasheets evaluated against a requirement form
+    
+    Request body:
+    {
+        "componentIds": [1, 2],
+        "requirements": {"componentType": "bearing", "dynamicLoad": 25, ...},
+        "output": "text" | "html"
+    }
+    A single component is returned as a file, several as a ZIP bundle.
+    """
+    data = request.data
+    output = data.get('output', 'text')
+    if output not in DATASHEET_FORMATS:
+        return Response(
+            {'error': f'output must be one of: {", ".join(DATASHEET_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    components, form_data, error = _requested_components(data, settings.DATASHEET_MAX_BUNDLE)
+    if error:
+        return error
+    
+    try:
+        if len(components) == 1:
+            component = components[0]
+            response = HttpResponse(
+                render_datasheet(component, form_data, output),
+                content_type=DATASHEET_FORMATS[output][1]
+            )
+            filename = datasheet_filename(component, output)
+        else:
+            response = HttpResponse(
+                datasheet_bundle(components, form_data, output), content_type='application/zip'
+            )
+            filename = f'datasheets-{datetime.now().timestamp()}.zip'
+        
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to generate datasheet: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def download_specs_bundle(request):
+    """
+    Download specification sheets for several components in one request
+    
+    Request body:
+    {
+        "componentIds": [1, 2, 3],
+        "requirements": {"componentType": "bearing", "dynamicLoad": 25, ...},
+        "output": "csv" | "zip"
+    }
+    The components are evaluated server-side; the response is one combined
+    CSV or a ZIP with one sheet per component, streamed as sheets are rendered.
+    """
+    data = request.data
+    output = data.get('output', 'zip')
+    if output not in BUNDLE_FORMATS:
+        return Response(
+            {'error': f'output must be one of: {", ".join(BUNDLE_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    components, form_data, error = _requested_components(data, settings.SPEC_BUNDLE_MAX_COMPONENTS)
+    if error:
+        return error
+    
+    content_type, extension = BUNDLE_FORMATS[output]
+    response = StreamingHttpResponse(
+        iter_bundle(components, form_data, output), content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="specs-bundle-{datetime.now().timestamp()}.{extension}"'
+    )
+    return response
+
+
+@api_view(['GET'])
+def export_catalog(request):
+    """
+    Stream the full catalog (components joined with their specifications)
+
+    Query parameters:
+    - output: parquet, arrow or jsonl (default: parquet when pyarrow is
+      installed, otherwise gzip'd JSON-lines)
+    - component_type: Export a single component type
+    """
+    output = request.query_params.get('output') or default_format()
+    if output not in available_formats():
+        return Response(
+            {'error': f'output must be one of: {", ".join(available_formats())}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    content_type, extension, _ = EXPORT_FORMATS[output]
+    response = StreamingHttpResponse(
+        iter_export(output, request.query_params.get('component_type')),
+        content_type=content_type
+    )
+    response['Content-Disposition'] = f'attachment; filename="catalog.{extension}"'
+    return response
+
+
+@api_view(['GET'])
+def selection_analytics(request):
+    """
+    Selection analytics from the rollup tables
+    
+    Query parameters:
+    - days: Number of days up to today to cover (default: 30)
+    - component_type: Restrict to one component type
+    - limit: Number of top components (default: 10)
+    """
+    try:
+        days = int(request.query_params.get('days', 30))
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        return Response(
+            {'error': 'days and limit must be integers'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if days < 1 or limit < 1:
+        return Response(
+            {'error': 'days and limit must be positive'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    component_type = request.query_params.get('component_type')
+    end = timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    
+    return Response({
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'daily': daily_selections(start, end, component_type),
+        'topComponents': top_components(start, end, component_type, limit),
+        'histograms': requirement_histograms(start, end, component_type),
+    })
+
+
 @api_view(['POST'])
 def download_bom(request):
     """
@@ -335,49 +655,46 @@ def shopping_cart(request, session_id=None):
     """
     Shopping cart management
     
+    The cart belongs to the client's session; staff may pass session_id.
+    
     GET: Retrieve cart
     POST: Add component to cart
     DELETE: Remove from cart
     """
-    session_id = request.query_params.get('session_id') or session_id or 'default'
+    session_id = cart_session_id(request, session_id)
     
     try:
         if request.method == 'GET':
             cart, created = Cart.objects.get_or_create(session_id=session_id)
-            serializer = CartSerializer(cart)
-            return Response(serializer.data)
+            return Response(serialize_cart(cart))
         
         elif request.method == 'POST':
-            cart, created = Cart.objects.get_or_create(session_id=session_id)
-            component_data = request.data
-            
-            cart.components.append({
-                'component_id': component_data.get('component_id'),
-                'name': component_data.get('name'),
-                'quantity': component_data.get('quantity', 1),
-                'price': component_data.get('price'),
-                'manufacturer': component_data.get('manufacturer'),
-            })
-            cart.save()
-            
-            serializer = CartSerializer(cart)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            cart = add_to_cart(session_id, request.data)
+            return Response(serialize_cart(cart), status=status.HTTP_201_CREATED)
         
         elif request.method == 'DELETE':
-            component_id = request.query_params.get('component_id')
-            cart = Cart.objects.get(session_id=session_id)
+            try:
+                component_id = int(request.query_params.get('component_id'))
+            except (TypeError, ValueError):
+                return Response(
+                    {'error': 'component_id is required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            cart.components = [
-                c for c in cart.components
-                if c.get('component_id') != int(component_id)
-            ]
-            cart.save()
-            
-            serializer = CartSerializer(cart)
-            return Response(serializer.data)
+            cart = remove_from_cart(session_id, component_id)
+            return Response(serialize_cart(cart))
     
     except Cart.DoesNotExist:
         return Response(
             {'error': 'Cart not found'},
             status=status.HTTP_404_NOT_FOUND
         )
+
+
+@api_view(['GET'])
+def api_metrics(request):
+    """
+    Request counters of this worker and totals over all workers
+    (see api.metrics)
+    """
+    return Response(metrics.snapshot())
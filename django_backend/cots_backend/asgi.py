@@ -0,0 +1,10 @@
+"""
+ASGI config for cots_backend project.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cots_backend.settings')
+
+application = get_asgi_application()
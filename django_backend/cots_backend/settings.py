@@ -4,6 +4,7 @@ Django settings for cots_backend project.
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,7 +32,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.AdmissionControlMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -59,11 +62,15 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'cots_backend.wsgi.application'
+ASGI_APPLICATION = 'cots_backend.asgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than shared-cache memory, so threaded tests wait for
+        # SQLite's write lock instead of failing with "table is locked"
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -99,12 +106,124 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
 }
 
+# Shared cache: facet counts, selection coalescing locks and results, and
+# request counters. Set CACHE_URL to a Redis URL (redis://host:6379/0) so all
+# workers share it; the default local-memory cache is private to each
+# worker process, so requests are then only coalesced within a worker
+CACHE_URL = os.getenv('CACHE_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    } if CACHE_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Selection coalescing: the cross-worker lock expires after this many seconds
+# (waiters then rank the catalog themselves), results are kept this many
+# seconds for the waiting workers, who poll for them at this interval
+COALESCE_LOCK_TIMEOUT = int(os.getenv('COALESCE_LOCK_TIMEOUT', '30'))
+COALESCE_RESULT_TIMEOUT = int(os.getenv('COALESCE_RESULT_TIMEOUT', '5'))
+COALESCE_POLL_INTERVAL = float(os.getenv('COALESCE_POLL_INTERVAL', '0.05'))
+
+# Admission control (api.middleware.AdmissionControlMiddleware): at most this
+# many requests run at once per endpoint, by URL name (0 = unlimited); more
+# get 503 with Retry-After: ADMISSION_RETRY_AFTER seconds
+ADMISSION_CONCURRENCY_LIMITS = {
+    'select_parts': int(os.getenv('ADMISSION_SELECT_PARTS_LIMIT', '8')),
+    'select_parts_async': int(os.getenv('ADMISSION_SELECT_PARTS_ASYNC_LIMIT', '8')),
+    # One sweep or assembly request ranks the catalog many times over
+    'sweep_selection': int(os.getenv('ADMISSION_SWEEP_SELECTION_LIMIT', '2')),
+    'select_assembly': int(os.getenv('ADMISSION_SELECT_ASSEMBLY_LIMIT', '2')),
+    'download_bom': int(os.getenv('ADMISSION_DOWNLOAD_BOM_LIMIT', '4')),
+    'download_specs': int(os.getenv('ADMISSION_DOWNLOAD_SPECS_LIMIT', '4')),
+}
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', '1'))
+
+# Per-client token bucket on those endpoints: refill rate in requests per
+# second (0 disables) and bucket size; requests over the rate get 429. The
+# client is identified by this request.META key (HTTP_X_FORWARDED_FOR
+# behind a proxy; its last entry, the one the proxy appended, is used)
+ADMISSION_RATE = float(os.getenv('ADMISSION_RATE', '5'))
+ADMISSION_BURST = int(os.getenv('ADMISSION_BURST', '20'))
+ADMISSION_CLIENT_HEADER = os.getenv('ADMISSION_CLIENT_HEADER', 'REMOTE_ADDR')
+
+# 'local' limits each worker process on its own; 'cache' shares the limits
+# through CACHES, with slots expiring after ADMISSION_SLOT_TIMEOUT seconds in
+# case a worker dies holding one
+ADMISSION_BACKEND = os.getenv('ADMISSION_BACKEND', 'local')
+ADMISSION_SLOT_TIMEOUT = int(os.getenv('ADMISSION_SLOT_TIMEOUT', '300'))
+
+# Number of nearest-neighbour similar components added to detail and selection responses (0 disables)
+SIMILAR_COMPONENTS_COUNT = int(os.getenv('SIMILAR_COMPONENTS_COUNT', '5'))
+
+# Component list facets are cached per catalog version; entries expire after this many seconds
+FACET_CACHE_TIMEOUT = int(os.getenv('FACET_CACHE_TIMEOUT', '600'))
+
+# Async views: size of the thread pool that selection ranking is offloaded to
+ASYNC_SCORING_WORKERS = int(os.getenv('ASYNC_SCORING_WORKERS', '4'))
+
+# Parallel scoring: component types with at least this many parts are scored
+# on a process pool sharing the catalog through shared memory (0 disables)
+PARALLEL_SCORING_MIN_CATALOG = int(os.getenv('PARALLEL_SCORING_MIN_CATALOG', '50000'))
+PARALLEL_SCORING_WORKERS = int(os.getenv('PARALLEL_SCORING_WORKERS', str(os.cpu_count() or 2)))
+
+# Compiled catalog snapshot files, memory-mapped by every worker process so
+# they share one copy of the scoring columns ('' keeps per-process copies)
+CATALOG_SNAPSHOT_DIR = os.getenv('CATALOG_SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'cots-snapshots'))
+
+# Pareto ranking mode: default tie-break weights within the front and the
+# maximum number of front members returned
+PARETO_DEFAULT_WEIGHTS = {'score': 1.0, 'price': 0.5, 'leadTime': 0.3, 'rating': 0.5}
+PARETO_MAX_RESULTS = int(os.getenv('PARETO_MAX_RESULTS', '10'))
+
+# Raw SelectionHistory rows older than this many days are removed by
+# `manage.py compact_history`; daily rollups are kept
+SELECTION_HISTORY_RETENTION_DAYS = int(os.getenv('SELECTION_HISTORY_RETENTION_DAYS', '90'))
+
+# Rendered datasheets are cached on disk, evicting least recently used files
+# beyond the size limit; at most DATASHEET_MAX_BUNDLE components per ZIP
+DATASHEET_CACHE_DIR = os.getenv('DATASHEET_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cots-datasheets'))
+DATASHEET_CACHE_MAX_BYTES = int(os.getenv('DATASHEET_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+DATASHEET_MAX_BUNDLE = int(os.getenv('DATASHEET_MAX_BUNDLE', '50'))
+
+# Spec-sheet bundles: sheets are rendered on this many threads ahead of the
+# streamed response; at most SPEC_BUNDLE_MAX_COMPONENTS per request
+BUNDLE_RENDER_WORKERS = int(os.getenv('BUNDLE_RENDER_WORKERS', '2'))
+SPEC_BUNDLE_MAX_COMPONENTS = int(os.getenv('SPEC_BUNDLE_MAX_COMPONENTS', '500'))
+
+# Streamed selections (?stream=ndjson|sse) send the running top 3 after
+# every chunk of this many scanned components
+SELECTION_STREAM_CHUNK_SIZE = int(os.getenv('SELECTION_STREAM_CHUNK_SIZE', '2000'))
+
+# Requirement sweeps: at most this many swept values and ranked parts per value
+SWEEP_MAX_STEPS = int(os.getenv('SWEEP_MAX_STEPS', '200'))
+SWEEP_MAX_TOP_K = int(os.getenv('SWEEP_MAX_TOP_K', '10'))
+
+# Assembly solver: best parts per type that are combined (a request may ask
+# for up to the maximum), combinations returned, and search nodes visited
+# before the best combinations found so far are returned
+ASSEMBLY_CANDIDATES_PER_TYPE = int(os.getenv('ASSEMBLY_CANDIDATES_PER_TYPE', '50'))
+ASSEMBLY_MAX_CANDIDATES_PER_TYPE = int(os.getenv('ASSEMBLY_MAX_CANDIDATES_PER_TYPE', '500'))
+ASSEMBLY_MAX_RESULTS = int(os.getenv('ASSEMBLY_MAX_RESULTS', '10'))
+ASSEMBLY_MAX_NODES = int(os.getenv('ASSEMBLY_MAX_NODES', '200000'))
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
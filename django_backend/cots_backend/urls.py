@@ -4,7 +4,11 @@ URL configuration for cots_backend project.
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from api.views import ComponentViewSet, select_parts, download_specs, download_bom
+from api.views import (
+    ComponentViewSet, select_parts, sweep_selection, select_assembly, download_specs, download_specs_bundle, download_bom,
+    download_datasheet, export_catalog, selection_analytics, shopping_cart, api_metrics,
+)
+from api.async_views import select_parts_async, component_list_async, shopping_cart_async
 
 router = DefaultRouter()
 router.register(r'components', ComponentViewSet, basename='component')
@@ -13,7 +17,18 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/select-parts/', select_parts, name='select_parts'),
+    path('api/select-parts/sweep/', sweep_selection, name='sweep_selection'),
+    path('api/select-assembly/', select_assembly, name='select_assembly'),
     path('api/download-specs/', download_specs, name='download_specs'),
+    path('api/download-specs/bundle/', download_specs_bundle, name='download_specs_bundle'),
     path('api/download-bom/', download_bom, name='download_bom'),
+    path('api/download-datasheet/', download_datasheet, name='download_datasheet'),
+    path('api/catalog/export/', export_catalog, name='export_catalog'),
+    path('api/analytics/selections/', selection_analytics, name='selection_analytics'),
+    path('api/shopping-cart/', shopping_cart, name='shopping_cart'),
+    path('api/metrics/', api_metrics, name='api_metrics'),
+    path('api/async/select-parts/', select_parts_async, name='select_parts_async'),
+    path('api/async/components/', component_list_async, name='component_list_async'),
+    path('api/async/shopping-cart/', shopping_cart_async, name='shopping_cart_async'),
     path('api-auth/', include('rest_framework.urls')),
 ]
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from parts.models import Component, ComponentSpecification, SelectionHistory, Cart
+from parts.models import Component, ComponentSpecification, SelectionHistory, SelectionDailyRollup, Cart
 
 
 class ComponentSpecificationInline(admin.TabularInline):
@@ -24,7 +24,7 @@ class ComponentAdmin(admin.ModelAdmin):
             'fields': ('component_type', 'name', 'manufacturer', 'part_number')
         }),
         ('Pricing & Availability', {
-            'fields': ('price', 'availability', 'lead_time')
+            'fields': ('price', 'availability', 'lead_time', 'lead_time_days')
         }),
         ('Rating & Reviews', {
             'fields': ('rating',)
@@ -34,13 +34,13 @@ class ComponentAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('lead_time_days', 'created_at', 'updated_at')
 
 
 @admin.register(ComponentSpecification)
 class ComponentSpecificationAdmin(admin.ModelAdmin):
     list_display = ('component', 'get_component_type')
-    list_filter = ('component__component_type',)
+    list_filter = ('component_type',)
     search_fields = ('component__name', 'component__manufacturer')
     
     def get_component_type(self, obj):
@@ -83,6 +83,17 @@ class ComponentSpecificationAdmin(admin.ModelAdmin):
             ),
             'classes': ('collapse',)
         }),
+        ('Parsed Values', {
+            'fields': (
+                'fastener_diameter_mm', 'voltage_v', 'voltage_phases',
+                'material_grade_mpa', 'precision_grade_iso'
+            ),
+            'classes': ('collapse',)
+        }),
+    )
+    readonly_fields = (
+        'fastener_diameter_mm', 'voltage_v', 'voltage_phases',
+        'material_grade_mpa', 'precision_grade_iso'
     )
 
 
@@ -91,8 +102,18 @@ class SelectionHistoryAdmin(admin.ModelAdmin):
     list_display = ('component_type', 'selected_component', 'match_score', 'created_at')
     list_filter = ('component_type', 'match_score', 'created_at')
     search_fields = ('selected_component__name', 'selected_component__manufacturer')
-    readonly_fields = ('form_data', 'criteria_matches', 'created_at')
+    readonly_fields = ('form_data', 'criteria', 'created_at')
+    exclude = ('criteria_payload', 'criteria_matches')
     ordering = ['-created_at']
+    list_select_related = ('selected_component',)
+    show_full_result_count = False
+
+
+@admin.register(SelectionDailyRollup)
+class SelectionDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'component_type', 'selections', 'average_score')
+    list_filter = ('component_type',)
+    date_hierarchy = 'day'
 
 
 @admin.register(Cart)
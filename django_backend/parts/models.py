@@ -1,6 +1,16 @@
-from django.db import models
+import hashlib
+import json
+import math
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from parts.normalization import (
+    parse_fastener_diameter_mm, parse_lead_time_days, parse_material_grade_mpa, parse_precision_grade,
+    parse_voltage,
+)
+
 class ComponentType(models.TextChoices):
     BEARING = 'bearing', 'Bearing'
     MOTOR = 'motor', 'Motor'
@@ -9,6 +19,30 @@ class ComponentType(models.TextChoices):
     FASTENER = 'fastener', 'Fastener'
 
 
+# ComponentSpecification fields that apply to each component type
+TYPE_SPEC_FIELDS = {
+    ComponentType.BEARING: [
+        'bore_diameter', 'outer_diameter', 'width', 'dynamic_load_rating',
+        'static_load_rating', 'speed_rating', 'l10_life',
+    ],
+    ComponentType.MOTOR: [
+        'power', 'speed', 'voltage', 'efficiency', 'insulation_class', 'frame_size',
+        'voltage_v', 'voltage_phases',
+    ],
+    ComponentType.GEAR: [
+        'module', 'gear_material', 'pressure_angle', 'face_width', 'power_transmission',
+        'precision_grade', 'precision_grade_iso',
+    ],
+    ComponentType.SEAL: [
+        'seal_diameter', 'pressure_rating', 'temp_min', 'temp_max', 'elastomer_type',
+    ],
+    ComponentType.FASTENER: [
+        'fastener_diameter', 'clamp_load_capacity', 'material_grade', 'tensile_strength',
+        'fastener_diameter_mm', 'material_grade_mpa',
+    ],
+}
+
+
 class Component(models.Model):
     # Basic Info
     component_type = models.CharField(
@@ -23,6 +57,7 @@ class Component(models.Model):
     price = models.CharField(max_length=50)  # e.g., "$25-35"
     availability = models.CharField(max_length=100, default='In Stock')
     lead_time = models.CharField(max_length=100, default='2-3 weeks')
+    lead_time_days = models.FloatField(null=True, blank=True, editable=False, db_index=True)  # parsed on save
     
     # Rating
     rating = models.FloatField(
@@ -52,6 +87,22 @@ class Component(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.manufacturer}"
+    
+    def normalize(self):
+        """Set the numeric shadow columns from their text fields"""
+        self.lead_time_days = parse_lead_time_days(self.lead_time)
+    
+    def save(self, *args, **kwargs):
+        self.normalize()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'lead_time_days'}
+        super().save(*args, **kwargs)
+        if update_fields is None or 'component_type' in update_fields:
+            # Keep the copy on the specification in step
+            ComponentSpecification.objects.filter(component=self).exclude(
+                component_type=self.component_type
+            ).update(component_type=self.component_type)
 
 
 class ComponentSpecification(models.Model):
@@ -64,6 +115,9 @@ class ComponentSpecification(models.Model):
     Fastener: diameter, clamp_load, material_grade, tensile_strength
     """
     component = models.OneToOneField(Component, on_delete=models.CASCADE, related_name='specification')
+    # Copy of component.component_type, set on save, so one type's rows can be
+    # read through its own partial index without joining Component
+    component_type = models.CharField(max_length=20, choices=ComponentType.choices, blank=True, editable=False)
     
     # Bearing specs
     bore_diameter = models.FloatField(null=True, blank=True)  # mm
@@ -103,11 +157,122 @@ class ComponentSpecification(models.Model):
     material_grade = models.CharField(max_length=50, null=True, blank=True)  # 8.8, 10.9, etc
     tensile_strength = models.FloatField(null=True, blank=True)  # MPa
     
+    # Numeric values parsed from the text fields above on save, for
+    # DB-side filtering and vectorized scoring (see parts.normalization)
+    fastener_diameter_mm = models.FloatField(null=True, blank=True, editable=False, db_index=True)
+    voltage_v = models.FloatField(null=True, blank=True, editable=False, db_index=True)
+    voltage_phases = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
+    material_grade_mpa = models.FloatField(null=True, blank=True, editable=False, db_index=True)  # nominal tensile
+    precision_grade_iso = models.PositiveSmallIntegerField(null=True, blank=True, editable=False, db_index=True)
+    
+    NORMALIZED_FIELDS = [
+        'fastener_diameter_mm', 'voltage_v', 'voltage_phases', 'material_grade_mpa', 'precision_grade_iso',
+    ]
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        # One partial index per type over the component and that type's fields:
+        # scans of one type read only its compact index pages, not the wide rows
+        indexes = [
+            models.Index(
+                fields=['component', *fields],
+                condition=models.Q(component_type=component_type),
+                name=f'spec_{component_type}_covering',
+            )
+            for component_type, fields in TYPE_SPEC_FIELDS.items()
+        ]
+    
     def __str__(self):
         return f"Specs for {self.component.name}"
+    
+    @staticmethod
+    def fields_for(component_type):
+        """Spec fields of a component type (all of them for an unknown type)"""
+        fields = TYPE_SPEC_FIELDS.get(str(component_type).lower())
+        if fields is None:
+            return [
+                field.name for field in ComponentSpecification._meta.concrete_fields
+                if not field.primary_key and not field.is_relation
+                and field.name not in ('component_type', 'created_at', 'updated_at')
+            ]
+        return fields
+    
+    def normalize(self):
+        """Set the numeric shadow columns from their text fields"""
+        self.fastener_diameter_mm = parse_fastener_diameter_mm(self.fastener_diameter)
+        self.voltage_v, self.voltage_phases = parse_voltage(self.voltage)
+        self.material_grade_mpa = parse_material_grade_mpa(self.material_grade)
+        self.precision_grade_iso = parse_precision_grade(self.precision_grade)
+    
+    def save(self, *args, **kwargs):
+        self.normalize()
+        if self.component_id:
+            self.component_type = self.component.component_type
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *self.NORMALIZED_FIELDS, 'component_type'}
+        super().save(*args, **kwargs)
+
+
+def sync_spec_types(batch_size=5000):
+    """
+    Copy Component.component_type onto the specifications that differ,
+    batch_size rows per statement; returns the number of rows updated
+    
+    The copy is written with queryset updates, which skip save() and the
+    change signals, so the whole catalog is marked changed afterwards.
+    """
+    component_type = models.Subquery(
+        Component.objects.filter(pk=models.OuterRef('component_id')).values('component_type')[:1]
+    )
+    stale = ComponentSpecification.objects.exclude(component_type=component_type)
+    
+    updated = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            ComponentSpecification.objects.filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            break
+        last_pk = pks[-1]
+        with transaction.atomic():
+            updated += stale.filter(pk__in=pks).update(component_type=component_type)
+    
+    if updated:
+        # Snapshots and cached rankings are rebuilt from the new column
+        CatalogChange.record([])
+    return updated
+
+
+class CriteriaPayload(models.Model):
+    """
+    Content-addressed criteria_matches payload shared by selection history rows
+    
+    The same requirements against the same part produce the same criteria
+    list, so each distinct list is stored once under its sha256 digest.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Criteria payload {self.digest[:12]}"
+    
+    @staticmethod
+    def digest_of(payload):
+        encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+    
+    @classmethod
+    def intern(cls, payload):
+        """Return the stored payload row for this content, creating it if new"""
+        instance, created = cls.objects.get_or_create(
+            digest=cls.digest_of(payload), defaults={'payload': payload}
+        )
+        return instance
 
 
 class SelectionHistory(models.Model):
@@ -116,29 +281,335 @@ class SelectionHistory(models.Model):
     form_data = models.JSONField()
     selected_component = models.ForeignKey(Component, on_delete=models.SET_NULL, null=True)
     match_score = models.IntegerField()
-    criteria_matches = models.JSONField()
+    criteria_payload = models.ForeignKey(
+        CriteriaPayload, on_delete=models.PROTECT, null=True, related_name='selections'
+    )
+    criteria_matches = models.JSONField(null=True, blank=True)  # legacy inline payload
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['component_type', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
     
     def __str__(self):
         return f"{self.component_type} selection on {self.created_at}"
+    
+    @property
+    def criteria(self):
+        """Criteria matches, from the shared payload or the legacy inline column"""
+        if self.criteria_payload_id:
+            return self.criteria_payload.payload
+        return self.criteria_matches
+    
+    @classmethod
+    def record(cls, component_type, form_data, selected_component_id, match_score, criteria_matches):
+        """Store a selection with a shared criteria payload and count it in the rollups"""
+        with transaction.atomic():
+            entry = cls.objects.create(
+                component_type=component_type,
+                form_data=form_data,
+                selected_component_id=selected_component_id,
+                match_score=match_score,
+                criteria_payload=CriteriaPayload.intern(criteria_matches),
+            )
+            SelectionDailyRollup.add(entry)
+            SelectionComponentRollup.add(entry)
+            RequirementHistogramRollup.add(entry)
+        return entry
+
+
+def increment_rollup(model, key, defaults=None, **amounts):
+    """
+    Add amounts to the rollup row identified by key, creating it on first use
+    
+    key must match the model's unique constraint. defaults are other
+    columns, written along with the increment. F() increments keep
+    concurrent writers from losing counts.
+    """
+    defaults = defaults or {}
+    increments = {name: models.F(name) + amount for name, amount in amounts.items()}
+    if not model.objects.filter(**key).update(**increments, **defaults):
+        try:
+            # Savepoint so a concurrent insert of the same key does not abort the caller
+            with transaction.atomic():
+                model.objects.create(**key, **defaults, **amounts)
+        except IntegrityError:
+            model.objects.filter(**key).update(**increments, **defaults)
+
+
+class SelectionDailyRollup(models.Model):
+    """
+    Per-day, per-type selection aggregates
+    
+    Maintained on every SelectionHistory write, so the totals survive the
+    retention of the raw rows.
+    """
+    day = models.DateField()
+    component_type = models.CharField(max_length=20, choices=ComponentType.choices)
+    selections = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveBigIntegerField(default=0)  # sum of match_score
+    
+    class Meta:
+        ordering = ['-day', 'component_type']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'component_type'], name='unique_selection_rollup_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.component_type} selections on {self.day}"
+    
+    @property
+    def average_score(self):
+        return self.score_total / self.selections if self.selections else 0
+    
+    @classmethod
+    def add(cls, entry):
+        """Count one SelectionHistory row"""
+        increment_rollup(
+            cls,
+            {'day': timezone.localdate(entry.created_at), 'component_type': entry.component_type},
+            selections=1, score_total=entry.match_score,
+        )
+
+
+class SelectionComponentRollup(models.Model):
+    """
+    Per-day count of how often each component was the top recommendation
+    
+    component_type is the component's type at its latest selection that day.
+    """
+    day = models.DateField()
+    component_type = models.CharField(max_length=20, choices=ComponentType.choices)
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='selection_rollups')
+    selections = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'component'], name='unique_component_rollup_day'),
+        ]
+        indexes = [
+            models.Index(fields=['component_type', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"Component {self.component_id} selections on {self.day}"
+    
+    @classmethod
+    def add(cls, entry):
+        if entry.selected_component_id:
+            increment_rollup(
+                cls,
+                {'day': timezone.localdate(entry.created_at), 'component_id': entry.selected_component_id},
+                defaults={'component_type': entry.component_type},
+                selections=1,
+            )
+
+
+class RequirementHistogramRollup(models.Model):
+    """
+    Per-day histogram of requested load, speed and power values
+    
+    Buckets follow the 1-2-5 series (..., 1, 2, 5, 10, 20, 50, ...); bucket is
+    the lower bound.
+    """
+    # Requirement form fields and their units
+    FIELDS = {
+        'dynamicLoad': 'kN',
+        'clampLoad': 'N',
+        'speed': 'RPM',
+        'power': 'kW',
+    }
+    
+    day = models.DateField()
+    component_type = models.CharField(max_length=20, choices=ComponentType.choices)
+    field = models.CharField(max_length=30)
+    bucket = models.FloatField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'component_type', 'field', 'bucket'], name='unique_requirement_bucket_day'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.field} >= {self.bucket} on {self.day}"
+    
+    @staticmethod
+    def bucket_of(value):
+        """Lower bound of the 1-2-5 series bucket holding value (0 for values <= 0)"""
+        if value <= 0:
+            return 0.0
+        exponent = math.floor(math.log10(value))
+        mantissa = round(value / 10 ** exponent, 9)
+        step = 5 if mantissa >= 5 else 2 if mantissa >= 2 else 1
+        return float(f'{step}e{exponent}')
+    
+    @classmethod
+    def buckets_of(cls, form_data):
+        """Yield (field, bucket) for the histogrammed fields present in a requirement form"""
+        for field in cls.FIELDS:
+            try:
+                value = float(form_data[field])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if math.isfinite(value):
+                yield field, cls.bucket_of(value)
+    
+    @classmethod
+    def add(cls, entry):
+        day = timezone.localdate(entry.created_at)
+        for field, bucket in cls.buckets_of(entry.form_data):
+            increment_rollup(
+                cls,
+                {'day': day, 'component_type': entry.component_type, 'field': field, 'bucket': bucket},
+                count=1,
+            )
 
 
 class Cart(models.Model):
     """Shopping cart for components"""
     session_id = models.CharField(max_length=100, unique=True)
     components = models.JSONField(default=list)  # List of {component_id, quantity, price}
+    version = models.PositiveIntegerField(default=0)  # bumped on every change, for conditional updates
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Conditional update attempts before falling back to a row lock
+    MAX_UPDATE_ATTEMPTS = 5
+    
     def __str__(self):
         return f"Cart {self.session_id}"
     
+    @classmethod
+    def update_components(cls, session_id, change, create=True):
+        """
+        Replace a cart's components with change(components) without losing
+        concurrent updates
+        
+        Each attempt writes only if the version read is still current
+        (UPDATE ... WHERE version = v), and re-reads and re-applies the change
+        otherwise. Under sustained contention the last attempt serializes on
+        the row lock. Raises DoesNotExist when create is False and the cart
+        does not exist.
+        """
+        for attempt in range(cls.MAX_UPDATE_ATTEMPTS):
+            if create:
+                cart, created = cls.objects.get_or_create(session_id=session_id)
+            else:
+                cart = cls.objects.get(session_id=session_id)
+            
+            components = change(list(cart.components))
+            now = timezone.now()
+            if cls.objects.filter(pk=cart.pk, version=cart.version).update(
+                components=components, version=models.F('version') + 1, updated_at=now
+            ):
+                cart.components = components
+                cart.version += 1
+                cart.updated_at = now
+                return cart
+        
+        with transaction.atomic():
+            # A no-op UPDATE takes the row's write lock before the read on every
+            # backend, including SQLite where select_for_update() is ignored
+            if not cls.objects.filter(session_id=session_id).update(version=models.F('version')):
+                raise cls.DoesNotExist
+            cart = cls.objects.select_for_update().get(session_id=session_id)
+            cart.components = change(list(cart.components))
+            cart.version += 1
+            cart.save(update_fields=['components', 'version', 'updated_at'])
+        return cart
+    
     def get_total_price(self):
         total = 0
         for item in self.components:
             price = float(item.get('price', '0').replace('$', '').split('-')[0])
             total += price * item.get('quantity', 1)
         return total
+
+
+class CatalogVersion(models.Model):
+    """
+    Monotonic catalog version, bumped on every Component/Specification write
+    
+    Derived data (scoring snapshots, cached rankings) is keyed by this number
+    so every worker process sees catalog edits, not just the one that made them.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Catalog version {self.version}"
+    
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+    
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=models.F('version') + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(version=models.F('version') + 1)
+        return cls.current()
+
+
+class CatalogChange(models.Model):
+    """
+    Change log of catalog edits, one row per changed component per version
+    
+    Lets derived rankings be patched by re-scoring only the changed rows.
+    component_id is not a foreign key so deletions stay in the log.
+    """
+    component_id = models.BigIntegerField()
+    component_type = models.CharField(max_length=20, blank=True)
+    catalog_version = models.PositiveBigIntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Component {self.component_id} changed in version {self.catalog_version}"
+    
+    @classmethod
+    def record(cls, entries):
+        """
+        Bump the catalog version once and log (component_id, component_type)
+        entries under it, atomically so readers never see one without the other
+        """
+        with transaction.atomic():
+            version = CatalogVersion.bump()
+            cls.objects.bulk_create([
+                cls(component_id=component_id, component_type=component_type or '',
+                    catalog_version=version)
+                for component_id, component_type in entries
+            ])
+        return version
+
+
+class MaterializedSelection(models.Model):
+    """
+    Precomputed ranking for a frequently requested requirement form
+    
+    Keyed by the hash of the canonical form; only valid while catalog_version
+    matches the current CatalogVersion.
+    """
+    bucket_key = models.CharField(max_length=64, unique=True)  # sha256 of canonical form
+    component_type = models.CharField(max_length=20, choices=ComponentType.choices)
+    form_data = models.JSONField()  # canonical form
+    catalog_version = models.PositiveBigIntegerField()
+    ranking = models.JSONField(default=list)  # [[component_id, match_score, rating], ...] best first
+    recommendations = models.JSONField(default=list)  # top 3 recommendation payloads
+    total_matches = models.IntegerField(default=0)
+    request_count = models.PositiveIntegerField(default=0)  # frequency in the mined history
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['bucket_key', 'catalog_version']),
+        ]
+    
+    def __str__(self):
+        return f"{self.component_type} bucket {self.bucket_key[:12]} (v{self.catalog_version})"
@@ -0,0 +1,201 @@
+"""
+Parsing of string-encoded catalog values into numbers
+"""
+import re
+
+
+NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)*')
+WORD_RE = re.compile(r'[a-z]+')
+# Available now; negated phrases ("out of stock", "not in stock") are not
+IN_STOCK_RE = re.compile(r'(?<!not )\b(?:in[\s-]stock|immediate(?:ly)?)\b')
+
+# Lead time units in days; plural forms are matched too ("hours", "weeks")
+LEAD_TIME_UNITS = {
+    'h': 1 / 24,
+    'hr': 1 / 24,
+    'hour': 1 / 24,
+    'day': 1,
+    'week': 7,
+    'month': 30,
+}
+
+
+def _to_float(text):
+    return float(text.replace(',', ''))
+
+
+def parse_price(price):
+    """Lower bound of a price string such as "$25-35" or "$1,200", or None"""
+    if price is None:
+        return None
+    if isinstance(price, (int, float)):
+        return float(price)
+    match = NUMBER_RE.search(str(price))
+    return _to_float(match.group()) if match else None
+
+
+def parse_lead_time_days(lead_time):
+    """
+    Upper bound of a lead time string in days, or None if unparseable
+    "2-3 weeks" -> 21, "5 days" -> 5, "48h" -> 2, "In Stock" -> 0
+    Strings without a known unit ("3-4 fortnights", "10", "Out of stock")
+    are unparseable.
+    """
+    if not lead_time:
+        return None
+    text = str(lead_time).lower()
+    if IN_STOCK_RE.search(text):
+        return 0.0
+
+    numbers = [_to_float(n) for n in NUMBER_RE.findall(text)]
+    if not numbers:
+        return None
+
+    for word in WORD_RE.findall(text):
+        days = LEAD_TIME_UNITS.get(word, LEAD_TIME_UNITS.get(word[:-1]) if word.endswith('s') else None)
+        if days is not None:
+            return max(numbers) * days
+    return None
+
+
+METRIC_THREAD_RE = re.compile(r'\bM\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+INCH_SIZE_RE = re.compile(r'(?:(\d+)[\s-]+)?(\d+)\s*/\s*(\d+)\s*(?:"|in\b|inch)', re.IGNORECASE)
+MILLIMETRE_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(?:mm)?\s*$', re.IGNORECASE)
+VOLTAGE_RE = re.compile(r'(\d+(?:\.\d+)?)(?:\s*/\s*\d+(?:\.\d+)?)*\s*(k?)V(?:AC|DC)?\b', re.IGNORECASE)
+PHASES_RE = re.compile(r'(\d)\s*(?:-\s*)?(?:phase|ph\b|~)', re.IGNORECASE)
+PHASE_WORDS = {'single': 1, 'one': 1, 'three': 3}
+PROPERTY_CLASS_RE = re.compile(r'\b(\d{1,2})\.\d\b')
+STAINLESS_CLASS_RE = re.compile(r'\b[ACF]\d\s*-\s*(\d{2,3})\b', re.IGNORECASE)
+PRECISION_GRADE_RE = re.compile(r'^\s*(?:(?:ISO|DIN|IT)\s*)?(\d{1,2})\s*$', re.IGNORECASE)
+
+
+def parse_fastener_diameter_mm(diameter):
+    """
+    Nominal diameter of a thread size in mm, or None if unparseable
+    "M10" -> 10, "M8x1.25" -> 8, '3/8"' -> 9.525, "12 mm" -> 12
+    """
+    if not diameter:
+        return None
+    text = str(diameter)
+
+    match = METRIC_THREAD_RE.search(text)
+    if match:
+        return float(match.group(1))
+    match = INCH_SIZE_RE.search(text)
+    if match:
+        whole, numerator, denominator = match.groups()
+        if int(denominator) == 0:
+            return None
+        return round((int(whole or 0) + int(numerator) / int(denominator)) * 25.4, 3)
+    match = MILLIMETRE_RE.match(text)
+    return float(match.group(1)) if match else None
+
+
+def parse_voltage(voltage):
+    """
+    (volts, phases) of a supply voltage string; either may be None
+    "3-phase 400V" -> (400, 3), "230/400V 3~" -> (230, 3), "24 VDC" -> (24, None)
+    For dual ratings the first listed voltage is used.
+    """
+    if not voltage:
+        return None, None
+    text = str(voltage)
+
+    volts = None
+    match = VOLTAGE_RE.search(text)
+    if match:
+        volts = float(match.group(1)) * (1000 if match.group(2) else 1)
+
+    phases = None
+    match = PHASES_RE.search(text)
+    if match:
+        phases = int(match.group(1))
+    else:
+        lowered = text.lower()
+        for word, count in PHASE_WORDS.items():
+            if f'{word} phase' in lowered or f'{word}-phase' in lowered:
+                phases = count
+                break
+    return volts, phases
+
+
+def parse_material_grade_mpa(grade):
+    """
+    Nominal tensile strength in MPa of a bolt property class, or None
+    ISO 898 "8.8" -> 800, "10.9" -> 1000; ISO 3506 "A4-70" -> 700
+    """
+    if not grade:
+        return None
+    text = str(grade)
+
+    match = STAINLESS_CLASS_RE.search(text)
+    if match:
+        return float(match.group(1)) * 10
+    match = PROPERTY_CLASS_RE.search(text)
+    return float(match.group(1)) * 100 if match else None
+
+
+def parse_precision_grade(grade):
+    """
+    ISO/DIN accuracy grade number of a gear, or None
+    "ISO 7" -> 7, "DIN 6" -> 6; AGMA grades use an inverted scale and are not converted
+    """
+    if not grade:
+        return None
+    match = PRECISION_GRADE_RE.match(str(grade))
+    return int(match.group(1)) if match else None
+
+
+# Units of the numeric ComponentSpecification fields
+SPEC_FIELD_UNITS = {
+    'bore_diameter': 'mm',
+    'outer_diameter': 'mm',
+    'width': 'mm',
+    'dynamic_load_rating': 'kN',
+    'static_load_rating': 'kN',
+    'speed_rating': 'RPM',
+    'l10_life': 'hours',
+    'power': 'kW',
+    'speed': 'RPM',
+    'efficiency': '%',
+    'module': 'mm',
+    'pressure_angle': 'degrees',
+    'face_width': 'mm',
+    'power_transmission': 'kW',
+    'seal_diameter': 'mm',
+    'pressure_rating': 'bar',
+    'temp_min': '°C',
+    'temp_max': '°C',
+    'clamp_load_capacity': 'N',
+    'tensile_strength': 'MPa',
+}
+
+UNIT_ALIASES = {
+    'hours': {'hours', 'hour', 'hrs', 'hr', 'h'},
+    'rpm': {'rpm', 'r/min', 'min-1'},
+    'degrees': {'degrees', 'degree', 'deg', '°'},
+    '°c': {'°c', 'degc', 'c'},
+}
+
+QUANTITY_RE = re.compile(r'^\s*([-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*(.*?)\s*$')
+
+
+def parse_quantity(value, unit):
+    """
+    Parse a number, optionally followed by its unit ("40", "40 mm", "28.9kN")
+
+    Raises ValueError when the value is not numeric or carries another unit.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+
+    match = QUANTITY_RE.match(str(value))
+    if not match:
+        raise ValueError(f'not a number: {value!r}')
+
+    number, suffix = match.groups()
+    if suffix:
+        expected = unit.lower()
+        if suffix.lower() not in UNIT_ALIASES.get(expected, {expected}):
+            raise ValueError(f'expected {unit}, got {suffix!r}')
+    return float(number)
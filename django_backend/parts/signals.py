@@ -0,0 +1,39 @@
+"""
+Catalog change tracking
+Bumps the catalog version and logs the changed component whenever
+components or their specifications change, and backfills the type
+copied onto specifications after migrate
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.dispatch import receiver
+from parts.models import Component, ComponentSpecification, CatalogChange, sync_spec_types
+
+
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+def component_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    CatalogChange.record([(instance.pk, instance.component_type)])
+
+
+@receiver(post_save, sender=ComponentSpecification)
+@receiver(post_delete, sender=ComponentSpecification)
+def specification_changed(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    component_type = Component.objects.filter(
+        pk=instance.component_id
+    ).values_list('component_type', flat=True).first()
+    CatalogChange.record([(instance.component_id, component_type)])
+
+
+@receiver(post_migrate)
+def backfill_spec_types(sender, app_config, verbosity=1, using=DEFAULT_DB_ALIAS, stdout=None, **kwargs):
+    """Deploys run migrate, so rows missing the copied type are backfilled then"""
+    if app_config.name != 'parts' or using != DEFAULT_DB_ALIAS:
+        return
+    updated = sync_spec_types()
+    if updated and verbosity and stdout:
+        stdout.write(f'  Copied the component type onto {updated} specifications\n')